@@ -1,20 +1,19 @@
-import sys
 import os
-from pathlib import Path
-
-# Setup path
-root_path = Path(__file__).parent
-if str(root_path) not in sys.path:
-    sys.path.append(str(root_path))
-
-from src.ai.report_generator import ReportGenerator
-from src.file_formatting.formatting import generate_report
+import logging
 from dotenv import load_dotenv
 
-load_dotenv()
-api_key = os.getenv("GROQ_API_KEY")
+# Running this file directly already puts the repo root on sys.path,
+# so `src` resolves without any path mutation.
 
 def main():
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    api_key = os.getenv("GROQ_API_KEY")
+
+    # Heavy imports (Groq SDK, python-docx) only once we actually run
+    from src.ai.report_generator import ReportGenerator
+    from src.file_formatting.formatting import generate_report
+
     print("Generating Manual Report...")
     
     # Mock Context with "User Input"
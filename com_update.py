@@ -1,37 +1,105 @@
-import win32com.client as win32
 import os
-import sys
+import shutil
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from lxml import etree
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+SETTINGS_PART = 'word/settings.xml'
+
+
+def _flag_update_fields(settings_xml: bytes) -> bytes:
+    """Sets <w:updateFields w:val="true"/> so Word rebuilds TOC/LOF fields on open."""
+    root = etree.fromstring(settings_xml)
+    flag = root.find(f'{{{W_NS}}}updateFields')
+    if flag is None:
+        flag = etree.SubElement(root, f'{{{W_NS}}}updateFields')
+    flag.set(f'{{{W_NS}}}val', 'true')
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def mark_fields_dirty(doc_path, out_path):
+    """Copies the docx to out_path with only word/settings.xml rewritten."""
+    fd, tmp_path = tempfile.mkstemp(suffix='.docx', dir=os.path.dirname(out_path) or '.')
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(doc_path) as src, \
+                zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as dst:
+            for item in src.infolist():
+                data = src.read(item.filename)
+                if item.filename == SETTINGS_PART:
+                    data = _flag_update_fields(data)
+                dst.writestr(item, data)
+        shutil.move(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@contextmanager
+def word_app():
+    """Yields one hidden Word.Application for a whole batch and always quits it."""
+    import win32com.client as win32
 
-try:
     word = win32.Dispatch('Word.Application')
     word.Visible = False
+    word.DisplayAlerts = 0
+    word.ScreenUpdating = False
+    try:
+        yield word
+    finally:
+        word.Quit()
+
+
+def verify_toc(word, path):
+    """
+    Refreshes the fields in memory and checks the TOC. updateFields only
+    applies when a user opens the file; documents opened through automation
+    keep their stale field results until asked.
+    """
+    doc = word.Documents.Open(path, ReadOnly=True)
+    try:
+        doc.Content.Fields.Update()
+        for toc in doc.TablesOfContents:
+            toc.Update()
+        # Body text would match "Introduction" even with an empty TOC
+        tocs = doc.TablesOfContents
+        if tocs.Count and "Introduction" in tocs(1).Range.Text:
+            print(f"SUCCESS: TOC populated in {path}")
+        else:
+            print(f"FAIL: TOC is still empty in {path}")
+    finally:
+        # The refresh was only for reading; the file stays as written
+        doc.Close(SaveChanges=False)
+
+
+DOCS = [
+    (r'd:\writex\streamlit_test_output.docx', r'd:\writex\streamlit_test_output_updated.docx'),
+]
+
+try:
+    out_paths = []
+    for doc_path, out_path in DOCS:
+        doc_path = os.path.abspath(doc_path)
+        out_path = os.path.abspath(out_path)
+
+        # No Word instance needed: Word refreshes every field the next time it opens the file
+        mark_fields_dirty(doc_path, out_path)
+        print("Saved updated doc as " + out_path)
+        out_paths.append(out_path)
+
+    # Optional read-back verification (Windows + Word only), one Word for the whole batch
+    try:
+        import win32com.client  # noqa: F401
+        has_word = True
+    except ImportError:
+        has_word = False
+
+    if has_word:
+        with word_app() as word:
+            for out_path in out_paths:
+                verify_toc(word, out_path)
 
-    doc_path = os.path.abspath(r'd:\writex\streamlit_test_output.docx')
-    out_path = os.path.abspath(r'd:\writex\streamlit_test_output_updated.docx')
-
-    doc = word.Documents.Open(doc_path, ReadOnly=True)
-    
-    # Try updating everything
-    for field in doc.Fields:
-        field.Update()
-        
-    doc.SaveAs2(out_path)
-    doc.Close()
-    print("Saved updated doc as " + out_path)
-    
-    # Read text back to verify
-    doc2 = word.Documents.Open(out_path, ReadOnly=True)
-    text = doc2.Content.Text
-    
-    if "Table of Contents" in text and "Introduction" in text:
-        print("SUCCESS: TOC populated!")
-    else:
-        print("FAIL: TOC is still empty.")
-        
-    doc2.Close()
-    
 except Exception as e:
     print(f"Error: {e}")
-finally:
-    if 'word' in locals():
-        word.Quit()
@@ -1,4 +1,5 @@
 from docx import Document
+from src.file_formatting.formatting import save_docx_atomically
 
 def create_seed():
     doc = Document()
@@ -13,7 +14,7 @@ def create_seed():
     doc.add_heading('Conclusion', level=1)
     doc.add_paragraph('The system is robust and efficient.')
     
-    doc.save('d:/writex/seed.docx')
+    save_docx_atomically(doc, 'd:/writex/seed.docx')
     print("Created d:/writex/seed.docx")
 
 if __name__ == "__main__":
@@ -1,38 +1,54 @@
 import zipfile
-import xml.dom.minidom as md
+from lxml import etree
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+NSMAP = {'w': W_NS}
+SDT_TAG = f'{{{W_NS}}}sdt'
+
+
+def node_name(node):
+    return etree.QName(node).localname
+
+
+def first_text(node):
+    t = node.find('.//w:t', NSMAP)
+    return t.text if (t is not None and t.text) else 'No Text'
+
 
 try:
-    z = zipfile.ZipFile('d:/writex/streamlit_test_output.docx')
-    dom = md.parseString(z.read('word/document.xml'))
-    body = dom.getElementsByTagName('w:body')[0]
-    nodes = body.childNodes
-
-    idxs = [i for i, n in enumerate(nodes) if n.nodeName == 'w:sdt']
-    print('SDT Indices:', idxs)
-    print('Total Body Nodes:', len(nodes))
-    
-    for i in idxs:
-        print(f"\nSDT at index {i}")
-        
-        # Look at the previous 2 nodes
-        for offset in [-2, -1]:
-            j = i + offset
-            if j >= 0:
-                prev_node = nodes[j]
-                name = prev_node.nodeName
-                texts = prev_node.getElementsByTagName('w:t')
-                if texts and texts[0].firstChild:
-                    text_val = texts[0].firstChild.nodeValue
-                else:
-                    text_val = 'No Text'
-                print(f"  Node before [{offset}]: {name}, Text: {text_val}")
-
-        # Look at the next node
-        if i + 1 < len(nodes):
-             next_node = nodes[i+1]
-             name = next_node.nodeName
-             texts = next_node.getElementsByTagName('w:t')
-             text_val = texts[0].firstChild.nodeValue if (texts and texts[0].firstChild) else 'No Text'
-             print(f"  Node after [+1]: {name}, Text: {text_val}")
+    with zipfile.ZipFile('d:/writex/streamlit_test_output.docx') as z, \
+            z.open('word/document.xml') as xml_stream:
+        # Stream-walk until the body closes; no full DOM is built
+        for _, body in etree.iterparse(xml_stream, events=('end',), tag=f'{{{W_NS}}}body'):
+            idxs = []
+            prev2 = prev1 = None
+            pending_next = False
+            total = 0
+
+            # Single forward pass: only the last two siblings are kept around
+            for i, node in enumerate(body.iterchildren()):
+                total += 1
+                if pending_next:
+                    print(f"  Node after [+1]: w:{node_name(node)}, Text: {first_text(node)}")
+                    pending_next = False
+
+                if node.tag == SDT_TAG:
+                    idxs.append(i)
+                    print(f"\nSDT at index {i}")
+
+                    # Look at the previous 2 nodes
+                    for offset, prev_node in ((-2, prev2), (-1, prev1)):
+                        if prev_node is not None:
+                            print(f"  Node before [{offset}]: w:{node_name(prev_node)}, Text: {first_text(prev_node)}")
+
+                    # The next node is reported on the following iteration
+                    pending_next = True
+
+                prev2, prev1 = prev1, node
+
+            print('\nSDT Indices:', idxs)
+            print('Total Body Nodes:', total)
+
+            body.clear()
 except Exception as e:
     print(f"Error: {e}")
@@ -2,48 +2,63 @@ import os
 import sys
 import json
 import logging
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
-load_dotenv()
-api_key = os.getenv("GROQ_API_KEY")
-
-from src.analysis.code_analyzer import CodeAnalyzer
-from src.analysis.style_analyzer import StyleAnalyzer
-from src.ai.report_generator import ReportGenerator
-from src.core.compiler import DocumentCompiler
-from src.file_formatting.formatting import generate_report
-from src.ai.utils import telemetry_data
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _dumps(obj):
+    """Pretty-prints metrics with orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
 def main():
+    load_dotenv()
+    api_key = os.getenv("GROQ_API_KEY")
+
+    # Heavy imports (Groq SDK, python-docx, PyPDF2) only once we actually run
+    from src.analysis.code_analyzer import CodeAnalyzer
+    from src.analysis.style_analyzer import StyleAnalyzer
+    from src.ai.report_generator import ReportGenerator
+    from src.core.compiler import DocumentCompiler
+    from src.file_formatting.formatting import generate_report
+    from src.ai.utils import telemetry_data
+
     print("=== STARTING E2E PRODUCTION SIMULATION ===")
     
-    # 1. Zip Extraction
+    def _extract_sample(path):
+        with open(path, "rb") as f:
+            return sa.extract_all(f, "pdf")
+
+    # 1 & 2. Zip analysis and sample extraction are independent; overlap them
     print("1. Analyzing demo.zip...")
-    analyzer = CodeAnalyzer()
-    summary = analyzer.analyze_zip("demo.zip")
-    print(f"   Total Files Processed: {summary.total_files}")
-    
-    # 2. Sample Extraction
     print("2. Extracting SAMPLE REPORT FOR REFERENCE.pdf...")
+    analyzer = CodeAnalyzer()
     sa = StyleAnalyzer(api_key=api_key)
-    with open("SAMPLE REPORT FOR REFERENCE.pdf", "rb") as f:
-        raw_text = sa.extract_text(f, "pdf")
-        f.seek(0)
-        style_guide = sa.analyze_style(raw_text)
-        f.seek(0)
-        sample_sections = sa.extract_specific_sections(f, "pdf")
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        fut_summary = ex.submit(analyzer.analyze_zip, "demo.zip")
+        fut_sample = ex.submit(_extract_sample, "SAMPLE REPORT FOR REFERENCE.pdf")
+        summary = fut_summary.result()
+        raw_text, sample_sections = fut_sample.result()
+    summary_json = summary.to_json()
+    print(f"   Total Files Processed: {summary.total_files}")
+    style_guide = sa.analyze_style(raw_text)
         
     gen = ReportGenerator(api_key=api_key)
     sample_metadata = gen.extract_metadata_from_sample(raw_text)
     
     # 3. Context Merging
     print("3. Defining Production Context...")
-    base_context = gen.derive_project_context(summary.to_json())
+    base_context = gen.derive_project_context(summary_json)
     context = {
         "title": sample_metadata.get("title", "Test Automation System"),
         "student_name": "Prod User",
@@ -80,7 +95,7 @@ def main():
     except Exception as e:
         print(f"\n[!] GENERATION HALTED BY VALIDATION GUARD: {e}")
         print("\n=== METRICS ===")
-        print(json.dumps(telemetry_data, indent=2))
+        print(_dumps(telemetry_data))
         sys.exit(1)
         
     print("5. Rendering DOCX via python-docx...")
@@ -88,7 +103,7 @@ def main():
     generate_report(full_structure, output_path, style_name="Standard")
     
     print("\n=== E2E METRICS ===")
-    print(json.dumps(telemetry_data, indent=2))
+    print(_dumps(telemetry_data))
     
     print(f"\nSUCCESS: Document generated at {output_path}")
 
@@ -2,13 +2,56 @@
 Helper to format code analysis results for LLM prompts.
 """
 
+import threading
+from collections import OrderedDict
+from itertools import islice
+
+# id(detailed_analysis) -> (detailed_analysis, prompt). The object itself is kept
+# so its id cannot be recycled while the entry is alive.
+_prompt_cache: "OrderedDict[int, tuple]" = OrderedDict()
+_PROMPT_CACHE_SIZE = 4
+# Streamlit sessions and Blast ants format concurrently
+_prompt_cache_lock = threading.Lock()
+
+
+def reset_cache():
+    """Drops memoized prompts; ReportGenerator.clear_cache calls it per report."""
+    with _prompt_cache_lock:
+        _prompt_cache.clear()
+
 
 def format_detailed_analysis_for_prompt(detailed_analysis) -> str:
     """
     Format CodeAnalysisResult into a string for LLM prompt injection.
     This replaces template-based generation with real code facts.
+    The same analysis object is formatted only once per report.
     """
-    if not detailed_analysis:
+    key = id(detailed_analysis)
+    with _prompt_cache_lock:
+        hit = _prompt_cache.get(key)
+        if hit is not None and hit[0] is detailed_analysis:
+            _prompt_cache.move_to_end(key)
+            return hit[1]
+
+    # Formatted outside the lock; a concurrent miss just formats it twice
+    prompt = _format_detailed_analysis(detailed_analysis)
+    with _prompt_cache_lock:
+        _prompt_cache[key] = (detailed_analysis, prompt)
+        if len(_prompt_cache) > _PROMPT_CACHE_SIZE:
+            _prompt_cache.popitem(last=False)
+    return prompt
+
+
+def _format_detailed_analysis(detailed_analysis) -> str:
+    if not detailed_analysis or not any(
+        (
+            detailed_analysis.functions,
+            detailed_analysis.classes,
+            detailed_analysis.detected_patterns,
+            detailed_analysis.imports,
+            detailed_analysis.code_snippets,
+        )
+    ):
         return "No code analysis available."
 
     output = []
@@ -17,12 +60,11 @@ def format_detailed_analysis_for_prompt(detailed_analysis) -> str:
     if detailed_analysis.functions:
         output.append("=== REAL FUNCTIONS FROM CODE ===")
         for func in detailed_analysis.functions[:15]:  # Limit to 15 most significant
-            entry = f"- {func.signature}"
+            output.append(f"- {func.signature}")
             if func.docstring:
-                entry += f"\n  Purpose: {func.docstring}"
+                output.append(f"  Purpose: {func.docstring}")
             if func.has_recursion:
-                entry += "\n  [Uses recursion]"
-            output.append(entry)
+                output.append("  [Uses recursion]")
 
         if len(detailed_analysis.functions) > 15:
             output.append(
@@ -33,15 +75,17 @@ def format_detailed_analysis_for_prompt(detailed_analysis) -> str:
     if detailed_analysis.classes:
         output.append("\n=== REAL CLASSES FROM CODE ===")
         for cls in detailed_analysis.classes[:10]:  # Limit to 10 classes
-            entry = f"- Class: {cls.name}"
+            output.append(f"- Class: {cls.name}")
             if cls.docstring:
-                entry += f"\n  Purpose: {cls.docstring}"
+                output.append(f"  Purpose: {cls.docstring}")
             if cls.methods:
-                method_names = [m.name for m in cls.methods[:5]]
-                entry += f"\n  Methods: {', '.join(method_names)}"
-                if len(cls.methods) > 5:
-                    entry += f" (+{len(cls.methods) - 5} more)"
-            output.append(entry)
+                method_names = ", ".join(m.name for m in cls.methods[:5])
+                extra = len(cls.methods) - 5
+                output.append(
+                    f"  Methods: {method_names} (+{extra} more)"
+                    if extra > 0
+                    else f"  Methods: {method_names}"
+                )
 
     # Detected patterns
     if detailed_analysis.detected_patterns:
@@ -51,20 +95,23 @@ def format_detailed_analysis_for_prompt(detailed_analysis) -> str:
 
     # Real imports (dependencies)
     if detailed_analysis.imports:
-        unique_imports = list(set(detailed_analysis.imports))[:20]
-        output.append(f"\n=== DEPENDENCIES (Imports) ===")
+        unique_imports = detailed_analysis.imports[
+            :20
+        ]  # Already deduplicated by the parser
+        output.append("\n=== DEPENDENCIES (Imports) ===")
         output.append(", ".join(unique_imports))
 
     # Code snippets (if available)
     if detailed_analysis.code_snippets:
         output.append("\n=== CODE SNIPPETS (Sample Implementation) ===")
-        snippet_count = 0
-        for file_path, snippets in detailed_analysis.code_snippets.items():
-            for start, end, code in snippets[:2]:  # Max 2 snippets per file
-                if snippet_count >= 3:  # Max 3 total snippets
-                    break
-                output.append(f"\nFrom {file_path} (lines {start}-{end}):")
-                output.append(f"```python\n{code}\n```")
-                snippet_count += 1
+        # Lazily flattened so no further files are visited once the cap is hit
+        snippet_iter = (
+            (file_path, start, end, code)
+            for file_path, snippets in detailed_analysis.code_snippets.items()
+            for start, end, code in snippets[:2]  # Max 2 snippets per file
+        )
+        for file_path, start, end, code in islice(snippet_iter, 3):  # Max 3 total
+            output.append(f"\nFrom {file_path} (lines {start}-{end}):")
+            output.append("```python\n" + code + "\n```")
 
     return "\n".join(output)
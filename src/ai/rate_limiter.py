@@ -0,0 +1,214 @@
+import re
+import time
+import asyncio
+import threading
+from collections import deque
+from typing import Deque, Mapping, Optional
+
+# Rate-limit header durations: "7.66s", "2m59.56s", "120ms"
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def estimate_tokens(prompt: str) -> int:
+    """Cheap token estimate (~4 characters per token) for quota accounting."""
+    return max(1, len(prompt) // 4)
+
+
+def parse_duration(value) -> float:
+    """Seconds in a rate-limit header value ("30", "7.66s", "2m59.56s", "120ms")."""
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    return sum(
+        float(n) * _UNIT_SECONDS[unit] for n, unit in _DURATION_RE.findall(str(value))
+    )
+
+
+def _resolve(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class TokenBucket:
+    """
+    Client-side limiter for a requests-per-minute and a tokens-per-minute quota,
+    implemented as two GCRA (generic cell rate algorithm) schedules.
+
+    Each quota allows a burst of one minute's worth of capacity. A limit of 0
+    disables that quota. acquire() reserves a slot under the lock and then
+    sleeps outside it, so waiting callers queue up in arrival order.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._req_tat = 0.0  # Theoretical arrival time, requests schedule
+        self._tok_tat = 0.0  # Theoretical arrival time, tokens schedule
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _schedule(tat, now, cost, per_minute):
+        """Returns (new_tat, wait) for one GCRA schedule."""
+        if per_minute <= 0:
+            return tat, 0.0
+        interval = 60.0 / per_minute
+        new_tat = max(tat, now) + cost * interval
+        # Burst tolerance of one minute: allowed once new_tat - 60s <= now
+        return new_tat, max(0.0, new_tat - 60.0 - now)
+
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._req_tat, req_wait = self._schedule(self._req_tat, now, 1, self.rpm)
+            self._tok_tat, tok_wait = self._schedule(
+                self._tok_tat, now, tokens, self.tpm
+            )
+            return max(req_wait, tok_wait, self._blocked_until - now)
+
+    def acquire(self, tokens: int = 1):
+        """Blocks until a request costing ``tokens`` fits in both quotas."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 1):
+        """Same as acquire() but yields to the event loop while waiting.
+        The lock is only held for the bookkeeping, never across an await."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def refund(self, tokens: int):
+        """Returns ``tokens`` reserved by an earlier acquire() but not used."""
+        if tokens <= 0 or self.tpm <= 0:
+            return
+        with self._lock:
+            self._tok_tat -= tokens * 60.0 / self.tpm
+
+    def penalize(self, seconds: float):
+        """Holds back every caller for ``seconds`` (e.g. a server Retry-After)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class RateLimitGovernor:
+    """
+    AIMD (additive increase, multiplicative decrease) admission control for
+    concurrent async LLM requests. Each success widens the window by
+    ``increase`` up to ``max_concurrency``; a 429 multiplies it by
+    ``decrease``, at most once per average request latency. Latency alone
+    never shrinks the window: requests range from short intros to bundles at
+    the max_tokens cap, so a slow one is not a sign of overload.
+
+    wait() admits one request and release() returns its slot; waiters are
+    admitted in arrival order. No asyncio primitive is held between calls, so
+    one governor can serve successive asyncio.run() loops.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        initial: float = 2.0,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        max_hold: float = 60.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.current_concurrency = float(min(initial, max_concurrency))
+        self.increase = increase
+        self.decrease = decrease
+        self.max_hold = max_hold
+        self._in_flight = 0
+        self._latency: Optional[float] = (
+            None  # Moving average of healthy request latency
+        )
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._lock = threading.Lock()
+
+    def _has_slot(self) -> bool:
+        return self._in_flight < max(1, int(self.current_concurrency))
+
+    def _wake(self):
+        # Called with the lock held
+        while self._waiters and self._has_slot():
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.get_loop().call_soon_threadsafe(_resolve, waiter)
+
+    async def wait(self):
+        """Waits until the current window has room for one more request."""
+        with self._lock:
+            if not self._waiters and self._has_slot():
+                self._in_flight += 1
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = waiter in self._waiters
+                if queued:
+                    self._waiters.remove(waiter)
+            if not queued:
+                # The slot was handed over just as we were cancelled
+                self.release()
+            raise
+
+    def release(self):
+        """Returns a slot taken by wait()."""
+        with self._lock:
+            self._in_flight -= 1
+            self._wake()
+
+    def observe(
+        self,
+        headers: Optional[Mapping[str, str]] = None,
+        latency: Optional[float] = None,
+        status: Optional[int] = None,
+    ) -> float:
+        """
+        Feeds back one finished request: response headers, wall time in seconds
+        and HTTP status. Returns how long the quota headers say to hold off
+        (0 unless a quota is used up), capped at max_hold.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if status == 429:
+                # One cut per latency window, so a burst of failures from
+                # requests that were all in flight together counts once
+                if now - self._last_decrease >= (self._latency or 1.0):
+                    self.current_concurrency = max(
+                        1.0, self.current_concurrency * self.decrease
+                    )
+                    self._last_decrease = now
+            elif status is not None and status < 400:
+                self.current_concurrency = min(
+                    float(self.max_concurrency),
+                    self.current_concurrency + self.increase,
+                )
+                if latency is not None:
+                    self._latency = (
+                        latency
+                        if self._latency is None
+                        else 0.8 * self._latency + 0.2 * latency
+                    )
+            self._wake()
+
+        hold = 0.0
+        if headers:
+            for quota in ("requests", "tokens"):
+                remaining = headers.get(f"x-ratelimit-remaining-{quota}")
+                if remaining is not None and str(remaining).strip() == "0":
+                    hold = max(
+                        hold, parse_duration(headers.get(f"x-ratelimit-reset-{quota}"))
+                    )
+        return min(hold, self.max_hold)
@@ -1,22 +1,72 @@
 import os
 import json
 import re
-from typing import Dict, Any, List
-from groq import Groq
+import hashlib
+from typing import Dict, Any, List, Optional, Tuple
 import threading
-from .utils import generate_with_retry
-from .code_analysis_formatter import format_detailed_analysis_for_prompt
+from .utils import (
+    TARGET_MODEL_VERSION,
+    agenerate_with_retry,
+    generate_with_retry,
+    get_client,
+)
+from .rate_limiter import RateLimitGovernor
+from .code_analysis_formatter import format_detailed_analysis_for_prompt, reset_cache
 from src.security.sanitizer import DataSanitizer
 import textwrap
 
 
+# Sections filled from fixed templates instead of the LLM
+TEMPLATE_SECTIONS = frozenset({"certificate", "acknowledgement", "acknowledgment"})
+
+# Opt-in (WRITEX_LLM_CACHE=1) persistent cache for the whole-document calls
+# extract_metadata_from_sample and derive_project_context, keyed by model and prompt
+LLM_CACHE = os.getenv("WRITEX_LLM_CACHE") == "1"
+
+# generate_section/agenerate_section return a failed call as text with this prefix
+SECTION_ERROR_PREFIX = "Error generating section"
+
+
+def is_section_error(text: str) -> bool:
+    """True for the error text generate_section returns instead of raising."""
+    return text.startswith(SECTION_ERROR_PREFIX)
+
+# Hard rules shared by the single-section and batched section prompts
+_SECTION_RULES = """CRITICAL NARRATIVE CONSTRAINTS (HARD RULES):
+        1. **NO RAW CODE OR FILE NAMES**: Absolutely DO NOT mention specific Python filenames like `formatting.py` or `.py` files at all. DO NOT dump raw code functions. Speak entirely in abstract system-level terminology (e.g., "The Preprocessing Module", "The Data Transformation Layer", etc.).
+        2. **ACADEMIC STORYTELLING**: Synthesize a cohesive academic narrative. Discuss the theoretical dataset defined above, the ETL pipeline architecture, system latency, and rule-based evaluation metrics. Do not invent ML metrics like F1 or Recall. Ensure you portray it as a deterministic Intelligent NLP-Assisted pipeline.
+        3. **INSTITUTIONAL OUTCOMES (PEO/PO/PSO/CO)**: If this section is PEO, PO, PSO, or CO, DO NOT refer to specific code, modules, or features of the project. Speak exclusively about high-level B.Tech Educational Outcomes (e.g., "Ability to design complex systems", "Demonstrating engineering life-long learning").
+        4. **NO FICTIONAL REFERENCES**: DO NOT hallucinate fake citations, author names (e.g., J. Smith), or fictional textbook references under any circumstances.
+        5. **NO HEADINGS**: Write ONLY pure academic paragraphs.
+        6. **STRICT LENGTH**: Exactly 300-350 words. Do not trail off or write meta-text."""
+
+
+# Completion caps for the short answers; a subsection is ~350 words of JSON
+# blocks, an intro 2-3 sentences. Bundles keep the 2048 default.
+_SUBSECTION_MAX_TOKENS = 1024
+_INTRO_MAX_TOKENS = 256
+
+# Rules 1-4 of the subsection prompt, shared by the single and bundled variants
+_SUBSECTION_RULES = """1. **NO HEADINGS**: Do NOT output markdown headings (no #, ##, ###) in the paragraphs.
+        2. **NO RAW CODE OR FILE NAMES**: Absolutely DO NOT mention specific Python filenames within text paragraphs. Speak entirely in abstract system-level terminology.
+        3. **ACADEMIC STORYTELLING**: You must synthesize a cohesive academic narrative based on the project data. Discuss the theoretical dataset, the ETL pipeline, system architectures, etc.
+        4. **LITERATURE SURVEY**: If you are writing for Chapter 2, synthesize a highly authentic comparative analysis of existing systems. DO NOT insert ANY references, bibliographies, or IEEE citations."""
+
+
 class ReportGenerator:
-    def __init__(self, api_key: str, model_name: str = "llama-3.3-70b-versatile"):
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = "llama-3.3-70b-versatile",
+        governor: Optional[RateLimitGovernor] = None,
+    ):
         if not api_key:
             raise ValueError("API Key is required for ReportGenerator")
-        # Initialize Groq client
-        self.model = Groq(api_key=api_key)
+        # Shared Groq client (one keep-alive connection pool per API key)
+        self.model = get_client(api_key)
         self.model_name = model_name
+        # Adaptive concurrency for the agenerate_* methods (None: ungated)
+        self.governor = governor
 
         # Free-Tier Caching System
         self.cache_dir = os.path.join("cache")
@@ -37,13 +87,23 @@ class ReportGenerator:
     def _save_cache(self):
         with self._cache_lock:
             try:
+                # Snapshot first: other threads may still be inserting entries
+                snapshot = dict(self.cache)
                 with open(self.cache_file, "w", encoding="utf-8") as f:
-                    json.dump(self.cache, f, indent=4)
+                    json.dump(snapshot, f, indent=4)
             except Exception as e:
                 print(f"Failed to save cache: {e}")
 
+    @staticmethod
+    def _hash_key(prefix: str, payload: Any) -> str:
+        """Stable cache key for calls whose input is a whole document/summary."""
+        canonical = json.dumps(payload, sort_keys=True, default=str)
+        return f"{prefix}_{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
     def clear_cache(self):
         """Thread-safe method to wipe the generation cache for a fresh run."""
+        # Memoized code-analysis prompts belong to the previous run too
+        reset_cache()
         with self._cache_lock:
             self.cache = {}
             if os.path.exists(self.cache_file):
@@ -79,14 +139,21 @@ class ReportGenerator:
         {sample_text[:4000]} # Limit to first 4000 chars (mostly front matter)
         \"\"\"
         """
+        cache_key = self._hash_key("meta", [TARGET_MODEL_VERSION, prompt])
         try:
-            response = generate_with_retry(self.model, prompt)
+            response = self.cache.get(cache_key) if LLM_CACHE else None
+            cached = response is not None
+            if not cached:
+                response = generate_with_retry(self.model, prompt)
             import re
 
             json_match = re.search(r"\{.*\}", response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(0))
-            return json.loads(response)
+            metadata = json.loads(json_match.group(0) if json_match else response)
+            if LLM_CACHE and not cached:
+                # Only cache responses that actually parsed
+                self.cache[cache_key] = response
+                self._save_cache()
+            return metadata
         except Exception as e:
             print(f"Metadata extraction failed: {e}")
             return {}
@@ -101,7 +168,7 @@ class ReportGenerator:
         Generates content for a specific report section.
         """
         # Strict Templates for Cert/Ack
-        if section_name.lower() in ["certificate", "acknowledgement", "acknowledgment"]:
+        if section_name.lower() in TEMPLATE_SECTIONS:
             return self.fill_template(section_name, user_context)
 
         # Check Cache
@@ -117,7 +184,87 @@ class ReportGenerator:
             self._save_cache()
             return result
         except Exception as e:
-            return f"Error generating section {section_name}: {str(e)}"
+            return f"{SECTION_ERROR_PREFIX} {section_name}: {str(e)}"
+
+    async def agenerate_section(
+        self,
+        async_model,
+        section_name: str,
+        project_summary: Dict[str, Any],
+        user_context: Dict[str, Any],
+    ) -> str:
+        """generate_section through an async client (see utils.make_async_client)."""
+        if section_name.lower() in TEMPLATE_SECTIONS:
+            return self.fill_template(section_name, user_context)
+
+        cache_key = f"section_{section_name}_{user_context.get('title', 'default')}"
+        if cache_key in self.cache:
+            return self.cache[cache_key]
+
+        prompt = self._build_prompt(section_name, project_summary, user_context)
+
+        try:
+            result = await agenerate_with_retry(async_model, prompt, governor=self.governor)
+            self.cache[cache_key] = result
+            self._save_cache()
+            return result
+        except Exception as e:
+            return f"{SECTION_ERROR_PREFIX} {section_name}: {str(e)}"
+
+    def generate_sections(
+        self,
+        section_names: List[str],
+        project_summary: Dict[str, Any],
+        user_context: Dict[str, Any],
+    ) -> Dict[str, str]:
+        """
+        Generates several report sections with one LLM call instead of one call
+        each. Templates and cached sections are served locally. Sections missing
+        from the model's answer are left out of the result so the caller can
+        fall back to generate_section for them. Raises if the call itself fails.
+        """
+        results = {}
+        to_generate = []
+        for section_name in dict.fromkeys(section_names):
+            if section_name.lower() in TEMPLATE_SECTIONS:
+                results[section_name] = self.fill_template(section_name, user_context)
+                continue
+            cache_key = f"section_{section_name}_{user_context.get('title', 'default')}"
+            if cache_key in self.cache:
+                results[section_name] = self.cache[cache_key]
+            else:
+                to_generate.append(section_name)
+
+        if len(to_generate) == 1:
+            section_name = to_generate[0]
+            results[section_name] = self.generate_section(
+                section_name, project_summary, user_context
+            )
+        elif to_generate:
+            prompt = self._build_batch_prompt(to_generate, project_summary, user_context)
+            response = generate_with_retry(
+                self.model, prompt, response_format={"type": "json_object"}
+            )
+            data = json.loads(response)
+            sections = data.get("sections", data) if isinstance(data, dict) else {}
+            for section_name in to_generate:
+                text = sections.get(section_name)
+                if isinstance(text, str) and text.strip():
+                    results[section_name] = text
+                    cache_key = f"section_{section_name}_{user_context.get('title', 'default')}"
+                    self.cache[cache_key] = text
+            self._save_cache()
+
+        return results
+
+    def section_prompt(
+        self,
+        section_name: str,
+        project_summary: Dict[str, Any],
+        user_context: Dict[str, Any],
+    ) -> str:
+        """The prompt generate_section would send, for callers that submit it themselves."""
+        return self._build_prompt(section_name, project_summary, user_context)
 
     def generate_subsection_body(
         self,
@@ -130,6 +277,240 @@ class ReportGenerator:
         Generates ONLY the body text for a specific subsection.
         Strictly forbids outputting headings or markdown titles.
         """
+        text, cache_key, prompt = self._subsection_request(
+            chapter_title, subsection_title, project_summary, user_context
+        )
+        if text is not None:
+            return text
+
+        result = generate_with_retry(
+            self.model,
+            prompt,
+            response_format={"type": "json_object"},
+            max_tokens=_SUBSECTION_MAX_TOKENS,
+        )
+        self.cache[cache_key] = result
+        self._save_cache()
+        return result
+
+    async def agenerate_subsection_body(
+        self,
+        async_model,
+        chapter_title: str,
+        subsection_title: str,
+        project_summary: Dict,
+        user_context: Dict,
+    ) -> str:
+        """generate_subsection_body through an async client."""
+        text, cache_key, prompt = self._subsection_request(
+            chapter_title, subsection_title, project_summary, user_context
+        )
+        if text is not None:
+            return text
+
+        result = await agenerate_with_retry(
+            async_model,
+            prompt,
+            response_format={"type": "json_object"},
+            governor=self.governor,
+            max_tokens=_SUBSECTION_MAX_TOKENS,
+        )
+        self.cache[cache_key] = result
+        self._save_cache()
+        return result
+
+    def generate_chapter_bundle(
+        self,
+        chapter_title: str,
+        sub_titles: List[str],
+        project_summary: Dict,
+        user_context: Dict,
+    ) -> Dict[str, str]:
+        """
+        Bodies for several subsections of one chapter from a single LLM call,
+        keyed by subsection title. Fixed and cached bodies are served locally;
+        any subsection missing from the model's answer (or an unparseable
+        answer) falls back to generate_subsection_body.
+        """
+        results, pending, prompt = self._bundle_request(
+            chapter_title, sub_titles, project_summary, user_context
+        )
+        if prompt:
+            response = generate_with_retry(
+                self.model, prompt, response_format={"type": "json_object"}
+            )
+            self._store_bundle(response, pending, results)
+
+        for title in sub_titles:
+            if title not in results:
+                results[title] = self.generate_subsection_body(
+                    chapter_title, title, project_summary, user_context
+                )
+        return results
+
+    async def agenerate_chapter_bundle(
+        self,
+        async_model,
+        chapter_title: str,
+        sub_titles: List[str],
+        project_summary: Dict,
+        user_context: Dict,
+    ) -> Dict[str, str]:
+        """generate_chapter_bundle through an async client."""
+        results, pending, prompt = self._bundle_request(
+            chapter_title, sub_titles, project_summary, user_context
+        )
+        if prompt:
+            response = await agenerate_with_retry(
+                async_model,
+                prompt,
+                response_format={"type": "json_object"},
+                governor=self.governor,
+            )
+            self._store_bundle(response, pending, results)
+
+        for title in sub_titles:
+            if title not in results:
+                results[title] = await self.agenerate_subsection_body(
+                    async_model, chapter_title, title, project_summary, user_context
+                )
+        return results
+
+    def _bundle_request(
+        self,
+        chapter_title: str,
+        sub_titles: List[str],
+        project_summary: Dict,
+        user_context: Dict,
+    ) -> Tuple[Dict[str, str], Dict[str, str], Optional[str]]:
+        """
+        (results, pending, prompt) for a chapter bundle: bodies already known,
+        title -> cache key for the rest, and the bundled prompt for them (None
+        unless at least two are pending; a single one goes through the
+        per-subsection path).
+        """
+        brief = self._subsection_brief(chapter_title, project_summary, user_context)
+        results = {}
+        pending = {}
+        for title in dict.fromkeys(sub_titles):
+            text, cache_key, _ = self._subsection_request(
+                chapter_title, title, project_summary, user_context, brief=brief
+            )
+            if text is not None:
+                results[title] = text
+            else:
+                pending[title] = cache_key
+
+        prompt = None
+        if len(pending) > 1:
+            prompt = self._bundle_prompt(chapter_title, list(pending), brief, user_context)
+        return results, pending, prompt
+
+    def _store_bundle(self, response: str, pending: Dict[str, str], results: Dict[str, str]):
+        """Splits a bundled reply into per-subsection bodies, caching each like a single call."""
+        try:
+            data = json.loads(response)
+        except (json.JSONDecodeError, TypeError):
+            return  # e.g. cut off at max_tokens; everything falls back
+        bodies = data.get("subsections", data) if isinstance(data, dict) else {}
+        if not isinstance(bodies, dict):
+            return
+
+        for title, cache_key in pending.items():
+            body = bodies.get(title)
+            if isinstance(body, list):
+                body = {"blocks": body}
+            if isinstance(body, dict) and body.get("blocks"):
+                text = json.dumps(body)
+            elif isinstance(body, str) and body.strip():
+                text = body
+            else:
+                continue
+            results[title] = text
+            self.cache[cache_key] = text
+        self._save_cache()
+
+    @staticmethod
+    def _bundle_prompt(
+        chapter_title: str, sub_titles: List[str], brief: Dict[str, str], user_context: Dict
+    ) -> str:
+        """Same brief as _subsection_prompt, for several subsections answered as one JSON object."""
+        titles = "\n".join(f'        - "{title}"' for title in sub_titles)
+        return f"""
+        [PROMPT_TEMPLATE_VERSION: 1.0.0 (Production Locked)]
+        You are an expert Academic Editor and Strategic System Architect writing a formal B.Tech Project Report.
+        
+        Project Metadata (JSON):
+        {brief['metadata']}
+        
+        Context:
+        Title: {user_context.get('title')}
+        Problem: {user_context.get('problem_statement')}{brief['metrics_context']}
+        
+        Task: Write the body text for each of these {len(sub_titles)} subsections (inside Chapter: "{chapter_title}"):
+{titles}
+
+        OUTPUT FORMAT (CRITICAL JSON SCHEMA):
+        You MUST return a strictly valid JSON object with a single root key "subsections".
+        "subsections" maps each subsection title above, verbatim, to an object with a "blocks" list.
+        Each object in a "blocks" list must have a "type" key (either "paragraph" or "code_extraction").
+        - For text paragraphs, use type "paragraph" and put the academic text in the "text" key.
+        - For code extraction, use type "code_extraction" and put the exact function or class name from the valid targets list into the "target_name" key.
+        
+        JSON Example:
+        {{
+            "subsections": {{
+                "Background": {{
+                    "blocks": [
+                        {{"type": "paragraph", "text": "This module is designed to handle user authentication and routing."}},
+                        {{"type": "code_extraction", "target_name": "verify_user_password"}}
+                    ]
+                }}
+            }}
+        }}
+        
+        CRITICAL NARRATIVE CONSTRAINTS (HARD RULES), applied to EVERY subsection independently:
+        {_SUBSECTION_RULES}
+        {brief['code_rule']}
+        {brief['figure_rule']}
+        7. **STRICT LENGTH**: The combined text of each subsection's paragraphs should be roughly 300-350 words. Do not trail off or include meta-commentary.
+        """
+
+    def _subsection_request(
+        self,
+        chapter_title: str,
+        subsection_title: str,
+        project_summary: Dict,
+        user_context: Dict,
+        brief: Optional[Dict[str, str]] = None,
+    ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """
+        (text, cache_key, prompt) for a subsection body. text is set when no LLM
+        call is needed (fixed fallback or cache hit); otherwise prompt is sent
+        and the reply cached under cache_key, a hash of the prompt. ``brief``
+        is the chapter's _subsection_brief, if the caller already has it.
+        """
+        text = self._fixed_subsection_body(chapter_title, subsection_title, user_context)
+        if text is not None:
+            return text, None, None
+
+        if brief is None:
+            brief = self._subsection_brief(chapter_title, project_summary, user_context)
+        prompt = self._subsection_prompt(chapter_title, subsection_title, brief, user_context)
+
+        # Cache Check: keyed by the prompt itself, so a changed summary or
+        # context is a miss instead of a stale hit
+        cache_key = self._hash_key("sub", prompt)
+        if cache_key in self.cache:
+            return self.cache[cache_key], cache_key, None
+
+        return None, cache_key, prompt
+
+    @staticmethod
+    def _fixed_subsection_body(
+        chapter_title: str, subsection_title: str, user_context: Dict
+    ) -> Optional[str]:
+        """Hardcoded body for subsections that must not be generated, else None."""
         # CRITICAL: Special handling for Results chapter without test data
         if chapter_title == "Results and Discussion":
             metrics_data = user_context.get("test_metrics_data", "")
@@ -142,17 +523,18 @@ class ReportGenerator:
                     return """Testing and validation were performed through manual verification during development. Automated unit tests and performance benchmarking are planned for future iterations. Preliminary functionality testing confirms that the system meets its core requirements."""
                 elif "Results Analysis" in subsection_title:
                     return """The system was validated manually to ensure correctness of core functionality. Each module was tested individually before integration. While automated testing infrastructure is under development, the current implementation has been verified to work as specified in the requirements."""
+        return None
+
+    def _subsection_brief(
+        self, chapter_title: str, project_summary: Dict, user_context: Dict
+    ) -> Dict[str, str]:
+        """Chapter-level parts of the subsection prompt: metadata, metrics, code and figure rules."""
         # Context Slicing - STRICT METADATA ONLY
         sliced_summary = self._slice_context(chapter_title, project_summary)
 
         # Security: Scrub AWS Keys & PII before dispatching to external LLM
         safe_summary = DataSanitizer.sanitize_payload(sliced_summary)
 
-        # Cache Check
-        cache_key = f"sub_{chapter_title}_{subsection_title}_{user_context.get('title', 'default')}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
-
         metrics_context = ""
         if chapter_title == "Results and Discussion" and user_context.get(
             "test_metrics_data"
@@ -187,16 +569,27 @@ class ReportGenerator:
         elif chapter_title == "Implementation":
             code_rule = f"5. **MANDATORY CORE EXTRACTION**: Because this is the Implementation chapter, you MUST output 3 to 5 codebase snippets explaining the core logic. To extract code, output a block object of type 'code_extraction' with the 'target_name' key. YOU MUST ONLY pick from these valid targets: {targets_str}."
 
-        prompt = f"""
+        return {
+            "metadata": json.dumps(safe_summary, indent=2),
+            "metrics_context": metrics_context,
+            "code_rule": code_rule,
+            "figure_rule": figure_rule,
+        }
+
+    @staticmethod
+    def _subsection_prompt(
+        chapter_title: str, subsection_title: str, brief: Dict[str, str], user_context: Dict
+    ) -> str:
+        return f"""
         [PROMPT_TEMPLATE_VERSION: 1.0.0 (Production Locked)]
         You are an expert Academic Editor and Strategic System Architect writing a formal B.Tech Project Report.
         
         Project Metadata (JSON):
-        {json.dumps(safe_summary, indent=2)}
+        {brief['metadata']}
         
         Context:
         Title: {user_context.get('title')}
-        Problem: {user_context.get('problem_statement')}{metrics_context}
+        Problem: {user_context.get('problem_statement')}{brief['metrics_context']}
         
         Task: Write the body text for the subsection: **"{subsection_title}"** (inside Chapter: "{chapter_title}").
 
@@ -216,20 +609,12 @@ class ReportGenerator:
         }}
         
         CRITICAL NARRATIVE CONSTRAINTS (HARD RULES):
-        1. **NO HEADINGS**: Do NOT output markdown headings (no #, ##, ###) in the paragraphs.
-        2. **NO RAW CODE OR FILE NAMES**: Absolutely DO NOT mention specific Python filenames within text paragraphs. Speak entirely in abstract system-level terminology.
-        3. **ACADEMIC STORYTELLING**: You must synthesize a cohesive academic narrative based on the project data. Discuss the theoretical dataset, the ETL pipeline, system architectures, etc.
-        4. **LITERATURE SURVEY**: If you are writing for Chapter 2, synthesize a highly authentic comparative analysis of existing systems. DO NOT insert ANY references, bibliographies, or IEEE citations.
-        {code_rule}
-        {figure_rule}
+        {_SUBSECTION_RULES}
+        {brief['code_rule']}
+        {brief['figure_rule']}
         7. **STRICT LENGTH**: The combined text of all paragraphs should be roughly 300-350 words. Do not trail off or include meta-commentary.
         """
 
-        result = generate_with_retry(self.model, prompt, response_format={"type": "json_object"})
-        self.cache[cache_key] = result
-        self._save_cache()
-        return result
-
     def generate_chapter_intro(
         self,
         chapter_title: str,
@@ -241,7 +626,40 @@ class ReportGenerator:
         Generates a brief 2-3 sentence introductory paragraph for a Chapter, highlighting what will be discussed,
         before transitioning into the specific subheadings.
         """
-        prompt = f"""
+        prompt = self._chapter_intro_prompt(chapter_title, subsections, user_context)
+        cache_key = self._hash_key("intro", prompt)
+        if cache_key in self.cache:
+            return self.cache[cache_key]
+
+        result = generate_with_retry(self.model, prompt, max_tokens=_INTRO_MAX_TOKENS)
+        self.cache[cache_key] = result
+        self._save_cache()
+        return result
+
+    async def agenerate_chapter_intro(
+        self,
+        async_model,
+        chapter_title: str,
+        subsections: list,
+        project_summary: Dict,
+        user_context: Dict,
+    ) -> str:
+        """generate_chapter_intro through an async client."""
+        prompt = self._chapter_intro_prompt(chapter_title, subsections, user_context)
+        cache_key = self._hash_key("intro", prompt)
+        if cache_key in self.cache:
+            return self.cache[cache_key]
+
+        result = await agenerate_with_retry(
+            async_model, prompt, governor=self.governor, max_tokens=_INTRO_MAX_TOKENS
+        )
+        self.cache[cache_key] = result
+        self._save_cache()
+        return result
+
+    @staticmethod
+    def _chapter_intro_prompt(chapter_title: str, subsections: list, user_context: Dict) -> str:
+        return f"""
         Task: Write a brief introductory paragraph for the Chapter: "{chapter_title}".
         This chapter will contain the following subsections: {", ".join(subsections)}.
         
@@ -252,7 +670,6 @@ class ReportGenerator:
         4. NO HEADINGS. Just pure text.
         5. DO NOT hallucinate features.
         """
-        return generate_with_retry(self.model, prompt)
 
     def fill_template(self, section_name: str, user_context: Dict) -> str:
         """
@@ -363,26 +780,29 @@ class ReportGenerator:
         
         Return JSON: {{ "problem_statement": "...", "objectives": "..." }}
         """
+        cache_key = self._hash_key("context", [TARGET_MODEL_VERSION, prompt])
         try:
-            text = generate_with_retry(self.model, prompt)
+            text = self.cache.get(cache_key) if LLM_CACHE else None
+            cached = text is not None
+            if not cached:
+                text = generate_with_retry(self.model, prompt)
             import re
 
             json_match = re.search(r"\{.*\}", text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(0))
-            return json.loads(text)
-        except:
+            project_context = json.loads(json_match.group(0) if json_match else text)
+            if LLM_CACHE and not cached:
+                self.cache[cache_key] = text
+                self._save_cache()
+            return project_context
+        except (RuntimeError, TypeError, ValueError):
             return {
                 "problem_statement": "Technical efficiency issue.",
                 "objectives": "- Optimize workflow.\n- Automate data.",
             }
 
-    def _build_prompt(
+    def _section_metadata(
         self, section_name: str, project_summary: Dict, user_context: Dict
-    ) -> str:
-        # CRITICAL TOKEN OPTIMIZATION: We no longer dump detailed code analysis.
-        # This prevents 429 Errors and forces system-level abstraction.
-
+    ) -> Dict:
         # Context Slicing specific to section
         sliced_summary = {}
         section_lower = section_name.lower()
@@ -414,11 +834,23 @@ class ReportGenerator:
                 for k, v in project_summary.items()
                 if k in ["project_type", "tech_stack", "algorithms_used"]
             }
+        return sliced_summary
 
-        style_instruction = ""
+    @staticmethod
+    def _style_instruction(user_context: Dict) -> str:
         if user_context.get("style_guide"):
-            style_instruction = f"IMPORTANT: Follow this writing style:\n{user_context.get('style_guide')[:1500]}"
+            return f"IMPORTANT: Follow this writing style:\n{user_context.get('style_guide')[:1500]}"
+        return ""
 
+    def _build_prompt(
+        self, section_name: str, project_summary: Dict, user_context: Dict
+    ) -> str:
+        # CRITICAL TOKEN OPTIMIZATION: We no longer dump detailed code analysis.
+        # This prevents 429 Errors and forces system-level abstraction.
+        sliced_summary = self._section_metadata(
+            section_name, project_summary, user_context
+        )
+        style_instruction = self._style_instruction(user_context)
         base_prompt = f"""
         You are an expert Academic Editor and Strategic System Architect writing the **{section_name}** section for a B.Tech Computer Science project report.
         
@@ -436,16 +868,45 @@ class ReportGenerator:
         Problem: {user_context.get('problem_statement')}
         Objectives: {user_context.get('objectives')}
         
-        CRITICAL NARRATIVE CONSTRAINTS (HARD RULES):
-        1. **NO RAW CODE OR FILE NAMES**: Absolutely DO NOT mention specific Python filenames like `formatting.py` or `.py` files at all. DO NOT dump raw code functions. Speak entirely in abstract system-level terminology (e.g., "The Preprocessing Module", "The Data Transformation Layer", etc.).
-        2. **ACADEMIC STORYTELLING**: Synthesize a cohesive academic narrative. Discuss the theoretical dataset defined above, the ETL pipeline architecture, system latency, and rule-based evaluation metrics. Do not invent ML metrics like F1 or Recall. Ensure you portray it as a deterministic Intelligent NLP-Assisted pipeline.
-        3. **INSTITUTIONAL OUTCOMES (PEO/PO/PSO/CO)**: If this section is PEO, PO, PSO, or CO, DO NOT refer to specific code, modules, or features of the project. Speak exclusively about high-level B.Tech Educational Outcomes (e.g., "Ability to design complex systems", "Demonstrating engineering life-long learning").
-        4. **NO FICTIONAL REFERENCES**: DO NOT hallucinate fake citations, author names (e.g., J. Smith), or fictional textbook references under any circumstances.
-        5. **NO HEADINGS**: Write ONLY pure academic paragraphs.
-        6. **STRICT LENGTH**: Exactly 300-350 words. Do not trail off or write meta-text.
+        {_SECTION_RULES}
         """
         return base_prompt
 
+    def _build_batch_prompt(
+        self, section_names: List[str], project_summary: Dict, user_context: Dict
+    ) -> str:
+        """Same brief as _build_prompt, for several sections answered as one JSON object."""
+        style_instruction = self._style_instruction(user_context)
+        section_briefs = "\n".join(
+            f"        ### {name}\n        Project Metadata (JSON): "
+            + json.dumps(self._section_metadata(name, project_summary, user_context))
+            for name in section_names
+        )
+        return f"""
+        You are an expert Academic Editor and Strategic System Architect writing {len(section_names)} sections for a B.Tech Computer Science project report.
+        
+        {style_instruction}
+        
+        Sections to write, each with its own project metadata:
+{section_briefs}
+        
+        Evaluation Metrics (Enforced Deterministic Base):
+        - Dataset: 50 unstructured academic drafts
+        - Performance Metrics: Parsing Accuracy, Formatting Consistency Score, Execution Latency vs Manual Typesetting
+        
+        User Context:
+        Title: {user_context.get('title')}
+        Problem: {user_context.get('problem_statement')}
+        Objectives: {user_context.get('objectives')}
+        
+        Apply these rules to EVERY section independently:
+        {_SECTION_RULES}
+        
+        OUTPUT FORMAT:
+        Return ONLY a JSON object of the form {{"sections": {{"<section name>": "<section text>"}}}}
+        with exactly one entry per section above, using the section names verbatim as keys.
+        """
+
     def _slice_context(self, chapter_title: str, project_summary: Dict) -> Dict:
         # Helper to slice context based on chapter
         full_summary = project_summary
@@ -1,7 +1,6 @@
 import os
 import json
-from groq import Groq
-from .utils import generate_with_retry
+from .utils import generate_with_retry, get_client
 
 
 def structure_text(raw_text, api_key=None, style_name="Standard"):
@@ -13,7 +12,7 @@ def structure_text(raw_text, api_key=None, style_name="Standard"):
             "Groq API Key is missing. Please provide it or set GROQ_API_KEY environment variable."
         )
 
-    client = Groq(api_key=api_key)
+    client = get_client(api_key)
 
     # Style-specific casing rules
     casing_instruction = "Follow standard capitalization rules."
@@ -1,11 +1,36 @@
+import os
 import re
 import time
+import json
+import asyncio
+import hashlib
 import random
 import logging
+import threading
+from collections import OrderedDict
 import groq
+import httpx
+from .rate_limiter import TokenBucket, estimate_tokens
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+__all__ = [
+    "telemetry_data",
+    "TARGET_MODEL_VERSION",
+    "BACKOFF_CAP",
+    "MAX_RETRY_WAIT",
+    "RPM_LIMIT",
+    "TPM_LIMIT",
+    "RESPONSE_CACHE_TTL_SECS",
+    "REQUEST_TIMEOUT",
+    "get_client",
+    "chat_request_body",
+    "make_async_client",
+    "close_clients",
+    "generate_with_retry",
+    "agenerate_with_retry",
+    "generate_many",
+]
+
+# Logging is configured by the entry points, never at import time
 logger = logging.getLogger(__name__)
 
 
@@ -19,8 +44,256 @@ telemetry_data = {
 # Production AI Settings
 TARGET_MODEL_VERSION = "llama-3.1-8b-instant"
 
+# Static part of every chat completion request
+_BASE_KWARGS = {
+    "model": TARGET_MODEL_VERSION,
+    "temperature": 0.0,
+    "max_tokens": 2048,
+    "top_p": 0.05,
+    "seed": 42,
+    "stop": None,
+    "stream": False,
+}
+
+# Server-suggested wait, e.g. "Please try again in 7.5s"
+_RATE_LIMIT_RE = re.compile(r"try again in (\d+(?:\.\d+)?)s")
+
+# Backoff limits: no single sleep above BACKOFF_CAP, and no more than
+# MAX_RETRY_WAIT seconds of sleeping in total for one prompt
+BACKOFF_CAP = 60.0
+MAX_RETRY_WAIT = 300.0
+
+# Groq quotas for TARGET_MODEL_VERSION, paced client-side so bursts don't
+# turn into 429s (0 disables). Token quotas differ too much between accounts
+# to guess, so the TPM schedule is off unless GROQ_TPM_LIMIT is set.
+RPM_LIMIT = int(os.getenv("GROQ_RPM_LIMIT", "30"))
+TPM_LIMIT = int(os.getenv("GROQ_TPM_LIMIT", "0"))
+_limiter = TokenBucket(rpm=RPM_LIMIT, tpm=TPM_LIMIT)
+
+
+def _completion_cap(max_tokens=None):
+    return max_tokens or _BASE_KWARGS["max_tokens"]
+
+
+def _quota_tokens(prompt, max_tokens=None):
+    """TPM cost reserved for one request: the prompt plus its completion cap,
+    since Groq counts both and a completion may run to max_tokens."""
+    return estimate_tokens(prompt) + _completion_cap(max_tokens)
+
+
+def _refund_unused(completion, max_tokens=None):
+    """Gives the part of the completion cap the response didn't use back to the TPM schedule."""
+    used = getattr(getattr(completion, "usage", None), "completion_tokens", None)
+    if isinstance(used, int):
+        _limiter.refund(_completion_cap(max_tokens) - used)
+
+
+# Exact-match response cache (LRU with TTL). Off unless RESPONSE_CACHE_TTL_SECS > 0.
+RESPONSE_CACHE_TTL_SECS = float(os.getenv("RESPONSE_CACHE_TTL_SECS", "0"))
+RESPONSE_CACHE_MAX = 500
+_response_cache = OrderedDict()  # key -> (text, expires_at)
+_response_cache_lock = threading.Lock()
+
+
+def _cache_key(prompt, response_format, max_tokens=None):
+    payload = TARGET_MODEL_VERSION + "\0" + prompt
+    if response_format:
+        payload += "\0" + json.dumps(response_format, sort_keys=True)
+    if max_tokens:
+        payload += f"\0{max_tokens}"
+    return hashlib.sha256(payload.encode("utf-8")).digest()
+
+
+def _cache_get(key):
+    if RESPONSE_CACHE_TTL_SECS <= 0:
+        return None
+    with _response_cache_lock:
+        hit = _response_cache.get(key)
+        if hit is None:
+            return None
+        if time.monotonic() >= hit[1]:
+            del _response_cache[key]
+            return None
+        _response_cache.move_to_end(key)
+        return hit[0]
+
+
+def _cache_put(key, text):
+    if RESPONSE_CACHE_TTL_SECS <= 0:
+        return
+    with _response_cache_lock:
+        _response_cache[key] = (text, time.monotonic() + RESPONSE_CACHE_TTL_SECS)
+        _response_cache.move_to_end(key)
+        if len(_response_cache) > RESPONSE_CACHE_MAX:
+            _response_cache.popitem(last=False)
+
+
+# One keep-alive connection pool per API key, shared by every caller, so
+# successive requests skip the TCP/TLS handshake. HTTP/2 needs the optional h2 package.
+try:
+    import h2  # noqa: F401
+
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
 
-def generate_with_retry(model, prompt, config=None, max_retries=10, base_delay=5, response_format=None):
+_HTTP_LIMITS = httpx.Limits(
+    max_connections=64, max_keepalive_connections=32, keepalive_expiry=60
+)
+# Per-attempt bound, so a stalled response fails into the retry loop after 30s
+# rather than the SDK's 60s. Retries are left to generate_with_retry and
+# agenerate_with_retry; SDK retries would nest inside them (3x the attempts).
+REQUEST_TIMEOUT = httpx.Timeout(float(os.getenv("GROQ_REQUEST_TIMEOUT", "30")), connect=5.0)
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key):
+    """Returns the shared groq.Groq client for ``api_key``."""
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = groq.Groq(
+                api_key=api_key,
+                timeout=REQUEST_TIMEOUT,
+                max_retries=0,
+                http_client=httpx.Client(http2=_HTTP2, limits=_HTTP_LIMITS),
+            )
+            _clients[api_key] = client
+        return client
+
+
+def make_async_client(api_key):
+    """
+    New groq.AsyncGroq backed by a pooled httpx.AsyncClient. Async pools are
+    bound to one event loop, so create one per loop (e.g. per generate_many run)
+    and close it with ``await client.close()``.
+    """
+    return groq.AsyncGroq(
+        api_key=api_key,
+        timeout=REQUEST_TIMEOUT,
+        max_retries=0,
+        http_client=httpx.AsyncClient(http2=_HTTP2, limits=_HTTP_LIMITS),
+    )
+
+
+def close_clients():
+    """Closes every shared sync client and its connection pool."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+def chat_request_body(prompt, response_format=None, max_tokens=None):
+    """
+    Chat completion parameters for one prompt, inline or as a batch file line.
+    ``max_tokens`` lowers the completion cap for prompts with short answers.
+    """
+    kwargs = {
+        **_BASE_KWARGS,
+        "messages": [{"role": "user", "content": prompt}],
+    }
+    if max_tokens:
+        kwargs["max_tokens"] = max_tokens
+    if response_format:
+        kwargs["response_format"] = response_format
+    return kwargs
+
+
+def _server_wait(e, error_str):
+    """Wait the server asked for: Retry-After header first, then the message text."""
+    headers = getattr(getattr(e, "response", None), "headers", None)
+    if headers:
+        try:
+            retry_after = float(headers.get("retry-after") or 0)
+        except (TypeError, ValueError):
+            retry_after = 0
+        if retry_after > 0:
+            return retry_after
+
+    match = _RATE_LIMIT_RE.search(error_str)
+    if match:
+        return float(match.group(1))
+    return None
+
+
+def _retry_delay(e, attempt, max_retries, base_delay, deadline):
+    """
+    Classifies a failed attempt. Returns how long to sleep before the next one,
+    or raises RuntimeError if the error is not retriable, retries are exhausted,
+    or the sleep would run past ``deadline`` (a time.monotonic() value).
+    Must be called from inside the ``except`` block that caught ``e``.
+    """
+    error_str = str(e)
+    error_low = error_str.casefold()
+    status_code = getattr(e, "status_code", None)
+
+    # Check if this error is retriable
+    is_rate_limit = (
+        isinstance(e, groq.RateLimitError)
+        or status_code == 429
+        or "429" in error_str
+        or "rate limit" in error_low
+        or "too many requests" in error_low
+    )
+
+    is_server_error = (
+        isinstance(e, (groq.InternalServerError, groq.APIConnectionError))
+        or (isinstance(status_code, int) and status_code >= 500)
+        or "503" in error_str
+        or "500" in error_str
+        or "502" in error_str
+        or "504" in error_str
+        or "over capacity" in error_low
+        or "internal server error" in error_low
+    )
+
+    if not (is_rate_limit or is_server_error):
+        logger.error(f"Non-retriable error: {e}")
+        raise RuntimeError(f"API Error: {error_str}")
+
+    if is_rate_limit:
+        telemetry_data["total_rate_limits"] += 1
+
+    if attempt == max_retries - 1:
+        logger.error(f"Max retries reached for prompt. Last error: {e}")
+        raise RuntimeError(f"API Error: Exhausted maximum retries ({max_retries}). {error_str}")
+
+    # Determine delay
+    wait_time = _server_wait(e, error_str)
+    if wait_time is not None:
+        if is_rate_limit:
+            # Pre-throttle every other caller too, not just this retry loop
+            _limiter.penalize(wait_time)
+        delay = wait_time + 1.0
+        logger.warning(
+            f"Retry triggered by API message. Wait of {wait_time:.2f}s. Sleeping for {delay:.2f}s."
+        )
+    else:
+        # Full-jitter exponential backoff for 429 or 5xx
+        delay = random.uniform(0, min(BACKOFF_CAP, base_delay * (2**attempt)))
+
+        if is_server_error:
+            # Be slightly more patient for server-side issues
+            delay += 2.0
+            logger.warning(
+                f"Server error / Over capacity hit (Attempt {attempt+1}/{max_retries}). Retrying in {delay:.2f}s..."
+            )
+        else:
+            logger.warning(
+                f"Rate limit hit (Attempt {attempt+1}/{max_retries}). Retrying in {delay:.2f}s..."
+            )
+
+    if time.monotonic() + delay > deadline:
+        logger.error(f"Retry wait budget ({MAX_RETRY_WAIT:.0f}s) exhausted. Last error: {e}")
+        raise RuntimeError(f"API Error: Retry wait budget exhausted. {error_str}")
+
+    print(f"API Busy/Error ({'503' if is_server_error else '429'}) — waiting {delay:.1f}s...")
+    return delay
+
+
+def generate_with_retry(model, prompt, config=None, max_retries=10, base_delay=5, response_format=None, max_tokens=None):
     """
     Generates content using the provided AI model (Groq/Llama 3) with exponential backoff for rate limits.
 
@@ -31,6 +304,7 @@ def generate_with_retry(model, prompt, config=None, max_retries=10, base_delay=5
         max_retries: Maximum number of retries (default 5).
         base_delay: Initial delay in seconds (default 2).
         response_format: Optional JSON enforcement format (e.g. {"type": "json_object"}).
+        max_tokens: Optional completion cap below the default 2048.
 
     Returns:
         The generated text content.
@@ -39,27 +313,26 @@ def generate_with_retry(model, prompt, config=None, max_retries=10, base_delay=5
         RuntimeError: If generation fails after all retries or hits a non-retriable error.
     """
     global telemetry_data
+    cache_key = _cache_key(prompt, response_format, max_tokens)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
     telemetry_data["total_api_calls"] += 1
     
+    deadline = time.monotonic() + MAX_RETRY_WAIT
     for attempt in range(max_retries):
         try:
             # Check if model object has 'chat' attribute (Groq client)
             if hasattr(model, "chat"):
-                kwargs = {
-                    "model": TARGET_MODEL_VERSION,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.0,
-                    "max_tokens": 2048,
-                    "top_p": 0.05,
-                    "seed": 42,
-                    "stop": None,
-                    "stream": False,
-                }
-                if response_format:
-                    kwargs["response_format"] = response_format
-
-                completion = model.chat.completions.create(**kwargs)
-                return completion.choices[0].message.content
+                _limiter.acquire(_quota_tokens(prompt, max_tokens))
+                completion = model.chat.completions.create(
+                    **chat_request_body(prompt, response_format, max_tokens)
+                )
+                _refund_unused(completion, max_tokens)
+                text = completion.choices[0].message.content
+                _cache_put(cache_key, text)
+                return text
             else:
                 # Fallback for other potential clients or mocked objects
                 if hasattr(model, "generate_content"):
@@ -69,61 +342,81 @@ def generate_with_retry(model, prompt, config=None, max_retries=10, base_delay=5
                     raise ValueError("Unsupported model client type")
 
         except Exception as e:
-            error_str = str(e)
-            
-            # Check if this error is retriable
-            is_rate_limit = (
-                "429" in error_str
-                or "rate limit" in error_str.lower()
-                or "too many requests" in error_str.lower()
-            )
-            
-            is_server_error = (
-                "503" in error_str
-                or "500" in error_str
-                or "502" in error_str
-                or "504" in error_str
-                or "over capacity" in error_str.lower()
-                or "internal server error" in error_str.lower()
-            )
-
-            if is_rate_limit or is_server_error:
-                if is_rate_limit:
-                    telemetry_data["total_rate_limits"] += 1
+            delay = _retry_delay(e, attempt, max_retries, base_delay, deadline)
+            time.sleep(delay)
+            telemetry_data["total_retries"] += 1
                 
-                if attempt == max_retries - 1:
-                    logger.error(f"Max retries reached for prompt. Last error: {e}")
-                    raise RuntimeError(f"API Error: Exhausted maximum retries ({max_retries}). {error_str}")
-
-                # Determine delay
-                wait_time = 0
-                match = re.search(r"try again in (\d+(\.\d+)?)s", error_str)
-                if match:
-                    wait_time = float(match.group(1))
-                    delay = wait_time + 1.0
-                    logger.warning(
-                        f"Retry triggered by API message. Wait of {wait_time:.2f}s. Sleeping for {delay:.2f}s."
-                    )
-                else:
-                    # Generic exponential backoff for 429 or 5xx
-                    delay = (base_delay * (2**attempt)) + random.uniform(0.5, 1.5)
-                    
-                    if is_server_error:
-                        # Be slightly more patient for server-side issues
-                        delay += 2.0
-                        logger.warning(
-                            f"Server error / Over capacity hit (Attempt {attempt+1}/{max_retries}). Retrying in {delay:.2f}s..."
-                        )
-                    else:
-                        logger.warning(
-                            f"Rate limit hit (Attempt {attempt+1}/{max_retries}). Retrying in {delay:.2f}s..."
-                        )
-
-                print(f"API Busy/Error ({'503' if is_server_error else '429'}) — waiting {delay:.1f}s...")
-                time.sleep(delay)
-                telemetry_data["total_retries"] += 1
+    raise RuntimeError("Unexpected failure: exited retry loop without returning or raising.")
+
+
+async def _governed_create(async_model, governor, body):
+    """One completion call admitted by ``governor``, with its outcome fed back."""
+    await governor.wait()
+    started = time.monotonic()
+    headers = status = None
+    try:
+        raw = await async_model.chat.completions.with_raw_response.create(**body)
+        headers, status = raw.headers, raw.status_code
+        return await raw.parse()
+    except Exception as e:
+        headers = getattr(getattr(e, "response", None), "headers", None)
+        status = getattr(e, "status_code", None)
+        raise
+    finally:
+        hold = governor.observe(headers, time.monotonic() - started, status)
+        if hold > 0:
+            _limiter.penalize(hold)
+        governor.release()
+
+
+async def agenerate_with_retry(async_model, prompt, max_retries=10, base_delay=5, response_format=None, governor=None, max_tokens=None):
+    """
+    Async counterpart of generate_with_retry for a ``groq.AsyncGroq`` client.
+    Backoff waits use asyncio.sleep, so other prompts keep running meanwhile.
+    With a ``rate_limiter.RateLimitGovernor``, each attempt also waits for a
+    slot in its adaptive concurrency window and reports the response back.
+
+    Raises:
+        RuntimeError: If generation fails after all retries or hits a non-retriable error.
+    """
+    cache_key = _cache_key(prompt, response_format, max_tokens)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    telemetry_data["total_api_calls"] += 1
+
+    deadline = time.monotonic() + MAX_RETRY_WAIT
+    for attempt in range(max_retries):
+        try:
+            await _limiter.acquire_async(_quota_tokens(prompt, max_tokens))
+            body = chat_request_body(prompt, response_format, max_tokens)
+            if governor is None:
+                completion = await async_model.chat.completions.create(**body)
             else:
-                logger.error(f"Non-retriable error: {e}")
-                raise RuntimeError(f"API Error: {error_str}")
-                
+                completion = await _governed_create(async_model, governor, body)
+            _refund_unused(completion, max_tokens)
+            text = completion.choices[0].message.content
+            _cache_put(cache_key, text)
+            return text
+        except Exception as e:
+            delay = _retry_delay(e, attempt, max_retries, base_delay, deadline)
+            await asyncio.sleep(delay)
+            telemetry_data["total_retries"] += 1
+
     raise RuntimeError("Unexpected failure: exited retry loop without returning or raising.")
+
+
+async def generate_many(async_model, prompts, concurrency=8, **kwargs):
+    """
+    Runs agenerate_with_retry over ``prompts`` with at most ``concurrency``
+    requests in flight. Results come back in prompt order; the first failure
+    propagates.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one(prompt):
+        async with semaphore:
+            return await agenerate_with_retry(async_model, prompt, **kwargs)
+
+    return await asyncio.gather(*(_one(p) for p in prompts))
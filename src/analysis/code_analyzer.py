@@ -1,19 +1,90 @@
 import os
+import re
+import hashlib
 import zipfile
 import tempfile
-import ast
 import shutil
+import dataclasses
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
 from pathlib import Path
-from typing import List, Dict, Set
+from types import MappingProxyType
+from typing import List, Dict, Set, Optional, Tuple
 from .project_summary import ProjectSummary
-from .code_parser import CodeParser, merge_analysis_results
+from .code_parser import (
+    CodeParser,
+    CodeAnalysisResult,
+    ModuleFacts,
+    merge_analysis_results,
+)
+from .ts_code_parser import TSCodeParser, TREE_SITTER_AVAILABLE
+
+# (parse result, per-file facts, has a __main__ guard)
+ParsedSource = Tuple[CodeAnalysisResult, Optional[ModuleFacts], bool]
+
+
+# Either quote style, one scan of the source
+_MAIN_RE = re.compile(r"""if __name__ == (['"])__main__\1:""")
+
+# Common ML model names, matched case-insensitively inside call names
+_ML_KEYWORDS = {
+    key.lower(): key
+    for key in (
+        "RandomForest",
+        "LinearRegression",
+        "SVM",
+        "KMeans",
+        "CNN",
+        "LSTM",
+        "ResNet",
+        "YOLO",
+    )
+}
+_ML_RE = re.compile("|".join(map(re.escape, _ML_KEYWORDS)), re.IGNORECASE)
+
+
+def _is_entry_point(content: str) -> bool:
+    return _MAIN_RE.search(content) is not None
+
+
+def _parse_source(
+    code_parser: CodeParser, file_path: Path, raw: bytes
+) -> Optional[ParsedSource]:
+    """
+    Decodes and parses one source file. Module-level so it can be shipped to
+    worker processes; only the raw bytes go out and only the results come back.
+    """
+    try:
+        content = raw.decode("utf-8", errors="ignore")
+        result, facts = code_parser.parse_source(file_path, content)
+        return result, facts, _is_entry_point(content)
+    except Exception:
+        return None
+
+
+def _rebind(parsed: Optional[ParsedSource], file_path: Path) -> Optional[ParsedSource]:
+    """Copy of another file's parse result (identical content), attributed to file_path."""
+    if parsed is None:
+        return None
+    result, facts, is_entry_point = parsed
+    key = str(file_path)
+    clone = dataclasses.replace(
+        result,
+        files_analyzed=[key],
+        functions=list(result.functions),
+        classes=list(result.classes),
+        imports=list(result.imports),
+        detected_patterns=list(result.detected_patterns),
+        algorithm_keywords=list(result.algorithm_keywords),
+        code_snippets={key: snippets for snippets in result.code_snippets.values()},
+    )
+    return clone, facts, is_entry_point
 
 
 class CodeAnalyzer:
-    def __init__(self, max_files: int = 50, max_size_mb: int = 5):
-        self.max_files = max_files
-        self.max_size_mb = max_size_mb
-        self.ignored_dirs = {
+    IGNORED_DIRS = frozenset(
+        {
             "node_modules",
             "venv",
             ".venv",
@@ -24,7 +95,30 @@ class CodeAnalyzer:
             ".idea",
             ".vscode",
         }
-        self.code_parser = CodeParser()  # AST-based code parser
+    )
+
+    LANG_MAP = MappingProxyType(
+        {
+            ".py": "Python",
+            ".js": "JavaScript",
+            ".ts": "TypeScript",
+            ".java": "Java",
+            ".cpp": "C++",
+            ".c": "C",
+            ".html": "HTML",
+            ".css": "CSS",
+            ".ipynb": "Jupyter Notebook",
+        }
+    )
+
+    def __init__(self, max_files: int = 50, max_size_mb: int = 5):
+        self.max_files = max_files
+        self.max_size_mb = max_size_mb
+        self.ignored_dirs = self.IGNORED_DIRS
+        # tree-sitter backed parser when the optional dependency is installed
+        self.code_parser = TSCodeParser() if TREE_SITTER_AVAILABLE else CodeParser()
+        # Below this many Python files, worker start-up costs more than it saves
+        self.parallel_threshold = 8
 
     def analyze_zip(self, zip_file) -> ProjectSummary:
         """
@@ -60,11 +154,12 @@ class CodeAnalyzer:
         return summary
 
     def _analyze_in_memory(self, zip_ref: zipfile.ZipFile, summary: ProjectSummary):
-        file_count = 0
-        analysis_results = []
-
+        # Pass 1: pick the files to analyze and decompress Python sources once
+        # (decoding happens alongside parsing, in the workers)
+        entries = []  # (file_path, has_source) in archive order
+        sources = []  # (file_path, raw bytes) for the Python files only
         for file_info in zip_ref.infolist():
-            if file_count >= self.max_files:
+            if len(entries) >= self.max_files:
                 break
 
             if file_info.is_dir():
@@ -73,63 +168,115 @@ class CodeAnalyzer:
             file_path = Path(file_info.filename)
 
             # Skip ignored directories
-            if any(part in self.ignored_dirs for part in file_path.parts):
+            if not self.ignored_dirs.isdisjoint(file_path.parts):
                 continue
 
-            file_count += 1
+            raw = None
+            if file_path.suffix.lower() == ".py":
+                try:
+                    # Read completely in-memory
+                    raw = zip_ref.read(file_info)
+                except Exception:
+                    pass  # nosec B110
+            entries.append((file_path, raw is not None))
+            if raw is not None:
+                sources.append((file_path, raw))
+
+        # Pass 2: decode and AST-parse all sources up front (in parallel for larger projects)
+        parsed = iter(self._parse_sources(sources))
+        del sources  # Raw bytes are not needed past this point
+
+        # Pass 3: fold everything into the summary in archive order
+        analysis_results = []
+        for file_path, has_source in entries:
+            parsed_source = next(parsed) if has_source else None
             analysis_result = self._analyze_file_memory(
-                file_info, zip_ref, file_path, summary
+                file_path, parsed_source, summary
             )
             if analysis_result:
                 analysis_results.append(analysis_result)
 
-        summary.total_files = file_count
+        summary.total_files = len(entries)
 
         if analysis_results:
             summary.detailed_analysis = merge_analysis_results(analysis_results)
 
         self._infer_project_type(summary)
 
+    def _parse_sources(
+        self, sources: List[Tuple[Path, bytes]]
+    ) -> List[Optional[ParsedSource]]:
+        """Parses every source, but identical contents (empty __init__.py files,
+        vendored copies) only once; duplicates get a re-attributed copy."""
+        first_seen: Dict[bytes, int] = {}
+        unique_sources = []
+        slots = []
+        for file_path, raw in sources:
+            digest = hashlib.blake2b(raw, digest_size=16).digest()
+            if digest not in first_seen:
+                first_seen[digest] = len(unique_sources)
+                unique_sources.append((file_path, raw))
+            slots.append(first_seen[digest])
+
+        parsed = self._parse_unique(unique_sources)
+        return [
+            (
+                parsed[slot]
+                if unique_sources[slot][0] == file_path
+                else _rebind(parsed[slot], file_path)
+            )
+            for (file_path, _), slot in zip(sources, slots)
+        ]
+
+    def _parse_unique(
+        self, sources: List[Tuple[Path, bytes]]
+    ) -> List[Optional[ParsedSource]]:
+        """Runs CodeParser over every source, fanning out to worker processes
+        once there are enough files to amortize the pool start-up."""
+        if len(sources) >= self.parallel_threshold:
+            workers = min(len(sources), os.cpu_count() or 1)
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    return list(
+                        pool.map(
+                            _parse_source,
+                            repeat(self.code_parser),
+                            [file_path for file_path, _ in sources],
+                            [raw for _, raw in sources],
+                        )
+                    )
+            except (OSError, NotImplementedError, BrokenProcessPool):
+                pass  # No usable process pool here; fall back to in-process parsing
+
+        return [
+            _parse_source(self.code_parser, file_path, raw)
+            for file_path, raw in sources
+        ]
+
     def _analyze_file_memory(
         self,
-        file_info: zipfile.ZipInfo,
-        zip_ref: zipfile.ZipFile,
         file_path: Path,
+        parsed_source: Optional[ParsedSource],
         summary: ProjectSummary,
-    ):
+    ) -> Optional[CodeAnalysisResult]:
         extension = file_path.suffix.lower()
 
-        lang_map = {
-            ".py": "Python",
-            ".js": "JavaScript",
-            ".ts": "TypeScript",
-            ".java": "Java",
-            ".cpp": "C++",
-            ".c": "C",
-            ".html": "HTML",
-            ".css": "CSS",
-            ".ipynb": "Jupyter Notebook",
-        }
-
-        if extension in lang_map:
-            lang = lang_map[extension]
+        lang = self.LANG_MAP.get(extension)
+        if lang is not None:
             summary.languages[lang] = summary.languages.get(lang, 0) + 1
-            if lang not in summary.tech_stack:
+            if lang not in summary._tech_stack_set:
+                summary._tech_stack_set.add(lang)
                 summary.tech_stack.append(lang)
 
-        analysis_result = None
-        if extension == ".py":
+        if extension == ".py" and parsed_source is not None:
+            analysis_result, facts, is_entry_point = parsed_source
             try:
-                # Read completely in-memory
-                content = zip_ref.read(file_info).decode("utf-8", errors="ignore")
-
-                analysis_result = self.code_parser.parse_file(file_path, content)
-                self._analyze_python_ast(content, file_path.name, summary)
+                if facts is not None:
+                    self._analyze_python_ast(
+                        analysis_result, facts, file_path.name, summary
+                    )
 
-                if (
-                    'if __name__ == "__main__":' in content
-                    or "if __name__ == '__main__':" in content
-                ):
+                if is_entry_point:
                     summary.entry_points.append(file_path.name)
 
                 if (
@@ -142,11 +289,11 @@ class CodeAnalyzer:
             except Exception:
                 pass  # nosec B110
 
-        return analysis_result
+            return analysis_result
+        return None
 
-    def _get_summary_doc(self, node):
+    def _get_summary_doc(self, doc: str):
         try:
-            doc = ast.get_docstring(node)
             if not doc:
                 return ""
             # Sanitize
@@ -164,62 +311,47 @@ class CodeAnalyzer:
             return ""
 
     def _analyze_python_ast(
-        self, content: str, file_name: str, summary: ProjectSummary
+        self,
+        analysis_result: CodeAnalysisResult,
+        facts: ModuleFacts,
+        file_name: str,
+        summary: ProjectSummary,
     ):
-        try:
-            tree = ast.parse(content)
-
-            classes = []
-            functions = []
-
-            for node in ast.walk(tree):
-                # Imports
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        self._add_library(alias.name, summary)
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        self._add_library(node.module, summary)
-
-                # ML Libraries & Algorithms Check (Heuristic)
-                self._check_ml_patterns(node, summary)
-
-                # Structure Extraction
-                if isinstance(node, ast.ClassDef):
-                    doc_summary = self._get_summary_doc(node)
-                    classes.append(
-                        f"{node.name} ({doc_summary})" if doc_summary else node.name
-                    )
-                elif isinstance(node, ast.FunctionDef):
-                    # Check if it's a method (heuristic: indentation or name)
-                    # ast.walk doesn't give context. For summary, flat list is okay.
-                    if not node.name.startswith("_") or node.name == "__init__":
-                        doc_summary = self._get_summary_doc(node)
-                        functions.append(
-                            f"{node.name} ({doc_summary})" if doc_summary else node.name
-                        )
-
-            # Add to detailed modules list
-            if classes or functions:
-                module_info = f"File: {file_name}\n"
-                if classes:
-                    module_info += (
-                        f"  Classes:\n    - " + "\n    - ".join(classes) + "\n"
-                    )
-                if functions:
-                    # Limit to 15 important functions
-                    shown_funcs = functions[:15]
-                    module_info += f"  Functions:\n    - " + "\n    - ".join(
-                        shown_funcs
-                    )
-                    if len(functions) > 15:
-                        module_info += f"\n    ... (+{len(functions)-15} more)"
-                    module_info += "\n"
-
-                summary.modules.append(module_info)
-
-        except SyntaxError:
-            pass
+        # Everything here comes from CodeParser's single AST pass
+        for imp in analysis_result.imports:
+            self._add_library(imp, summary)
+
+        # ML Libraries & Algorithms Check (Heuristic)
+        for name in facts.call_names:
+            self._check_ml_patterns(name, summary)
+
+        # Structure Extraction
+        classes = []
+        for name, doc in facts.classes:
+            doc_summary = self._get_summary_doc(doc)
+            classes.append(f"{name} ({doc_summary})" if doc_summary else name)
+
+        functions = []
+        for name, doc in facts.functions:
+            # Flat list of functions and methods is okay for the summary
+            if not name.startswith("_") or name == "__init__":
+                doc_summary = self._get_summary_doc(doc)
+                functions.append(f"{name} ({doc_summary})" if doc_summary else name)
+
+        # Add to detailed modules list
+        if classes or functions:
+            module_info = f"File: {file_name}\n"
+            if classes:
+                module_info += f"  Classes:\n    - " + "\n    - ".join(classes) + "\n"
+            if functions:
+                # Limit to 15 important functions
+                shown_funcs = functions[:15]
+                module_info += f"  Functions:\n    - " + "\n    - ".join(shown_funcs)
+                if len(functions) > 15:
+                    module_info += f"\n    ... (+{len(functions)-15} more)"
+                module_info += "\n"
+
+            summary.modules.append(module_info)
 
     def _add_library(self, lib_name: str, summary: ProjectSummary):
         if not lib_name:
@@ -242,36 +374,17 @@ class CodeAnalyzer:
             "cv2",
         }
         root_lib = lib_name.split(".")[0]
-        if root_lib in major_libs and root_lib not in summary.tech_stack:
+        if root_lib in major_libs and root_lib not in summary._tech_stack_set:
+            summary._tech_stack_set.add(root_lib)
             summary.tech_stack.append(root_lib)
 
-    def _check_ml_patterns(self, node: ast.AST, summary: ProjectSummary):
-        # Heuristic to detect algorithm usage
-        name = ""
-        if isinstance(node, ast.Call):
-            if isinstance(node.func, ast.Attribute) and hasattr(node.func, "attr"):
-                name = node.func.attr
-            elif isinstance(node.func, ast.Name):
-                name = node.func.id
-
-            if name:
-                # Common ML model names
-                ml_keywords = {
-                    "RandomForest",
-                    "LinearRegression",
-                    "SVM",
-                    "KMeans",
-                    "CNN",
-                    "LSTM",
-                    "ResNet",
-                    "YOLO",
-                }
-                for key in ml_keywords:
-                    if (
-                        key.lower() in name.lower()
-                        and key not in summary.algorithms_used
-                    ):
-                        summary.algorithms_used.append(key)
+    def _check_ml_patterns(self, name: str, summary: ProjectSummary):
+        # Heuristic to detect algorithm usage from a called function/method name
+        for match in _ML_RE.finditer(name):
+            key = _ML_KEYWORDS[match.group(0).lower()]
+            if key not in summary._algorithms_set:
+                summary._algorithms_set.add(key)
+                summary.algorithms_used.append(key)
 
     def _infer_project_type(self, summary: ProjectSummary):
         # Simple heuristic
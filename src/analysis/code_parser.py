@@ -4,12 +4,13 @@ Part of Phase 2: Real Code Analysis
 """
 
 import ast
+import re
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionInfo:
     """Information about a detected function."""
 
@@ -22,7 +23,7 @@ class FunctionInfo:
     has_recursion: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class ClassInfo:
     """Information about a detected class."""
 
@@ -33,14 +34,14 @@ class ClassInfo:
     methods: List[FunctionInfo] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class CodeAnalysisResult:
     """Comprehensive code analysis result - single source of truth."""
 
     files_analyzed: List[str] = field(default_factory=list)
     functions: List[FunctionInfo] = field(default_factory=list)
     classes: List[ClassInfo] = field(default_factory=list)
-    imports: List[str] = field(default_factory=list)
+    imports: List[str] = field(default_factory=list)  # Unique, first-seen order
     detected_patterns: List[str] = field(default_factory=list)
     algorithm_keywords: List[str] = field(default_factory=list)
     code_snippets: Dict[str, List[Tuple[int, int, str]]] = field(
@@ -48,6 +49,106 @@ class CodeAnalysisResult:
     )  # file -> [(start, end, code)]
 
 
+@dataclass(slots=True)
+class ModuleFacts:
+    """Per-file facts CodeAnalyzer folds into the ProjectSummary."""
+
+    call_names: List[str] = field(default_factory=list)  # Unique, first-seen order
+    classes: List[Tuple[str, str]] = field(default_factory=list)  # (name, docstring)
+    functions: List[Tuple[str, str]] = field(default_factory=list)  # (name, docstring)
+
+
+class _UnifiedVisitor:
+    """
+    Collects everything CodeParser and CodeAnalyzer need from one module in a
+    single traversal. Nodes are visited breadth-first, in the same order as
+    ast.walk, so first-seen ordering of imports and names is unchanged.
+    Handlers are looked up by node type in _HANDLERS (one dict hit per node).
+    """
+
+    def __init__(self, tree: ast.Module):
+        self.imports: Dict[str, None] = {}
+        self.call_names: Dict[str, None] = {}
+        self.classes: List[ast.ClassDef] = []
+        self.functions: List[ast.FunctionDef] = []
+        self.recursive: Set[str] = (
+            set()
+        )  # Top-level functions that call themselves directly
+        self.has_loops = False
+        self.has_sorting = False
+
+        self._top_level = {id(node) for node in tree.body}
+        self._owner: Optional[str] = None  # Enclosing top-level function
+
+        # Breadth-first over a plain list with a read index (no deque churn);
+        # owners[i] is the enclosing top-level function of nodes[i]
+        handlers = self._HANDLERS
+        nodes: List[ast.AST] = [tree]
+        owners: List[Optional[str]] = [None]
+        i = 0
+        while i < len(nodes):
+            node = nodes[i]
+            self._owner = owners[i]
+            i += 1
+            handler = handlers.get(type(node))
+            if handler is not None:
+                handler(self, node)
+            children = list(ast.iter_child_nodes(node))
+            if children:
+                nodes.extend(children)
+                owners.extend([self._owner] * len(children))
+
+    def _import(self, node: ast.Import):
+        for alias in node.names:
+            self.imports[alias.name] = None
+
+    def _import_from(self, node: ast.ImportFrom):
+        if node.module:
+            self.imports[node.module] = None
+
+    def _class_def(self, node: ast.ClassDef):
+        self.classes.append(node)
+
+    def _function_def(self, node: ast.FunctionDef):
+        self.functions.append(node)
+        # Recursion is only tracked in a top-level function's own scope;
+        # nested defs are separate scopes and don't count as self-calls
+        self._owner = node.name if id(node) in self._top_level else None
+
+    def _new_scope(self, node: ast.AST):
+        # async defs and lambdas: separate scopes, nothing else to collect
+        self._owner = None
+
+    def _loop(self, node: ast.AST):
+        self.has_loops = True
+
+    def _call(self, node: ast.Call):
+        func = node.func
+        if type(func) is ast.Name:
+            name = func.id
+            if name in ("sorted", "sort"):
+                self.has_sorting = True
+            if name == self._owner:
+                self.recursive.add(name)
+        elif type(func) is ast.Attribute:
+            name = func.attr
+        else:
+            return
+        self.call_names[name] = None
+
+    _HANDLERS = {
+        ast.Import: _import,
+        ast.ImportFrom: _import_from,
+        ast.ClassDef: _class_def,
+        ast.FunctionDef: _function_def,
+        ast.AsyncFunctionDef: _new_scope,
+        ast.Lambda: _new_scope,
+        ast.For: _loop,
+        ast.While: _loop,
+        ast.Call: _call,
+    }
+
+
 class CodeParser:
     """
     AST-based code parser for extracting real code structure.
@@ -87,50 +188,65 @@ class CodeParser:
         Parse a single Python file and extract structure.
         Returns CodeAnalysisResult with real, verifiable information only.
         """
-        result = CodeAnalysisResult()
-        result.files_analyzed.append(str(file_path))
+        return self.parse_source(file_path, content)[0]
 
+    def parse_source(
+        self, file_path: Path, content: str
+    ) -> Tuple[CodeAnalysisResult, Optional[ModuleFacts]]:
+        """
+        Like parse_file, but also returns the ModuleFacts gathered during the
+        same AST pass (None when the file does not parse).
+        """
         try:
             tree = ast.parse(content)
-
-            # Extract imports
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        result.imports.append(alias.name)
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        result.imports.append(node.module)
-
-            # Extract top-level functions and classes
-            for node in tree.body:
-                if isinstance(node, ast.FunctionDef):
-                    func_info = self._extract_function(node, is_method=False)
-                    result.functions.append(func_info)
-
-                    # Check for recursion
-                    if self._has_recursion(node, node.name):
-                        func_info.has_recursion = True
-                        if "Recursive" not in result.detected_patterns:
-                            result.detected_patterns.append("Recursive")
-
-                elif isinstance(node, ast.ClassDef):
-                    class_info = self._extract_class(node)
-                    result.classes.append(class_info)
-
-            # Detect algorithm patterns conservatively
-            self._detect_patterns(tree, result)
-
-            # Extract code snippets (5-10 lines per significant function)
-            result.code_snippets[str(file_path)] = self._extract_snippets(
-                content, result.functions, result.classes
-            )
-
-        except SyntaxError as e:
+        except SyntaxError:
             # Skip files with syntax errors
-            pass
+            result = CodeAnalysisResult()
+            result.files_analyzed.append(str(file_path))
+            return result, None
+
+        return self.parse_tree(file_path, tree, content)
+
+    def parse_tree(
+        self, file_path: Path, tree: ast.Module, content: str
+    ) -> Tuple[CodeAnalysisResult, ModuleFacts]:
+        """Extract structure from an already-parsed module."""
+        result = CodeAnalysisResult()
+        result.files_analyzed.append(str(file_path))
+
+        visitor = _UnifiedVisitor(tree)
+        result.imports = list(visitor.imports)
+
+        # Extract top-level functions and classes
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef):
+                func_info = self._extract_function(node, is_method=False)
+                result.functions.append(func_info)
 
-        return result
+                # Check for recursion
+                if node.name in visitor.recursive:
+                    func_info.has_recursion = True
+                    if "Recursive" not in result.detected_patterns:
+                        result.detected_patterns.append("Recursive")
+
+            elif isinstance(node, ast.ClassDef):
+                class_info = self._extract_class(node)
+                result.classes.append(class_info)
+
+        # Detect algorithm patterns conservatively
+        self._detect_patterns(visitor.has_loops, visitor.has_sorting, result)
+
+        # Extract code snippets (5-10 lines per significant function)
+        result.code_snippets[str(file_path)] = self._extract_snippets(
+            content, result.functions, result.classes
+        )
+
+        facts = ModuleFacts(
+            call_names=list(visitor.call_names),
+            classes=[(n.name, ast.get_docstring(n) or "") for n in visitor.classes],
+            functions=[(n.name, ast.get_docstring(n) or "") for n in visitor.functions],
+        )
+        return result, facts
 
     def _extract_function(
         self, node: ast.FunctionDef, is_method: bool = False
@@ -177,35 +293,15 @@ class CodeParser:
 
         return class_info
 
-    def _has_recursion(self, node: ast.FunctionDef, func_name: str) -> bool:
-        """Check if function calls itself (recursion detection)."""
-        for child in ast.walk(node):
-            if isinstance(child, ast.Call):
-                if isinstance(child.func, ast.Name) and child.func.id == func_name:
-                    return True
-        return False
-
-    def _detect_patterns(self, tree: ast.AST, result: CodeAnalysisResult):
+    def _detect_patterns(
+        self, has_loops: bool, has_sorting: bool, result: CodeAnalysisResult
+    ):
         """
         Conservatively detect algorithm patterns.
         Only label what is clearly present - no speculation.
         """
-        has_loops = False
-        has_sorting = False
-
-        for node in ast.walk(tree):
-            # Detect loops (iterative approach)
-            if isinstance(node, (ast.For, ast.While)):
-                has_loops = True
-
-            # Detect sorting usage
-            if isinstance(node, ast.Call):
-                if isinstance(node.func, ast.Name) and node.func.id in [
-                    "sorted",
-                    "sort",
-                ]:
-                    has_sorting = True
-                    result.algorithm_keywords.append("sorting")
+        if has_sorting:
+            result.algorithm_keywords.append("sorting")
 
         # Only add patterns if clearly detected
         if has_loops and "Iterative" not in result.detected_patterns:
@@ -231,7 +327,6 @@ class CodeParser:
         Returns list of (start_line, end_line, code) tuples.
         """
         snippets = []
-        lines = content.split("\n")
 
         # Extract from top 3 functions (by line count, excluding __init__)
         significant_funcs = [
@@ -242,42 +337,59 @@ class CodeParser:
         # Extract top 5 classes and top 10 functions
         significant_classes = classes[:]
         significant_classes.sort(key=lambda c: c.line_end - c.line_start, reverse=True)
+        if not significant_classes and not significant_funcs:
+            return snippets
+
+        # Offset of each line start, so snippets are sliced straight out of
+        # content instead of splitting the whole file into a list of lines
+        line_starts = [0]
+        line_starts.extend(m.end() for m in re.finditer("\n", content))
+
         for cls in significant_classes[:5]:
             start = cls.line_start - 1
             end = min(start + 15, cls.line_end)
-            snippet_code = "\n".join(lines[start:end])
+            snippet_code = self._slice_lines(content, line_starts, start, end)
             snippets.append((cls.line_start, end, snippet_code))
 
         for func in significant_funcs[:10]:
             start = func.line_start - 1  # 0-indexed
             end = min(start + 15, func.line_end)  # Max 15 lines
 
-            snippet_lines = lines[start:end]
-            snippet_code = "\n".join(snippet_lines)
+            snippet_code = self._slice_lines(content, line_starts, start, end)
             snippets.append((func.line_start, end, snippet_code))
 
         return snippets
 
+    @staticmethod
+    def _slice_lines(content: str, line_starts: List[int], start: int, end: int) -> str:
+        """Equivalent of "\\n".join(content.split("\\n")[start:end])."""
+        if end <= start or start >= len(line_starts):
+            return ""
+        stop = line_starts[end] - 1 if end < len(line_starts) else len(content)
+        return content[line_starts[start] : stop]
+
 
 def merge_analysis_results(results: List[CodeAnalysisResult]) -> CodeAnalysisResult:
     """Merge multiple CodeAnalysisResult objects into one."""
     merged = CodeAnalysisResult()
+    # dicts act as ordered sets: O(1) dedup, first-seen order preserved
+    imports = {}
+    patterns = {}
+    keywords = {}
 
     for result in results:
         merged.files_analyzed.extend(result.files_analyzed)
         merged.functions.extend(result.functions)
         merged.classes.extend(result.classes)
-        merged.imports.extend(result.imports)
+        imports.update(dict.fromkeys(result.imports))
 
         # Merge unique patterns and keywords
-        for pattern in result.detected_patterns:
-            if pattern not in merged.detected_patterns:
-                merged.detected_patterns.append(pattern)
-
-        for keyword in result.algorithm_keywords:
-            if keyword not in merged.algorithm_keywords:
-                merged.algorithm_keywords.append(keyword)
+        patterns.update(dict.fromkeys(result.detected_patterns))
+        keywords.update(dict.fromkeys(result.algorithm_keywords))
 
         merged.code_snippets.update(result.code_snippets)
 
+    merged.imports = list(imports)
+    merged.detected_patterns = list(patterns)
+    merged.algorithm_keywords = list(keywords)
     return merged
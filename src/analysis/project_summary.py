@@ -1,11 +1,26 @@
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, TYPE_CHECKING
+from typing import List, Dict, Optional, Set, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .code_parser import CodeAnalysisResult
 
 
-@dataclass
+# Fields exported by ProjectSummary.to_json, in output order
+_JSON_FIELDS = (
+    "project_type",
+    "tech_stack",
+    "modules",
+    "workflow",
+    "dataset",
+    "algorithms_used",
+    "total_files",
+    "languages",
+    "entry_points",
+    "test_files",
+)
+
+
+@dataclass(slots=True)
 class ProjectSummary:
     project_type: str = "Unknown"
     tech_stack: List[str] = field(default_factory=list)
@@ -20,20 +35,16 @@ class ProjectSummary:
     detailed_analysis: Optional["CodeAnalysisResult"] = (
         None  # Real code analysis from AST parser
     )
+    # Membership mirrors of tech_stack / algorithms_used for O(1) dedup checks
+    _tech_stack_set: Set[str] = field(
+        default_factory=set, init=False, repr=False, compare=False
+    )
+    _algorithms_set: Set[str] = field(
+        default_factory=set, init=False, repr=False, compare=False
+    )
 
     def to_json(self):
         """Returns JSON-safe dict. detailed_analysis is NOT included here
         because CodeAnalysisResult is not JSON serializable.
         Access it via summary.detailed_analysis directly."""
-        return {
-            "project_type": self.project_type,
-            "tech_stack": self.tech_stack,
-            "modules": self.modules,
-            "workflow": self.workflow,
-            "dataset": self.dataset,
-            "algorithms_used": self.algorithms_used,
-            "total_files": self.total_files,
-            "languages": self.languages,
-            "entry_points": self.entry_points,
-            "test_files": self.test_files,
-        }
+        return {name: getattr(self, name) for name in _JSON_FIELDS}
@@ -1,6 +1,32 @@
 import os
 import io
-from typing import Dict, Any, Counter
+import re
+import base64
+import hashlib
+import threading
+from array import array
+import importlib.util
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+except ImportError:
+    pdfium = None
+
+# PDFium is not thread-safe, and extraction runs on Streamlit session threads
+# and Blast background workers. Held for each PdfDocument's whole lifetime
+# (reentrant, so one thread may nest documents).
+_PDFIUM_LOCK = threading.RLock()
 
 try:
     import PyPDF2
@@ -12,6 +38,57 @@ try:
 except ImportError:
     Document = None
 
+# Section headings to look for, in match priority order
+_SECTION_TARGETS = {
+    "vision": ["vision of the department", "institute vision", "our vision"],
+    "mission": [
+        "mission of the department",
+        "institute mission",
+        "our mission",
+    ],
+    "peo": ["program educational objectives", "peos"],
+    "po": ["program outcomes", "pos"],
+    "pso": ["program specific outcomes", "psos"],
+    "certificate": ["certificate", "bonafide certificate"],
+    "acknowledgment": ["acknowledgment", "acknowledgement"],
+}
+
+# One anchored alternation over every keyword: the regex engine walks all of them
+# in a single C-level match and, like the old nested loops, takes the first
+# section/keyword (in the order above) the line starts with. The named group
+# that matched is the section key; match.end() is the keyword length.
+_HEADING_RE = re.compile(
+    "|".join(
+        f"(?P<{key}>{'|'.join(map(re.escape, keywords))})"
+        for key, keywords in _SECTION_TARGETS.items()
+    )
+)
+
+# The target sections are all front matter; this much text always covers it
+SECTION_SCAN_CHARS = 200_000
+
+# analyze_style only quotes this much of the sample (approx 1000 tokens)
+STYLE_EXCERPT_CHARS = 3000
+
+# OCR results kept per analyzer (least recently used are dropped)
+OCR_CACHE_SIZE = 256
+
+# Generic headings that end a captured section
+_STOPS = (
+    "table of contents",
+    "chapter 1",
+    "chapter one",
+    "list of figures",
+    "list of tables",
+    "abbreviations",
+    "declaration",
+)
+_STOPS_RE = re.compile("|".join(map(re.escape, _STOPS)))
+_SINGLE_WORD_STOPS = frozenset(("abstract", "index", "contents"))
+
+# Lines starting with "1. ", "2. ", etc., followed by a capital letter
+_NUMBERED_HEADING_RE = re.compile(r"(?m)^\d+\.\s+[A-Z]")
+
 
 class StyleAnalyzer:
     """
@@ -21,12 +98,20 @@ class StyleAnalyzer:
     def __init__(self, api_key: str = None):
         self.api_key = api_key
         try:
-            from groq import Groq
+            from src.ai.utils import get_client
 
-            self.client = Groq(api_key=api_key) if api_key else None
+            self.client = get_client(api_key) if api_key else None
         except ImportError:
             self.client = None
 
+        # OCR text by image digest, so repeated logos/letterheads cost one call.
+        # _ocr_images fills it from a thread pool, hence the lock.
+        self._ocr_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._ocr_lock = threading.Lock()
+
+        # (source key, Document) of the last DOCX parsed, see _load_docx
+        self._last_docx: Tuple[Any, Any] = (None, None)
+
     def _ocr_image(self, image_data: bytes) -> str:
         """
         Uses Llama 3.2 Vision to extract text from an image.
@@ -34,11 +119,19 @@ class StyleAnalyzer:
         if not self.client:
             return ""
 
-        import base64
+        key = hashlib.blake2b(image_data, digest_size=16).digest()
+        with self._ocr_lock:
+            cached = self._ocr_cache.get(key)
+            if cached is not None:
+                self._ocr_cache.move_to_end(key)
+                return cached
 
         try:
             base64_image = base64.b64encode(image_data).decode("utf-8")
-            completion = self.client.chat.completions.create(
+            # No retry loop here, so keep the SDK's own retries (shared clients disable them)
+            completion = self.client.with_options(
+                max_retries=2
+            ).chat.completions.create(
                 model="llama-3.2-11b-vision-preview",
                 messages=[
                     {
@@ -60,151 +153,207 @@ class StyleAnalyzer:
                 temperature=0.1,
                 max_tokens=1024,
             )
-            return completion.choices[0].message.content or ""
+            text = completion.choices[0].message.content or ""
         except Exception as e:
             # Silently fail on OCR errors to avoid breaking the main flow
             print(f"OCR Error: {e}")
             return ""
 
-    def extract_text(self, file_obj, file_path: str) -> str:
+        # Only successful calls are cached; failures are retried next time
+        with self._ocr_lock:
+            self._ocr_cache[key] = text
+            if len(self._ocr_cache) > OCR_CACHE_SIZE:
+                self._ocr_cache.popitem(last=False)
+        return text
+
+    def _ocr_images(self, images: List[bytes]) -> List[str]:
+        """
+        OCRs several images at once. Each call is a network round-trip, so they
+        run on a small thread pool; results keep the input order.
+        """
+        # Identical images within one document are sent once
+        unique = list(dict.fromkeys(images))
+        if len(unique) < 2:
+            texts = [self._ocr_image(data) for data in unique]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(unique), 8)) as pool:
+                texts = list(pool.map(self._ocr_image, unique))
+        by_image = dict(zip(unique, texts))
+        return [by_image[data] for data in images]
+
+    def _load_docx(self, source):
+        """
+        Parses a DOCX path or file object, reusing the previous Document when
+        called again for the same source (e.g. analyze_visual_style followed by
+        extract_text). Only the latest document is kept.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            # Paths are matched by name, modification time and size
+            stat = os.stat(source)
+            key = (os.fspath(source), stat.st_mtime_ns, stat.st_size)
+        else:
+            # File objects by identity; the cache holds a reference, so the
+            # object (and its id) stays alive while it is cached
+            key = source
+
+        cached_key, doc = self._last_docx
+        if doc is not None and (cached_key is key or cached_key == key):
+            return doc
+
+        if hasattr(source, "seek"):
+            source.seek(0)
+        doc = Document(source)
+        self._last_docx = (key, doc)
+        return doc
+
+    @staticmethod
+    def _docx_paragraph_texts(doc) -> Iterator[str]:
+        """Body paragraphs first, then the paragraphs inside table cells."""
+        for para in doc.paragraphs:  # Analyze all paragraphs for structure search
+            yield para.text
+
+        # Also extract text from tables
+        for table in doc.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    for para in cell.paragraphs:
+                        yield para.text
+
+    def extract_text(
+        self, file_obj, file_path: str, max_chars: Optional[int] = None
+    ) -> str:
         """
         Extracts raw text from a PDF or DOCX file, including OCR for images in PDF.
+        With max_chars, reading stops once that much text has been collected.
         """
-        text = ""
+        parts = []
+        total = 0
         try:
-            filename = str(file_path).lower()
-            if filename.endswith(".pdf"):
-                if not PyPDF2:
-                    return "Error: PyPDF2 not installed."
-                # Handle file_obj differently based on type (bytes vs path)
-                reader = PyPDF2.PdfReader(file_obj)
-
-                count = 0
-                for page in reader.pages[:15]:  # Analyze first 15 pages for context
+            # Callers pass a file name/path or just its extension ("pdf")
+            file_type = str(file_path).lower().rsplit(".", 1)[-1]
+            if file_type == "pdf":
+                if not pdfium and not PyPDF2:
+                    return "Error: pypdfium2 or PyPDF2 not installed."
+
+                pages = []
+                images = []
+                # Analyze first 15 pages for context
+                for page_text, page_images in _iter_pdf_pages(file_obj, 15):
+                    if max_chars is not None and total >= max_chars:
+                        break
+
                     # 1. Extract Text
-                    page_text = page.extract_text()
                     if page_text:
-                        text += page_text + "\n"
+                        total += len(page_text) + 1
 
                     # 2. Extract Images (OCR) if text is sparse or if images present
                     # Only do this if we have an API key and haven't processed too many images (cost/latency)
-                    if self.client and hasattr(page, "images") and count < 5:
-                        for img in page.images:
-                            ocr_text = self._ocr_image(img.data)
-                            if ocr_text:
-                                text += f"\n[OCR Content]: {ocr_text}\n"
-                            count += 1
-
-            elif filename.endswith(".docx"):
+                    image_count = 0
+                    if self.client and len(images) < 5:
+                        page_image_data = page_images()
+                        images.extend(page_image_data)
+                        image_count = len(page_image_data)
+                    pages.append((page_text, image_count))
+
+                # Merge back in document order: each page's text, then its OCR
+                ocr_texts = iter(self._ocr_images(images))
+                for page_text, image_count in pages:
+                    if page_text:
+                        parts.append(page_text + "\n")
+                    for ocr_text in islice(ocr_texts, image_count):
+                        if ocr_text:
+                            parts.append(f"\n[OCR Content]: {ocr_text}\n")
+
+            elif file_type == "docx":
                 if not Document:
                     return "Error: python-docx not installed."
-                doc = Document(file_obj)
-                for (
-                    para
-                ) in doc.paragraphs:  # Analyze all paragraphs for structure search
-                    text += para.text + "\n"
-
-                # Also extract text from tables
-                for table in doc.tables:
-                    for row in table.rows:
-                        for cell in row.cells:
-                            for para in cell.paragraphs:
-                                text += para.text + "\n"
-
-            return text.strip()
+                doc = self._load_docx(file_obj)
+                for para_text in self._docx_paragraph_texts(doc):
+                    parts.append(para_text + "\n")
+                    total += len(para_text) + 1
+                    if max_chars is not None and total >= max_chars:
+                        break
+
+            return "".join(parts).strip()
         except Exception as e:
             return f"Error extracting text: {e}"
 
-    def extract_specific_sections(self, file_obj, file_path: str) -> Dict[str, str]:
+    def extract_specific_sections(
+        self, file_obj, file_path: str, text: Optional[str] = None
+    ) -> Dict[str, str]:
         """
         Extracts specific sections verbatim from the sample report.
         Target sections: Vision, Mission, PEO, PO, PSO, Certificate, Acknowledgment.
+        Pass text if the report was already extracted to skip re-reading the file.
         """
+        if text is None:
+            text = self.extract_text(file_obj, file_path, max_chars=SECTION_SCAN_CHARS)
+        return self._sections_from_text(text)
+
+    def extract_all(self, file_obj, file_path: str) -> Tuple[str, Dict[str, str]]:
+        """
+        Parses the sample report once and returns both the raw text and the
+        verbatim sections, instead of extracting the file twice.
+        """
+        text = self.extract_text(file_obj, file_path, max_chars=SECTION_SCAN_CHARS)
+        return text, self._sections_from_text(text)
+
+    def _sections_from_text(self, text: str) -> Dict[str, str]:
+        """Splits already-extracted report text into the target sections."""
         extracted = {}
-        text = self.extract_text(file_obj, file_path)
-
-        # Keywords to search for
-        targets = {
-            "vision": ["vision of the department", "institute vision", "our vision"],
-            "mission": [
-                "mission of the department",
-                "institute mission",
-                "our mission",
-            ],
-            "peo": ["program educational objectives", "peos"],
-            "po": ["program outcomes", "pos"],
-            "pso": ["program specific outcomes", "psos"],
-            "certificate": ["certificate", "bonafide certificate"],
-            "acknowledgment": ["acknowledgment", "acknowledgement"],
-        }
 
         # Simple extraction logic: Find heading, take text until next likely heading
         # This is a heuristic.
-        lines = text.split("\n")
         current_section = None
         buffer = []
+        # Sections not captured with any content yet
+        remaining = set(_SECTION_TARGETS)
 
-        for line in lines:
+        for line in _iter_lines(text):
             line_clean = line.strip().lower()
 
-            # Check if this line starts a new target section
-            found_new = False
-            for key, keywords in targets.items():
-                for kw in keywords:
-                    # Check if line STARTS with keyword (more robust than 'in')
-                    if line_clean.startswith(kw):
-                        # standard case: short header
-                        if len(line_clean) < 50:
-                            if current_section and buffer:
-                                extracted[current_section] = "\n".join(buffer).strip()
-                            current_section = key
-                            buffer = []
-                            found_new = True
-                            break
-                        # merged case: "Acknowledgement We wish to..."
-                        else:
-                            # It's a long line starting with the keyword.
-                            # We assume the header is merged with body.
-                            if current_section and buffer:
-                                extracted[current_section] = "\n".join(buffer).strip()
-                            current_section = key
-                            buffer = [
-                                line[len(kw) :].strip()
-                            ]  # Add the rest of the line to buffer
-                            found_new = True
-                            break
-                if found_new:
-                    break
-
-            if found_new:
+            # Check if this line STARTS with a target keyword (more robust than 'in')
+            heading = _HEADING_RE.match(line_clean)
+            if heading:
+                if current_section and buffer:
+                    extracted[current_section] = "\n".join(buffer).strip()
+                    if extracted[current_section]:
+                        remaining.discard(current_section)
+                current_section = heading.lastgroup
+                # standard case: short header
+                if len(line_clean) < 50:
+                    buffer = []
+                # merged case: "Acknowledgement We wish to..."
+                else:
+                    # It's a long line starting with the keyword.
+                    # We assume the header is merged with body.
+                    buffer = [
+                        line[heading.end() :].strip()
+                    ]  # Add the rest of the line to buffer
                 continue
 
             # If in a section, accumulate text
             if current_section:
                 # Stop if we hit a generic new section
                 # stricter checks to avoid false positives in body text
-                stops = [
-                    "table of contents",
-                    "chapter 1",
-                    "chapter one",
-                    "list of figures",
-                    "list of tables",
-                    "abbreviations",
-                    "declaration",
-                ]
-
                 is_stop = False
-                if any(x in line_clean for x in stops) and len(line_clean) < 40:
+                if len(line_clean) < 40 and _STOPS_RE.search(line_clean):
                     is_stop = True
 
                 # Special strict check for single-word headers
-                if line_clean in ["abstract", "index", "contents"]:
+                if line_clean in _SINGLE_WORD_STOPS:
                     is_stop = True
 
                 if is_stop:
                     extracted[current_section] = "\n".join(buffer).strip()
+                    if extracted[current_section]:
+                        remaining.discard(current_section)
                     current_section = None
                     buffer = []
+                    # All sections are front matter: once each has been
+                    # captured, the rest of the report is body text
+                    if not remaining:
+                        break
                 else:
                     buffer.append(line)
 
@@ -224,7 +373,7 @@ class StyleAnalyzer:
             return "Use standard academic style."
 
         # Truncate to avoid overloading prompts (approx 1000 tokens)
-        excerpt = text[:3000]
+        excerpt = text[:STYLE_EXCERPT_CHARS]
 
         style_guide = f"""
         STRICT STYLE ADHERENCE REQUIRED.
@@ -257,13 +406,11 @@ class StyleAnalyzer:
         if not text:
             return structure_config
 
-        # Check for numbered headings (e.g., "1. Introduction", "2. Methodology")
-        import re
+        # Check for numbered headings (e.g., "1. Introduction", "2. Methodology").
+        # Only "more than two" matters, so stop scanning at the third match.
+        numbered_matches = islice(_NUMBERED_HEADING_RE.finditer(text), 3)
 
-        # Look for lines starting with "1. ", "2. ", etc., followed by a capital letter
-        numbered_matches = re.findall(r"^\d+\.\s+[A-Z]", text, re.MULTILINE)
-
-        if len(numbered_matches) > 2:
+        if sum(1 for _ in numbered_matches) > 2:
             structure_config["numeration"] = True
 
         return structure_config
@@ -286,38 +433,49 @@ class StyleAnalyzer:
             return style_profile
 
         try:
-            doc = Document(file_path)
+            doc = self._load_docx(file_path)
+
+            paragraphs = doc.paragraphs
+            if not paragraphs:
+                return style_profile
 
-            fonts = []
-            sizes = []
-            spacings = []
+            # Numbers go straight into flat C double buffers (no boxed floats);
+            # font names are counted as they are seen
+            fonts = Counter()
+            sizes = array("d")
+            spacings = array("d")
 
-            for para in doc.paragraphs:
+            for para in paragraphs:
                 # Line spacing
-                if para.paragraph_format.line_spacing:
-                    spacings.append(para.paragraph_format.line_spacing)
+                line_spacing = para.paragraph_format.line_spacing
+                if line_spacing:
+                    spacings.append(line_spacing)
 
                 for run in para.runs:
-                    if run.font.name:
-                        fonts.append(run.font.name)
-                    if run.font.size:
+                    # Each .font / .size access re-reads the run XML, so read once
+                    font = run.font
+                    if font.name:
+                        fonts[font.name] += 1
+                    size = font.size
+                    if size:
                         # font.size is in Emu, convert to Pt
-                        sizes.append(run.font.size.pt)
+                        sizes.append(size.pt)
 
             # Determine most frequent
-            from collections import Counter
-
             if fonts:
-                style_profile["font_name"] = Counter(fonts).most_common(1)[0][0]
+                style_profile["font_name"] = fonts.most_common(1)[0][0]
 
             if sizes:
                 # Round to nearest 0.5
-                common_size = Counter(sizes).most_common(1)[0][0]
+                common_size = _most_common_number(sizes)
                 style_profile["font_size"] = round(common_size * 2) / 2
 
             if spacings:
                 # Average spacing might be better than mode for spacing
-                avg_spacing = sum(spacings) / len(spacings)
+                if np is not None:
+                    avg_spacing = float(np.mean(spacings))
+                else:
+                    avg_spacing = sum(spacings) / len(spacings)
                 style_profile["line_spacing"] = round(avg_spacing, 1)
 
             return style_profile
@@ -327,10 +485,81 @@ class StyleAnalyzer:
             return style_profile
 
 
+def _iter_lines(text: str) -> Iterator[str]:
+    """
+    Lazy text.split("\\n"): lines are sliced out as they are consumed, so a scan
+    that stops early never materializes the rest of the document.
+    """
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def _iter_pdf_pages(file_obj, max_pages: int):
+    """
+    Yields (text, images) for the first max_pages pages, where images() returns
+    the page's encoded image bytes and must be called before the next page.
+    Uses pdfium's native text extraction when available, else PyPDF2.
+    The pdfium path holds _PDFIUM_LOCK until the generator is exhausted or closed.
+    """
+    if pdfium is None:
+        # Handle file_obj differently based on type (bytes vs path)
+        reader = PyPDF2.PdfReader(file_obj)
+        for page in reader.pages[:max_pages]:
+            yield page.extract_text(), (
+                lambda page=page: (
+                    [img.data for img in page.images] if hasattr(page, "images") else []
+                )
+            )
+        return
+
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(file_obj)
+        try:
+            for index in range(min(max_pages, len(pdf))):
+                page = pdf[index]
+                # pdfium separates lines with \r\n; the rest of the pipeline splits on \n
+                text = page.get_textpage().get_text_range().replace("\r\n", "\n")
+                yield text, lambda page=page: _pdfium_images(page)
+        finally:
+            pdf.close()
+
+
+def _pdfium_images(page) -> List[bytes]:
+    images = []
+    for obj in page.get_objects(filter=(pdfium_c.FPDF_PAGEOBJ_IMAGE,)):
+        buf = io.BytesIO()
+        try:
+            # JPEGs come out as-is; anything else is re-encoded (needs Pillow)
+            obj.extract(buf, fb_format="png")
+        except Exception:
+            continue
+        images.append(buf.getvalue())
+    return images
+
+
+def _most_common_number(values):
+    """
+    Mode of a list of numbers. Ties go to the value seen first, exactly like
+    Counter.most_common, which is also the fallback without numpy.
+    """
+    if np is None:
+        return Counter(values).most_common(1)[0][0]
+    uniq, first, counts = np.unique(
+        np.asarray(values, dtype=np.float64), return_index=True, return_counts=True
+    )
+    tied = counts == counts.max()
+    return uniq[tied][first[tied].argmin()].item()
+
+
+@lru_cache(maxsize=None)
 def await_module_availability(module_name):
     """
     Checks if a module is available for import.
     """
-    import importlib.util
-
     return importlib.util.find_spec(module_name) is not None
@@ -0,0 +1,297 @@
+"""
+Optional tree-sitter backend for CodeParser.
+Produces the same CodeAnalysisResult / ModuleFacts as the ast-based parser, but
+gathers everything with one compiled query over a C-built syntax tree.
+Only used when tree_sitter_languages is installed.
+"""
+
+import ast
+import inspect
+import warnings
+from operator import itemgetter
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .code_parser import (
+    CodeParser,
+    CodeAnalysisResult,
+    ModuleFacts,
+    FunctionInfo,
+    ClassInfo,
+)
+
+try:
+    with warnings.catch_warnings():
+        # tree_sitter_languages still calls a Language constructor tree_sitter deprecates
+        warnings.simplefilter("ignore", FutureWarning)
+        from tree_sitter_languages import get_language, get_parser
+
+        _PARSER = get_parser("python")
+        _QUERY = get_language("python").query("""
+            (import_statement) @import
+            (import_from_statement) @import
+            (future_import_statement) @import
+            (class_definition) @class
+            (function_definition) @function
+            (for_statement) @loop
+            (while_statement) @loop
+            (call) @call
+            """)
+except Exception:  # Not installed, or binding and grammar versions don't match
+    _PARSER = _QUERY = None
+
+TREE_SITTER_AVAILABLE = _QUERY is not None
+
+_SCOPES = ("function_definition", "lambda")
+_PARAM_STOPS = ("list_splat_pattern", "keyword_separator", "dictionary_splat_pattern")
+_by_position = itemgetter(0)
+
+
+def _text(node) -> str:
+    return node.text.decode("utf-8", errors="ignore")
+
+
+def _dotted(node) -> str:
+    # "a . b" is legal Python; ast reports it as "a.b"
+    return "".join(_text(node).split())
+
+
+def _is_async(node) -> bool:
+    return node.children[0].type == "async"
+
+
+def _unwrap(node):
+    """decorated_definition -> the def/class it wraps."""
+    if node.type == "decorated_definition":
+        return node.child_by_field_name("definition")
+    return node
+
+
+def _last_line(node) -> int:
+    """1-based line of the node's last non-comment token, like ast's end_lineno."""
+    while node.children:
+        for child in reversed(node.children):
+            if child.type != "comment":
+                node = child
+                break
+        else:
+            break
+    return node.end_point[0] + 1
+
+
+def _elifs_before(clause) -> int:
+    count = 0
+    sibling = clause.prev_named_sibling
+    while sibling is not None:
+        count += sibling.type == "elif_clause"
+        sibling = sibling.prev_named_sibling
+    return count
+
+
+def _placement(node) -> Tuple[int, Optional[object]]:
+    """
+    (statement depth, nearest enclosing def/lambda) for a node. Sorting captures
+    by statement depth then position approximates ast.walk's breadth-first order.
+    """
+    depth = 0
+    scope = None
+    parent = node.parent
+    while parent is not None:
+        kind = parent.type
+        if kind in ("block", "except_clause", "except_group_clause"):
+            # ast nests handler bodies one level deeper (Try -> ExceptHandler)
+            depth += 1
+        elif kind == "elif_clause":
+            # ast chains each elif as an If inside the previous one's orelse
+            depth += _elifs_before(parent) + 1
+        elif kind == "else_clause" and parent.parent.type == "if_statement":
+            depth += _elifs_before(parent)
+        elif scope is None and kind in _SCOPES:
+            scope = parent
+        parent = parent.parent
+    return depth, scope
+
+
+def _docstring(node) -> str:
+    """ast.get_docstring equivalent: the first body statement, if a plain string literal."""
+    body = node.child_by_field_name("body")
+    first = next((c for c in body.named_children if c.type != "comment"), None)
+    if (
+        first is None
+        or first.type != "expression_statement"
+        or first.named_child_count != 1
+    ):
+        return ""
+    literal = first.named_children[0]
+    if literal.type not in ("string", "concatenated_string"):
+        return ""
+    try:
+        value = ast.literal_eval(_text(literal))
+    except (ValueError, SyntaxError):
+        return ""  # f-strings and the like are not docstrings
+    return inspect.cleandoc(value) if isinstance(value, str) else ""
+
+
+class TSCodeParser(CodeParser):
+    """
+    CodeParser that parses with tree-sitter instead of ast.
+    Files tree-sitter flags as erroneous are handed to the ast parser, which
+    owns the syntax-error semantics.
+    """
+
+    def parse_source(
+        self, file_path: Path, content: str
+    ) -> Tuple[CodeAnalysisResult, Optional[ModuleFacts]]:
+        root = _PARSER.parse(content.encode("utf-8")).root_node
+        if root.has_error:
+            return super().parse_source(file_path, content)
+
+        result = CodeAnalysisResult()
+        result.files_analyzed.append(str(file_path))
+
+        # Top-level sync functions, keyed by start byte, for recursion checks
+        top_level = {}
+        for stmt in root.named_children:
+            node = _unwrap(stmt)
+            if node.type == "function_definition" and not _is_async(node):
+                top_level[node.start_byte] = _text(node.child_by_field_name("name"))
+
+        imports, calls, classes, functions = [], [], [], []
+        recursive = set()
+        has_loops = has_sorting = False
+
+        for node, kind in _QUERY.captures(root):
+            if kind == "loop":
+                has_loops = has_loops or not _is_async(node)
+                continue
+
+            depth, scope = _placement(node)
+            position = (depth, node.start_byte)
+            if kind == "call":
+                func = node.child_by_field_name("function")
+                if func.type == "identifier":
+                    name = _text(func)
+                    if name in ("sorted", "sort"):
+                        has_sorting = True
+                    if scope is not None and top_level.get(scope.start_byte) == name:
+                        recursive.add(name)
+                elif func.type == "attribute":
+                    name = _text(func.child_by_field_name("attribute"))
+                else:
+                    continue
+                calls.append((position, name))
+            elif kind == "import":
+                imports.extend((position, name) for name in self._import_names(node))
+            elif kind == "class":
+                classes.append((position, node))
+            elif not _is_async(node):
+                functions.append((position, node))
+
+        imports.sort(key=_by_position)
+        result.imports = list(dict.fromkeys(name for _, name in imports))
+
+        # Extract top-level functions and classes
+        for stmt in root.named_children:
+            node = _unwrap(stmt)
+            if node.type == "function_definition" and not _is_async(node):
+                func_info = self._ts_function(node, is_method=False)
+                result.functions.append(func_info)
+
+                if func_info.name in recursive:
+                    func_info.has_recursion = True
+                    if "Recursive" not in result.detected_patterns:
+                        result.detected_patterns.append("Recursive")
+
+            elif node.type == "class_definition":
+                result.classes.append(self._ts_class(node))
+
+        self._detect_patterns(has_loops, has_sorting, result)
+
+        result.code_snippets[str(file_path)] = self._extract_snippets(
+            content, result.functions, result.classes
+        )
+
+        calls.sort(key=_by_position)
+        classes.sort(key=_by_position)
+        functions.sort(key=_by_position)
+        facts = ModuleFacts(
+            call_names=list(dict.fromkeys(name for _, name in calls)),
+            classes=[
+                (_text(n.child_by_field_name("name")), _docstring(n))
+                for _, n in classes
+            ],
+            functions=[
+                (_text(n.child_by_field_name("name")), _docstring(n))
+                for _, n in functions
+            ],
+        )
+        return result, facts
+
+    @staticmethod
+    def _import_names(node) -> List[str]:
+        if node.type == "future_import_statement":
+            return ["__future__"]
+        if node.type == "import_from_statement":
+            # Relative ".pkg.mod" -> "pkg.mod"; a bare "from . import x" has no module
+            name = _dotted(node.child_by_field_name("module_name")).lstrip(".")
+            return [name] if name else []
+        names = []
+        for child in node.children_by_field_name("name"):
+            if child.type == "aliased_import":
+                child = child.child_by_field_name("name")
+            names.append(_dotted(child))
+        return names
+
+    @staticmethod
+    def _positional_params(params) -> List[str]:
+        """Names ast reports in args.args: after any "/", before "*", "*args" or "**kw"."""
+        names = []
+        for child in params.named_children:
+            if child.type == "typed_parameter":
+                child = child.named_children[0]
+            kind = child.type
+            if kind == "positional_separator":
+                names = []
+            elif kind in _PARAM_STOPS:
+                break
+            elif kind == "identifier":
+                names.append(_text(child))
+            elif kind in ("default_parameter", "typed_default_parameter"):
+                names.append(_text(child.child_by_field_name("name")))
+        return names
+
+    def _ts_function(self, node, is_method: bool = False) -> FunctionInfo:
+        name = _text(node.child_by_field_name("name"))
+        args = self._positional_params(node.child_by_field_name("parameters"))
+
+        docstring = _docstring(node)
+        if docstring and len(docstring) > 100:
+            docstring = docstring[:97] + "..."
+
+        return FunctionInfo(
+            name=name,
+            signature=f"{name}({', '.join(args)})",
+            docstring=docstring,
+            line_start=node.start_point[0] + 1,
+            line_end=_last_line(node),
+            is_method=is_method,
+        )
+
+    def _ts_class(self, node) -> ClassInfo:
+        docstring = _docstring(node)
+        if docstring and len(docstring) > 100:
+            docstring = docstring[:97] + "..."
+
+        class_info = ClassInfo(
+            name=_text(node.child_by_field_name("name")),
+            docstring=docstring,
+            line_start=node.start_point[0] + 1,
+            line_end=_last_line(node),
+        )
+
+        for stmt in node.child_by_field_name("body").named_children:
+            item = _unwrap(stmt)
+            if item.type == "function_definition" and not _is_async(item):
+                class_info.methods.append(self._ts_function(item, is_method=True))
+
+        return class_info
@@ -4,12 +4,12 @@ import json
 import io
 import re
 import time
+import logging
 import traceback
 from pathlib import Path
 
 # Third-party imports
 import streamlit as st
-import docx  # type: ignore
 from dotenv import load_dotenv
 
 # --- Page Config ---
@@ -17,22 +17,62 @@ st.set_page_config(page_title="Writex - AI Document Formatter", page_icon="📝"
 
 # --- Setup ---
 load_dotenv()
+logging.basicConfig(level=logging.INFO)
 root_path = Path(__file__).parent.parent
 if str(root_path) not in sys.path:
     sys.path.append(str(root_path))
 
-# --- Imports ---
-from src.file_formatting.formatting import generate_report
-from src.analysis.style_analyzer import StyleAnalyzer
-from src.analysis.code_analyzer import CodeAnalyzer
-from src.ai.report_generator import ReportGenerator
-from src.core.compiler import DocumentCompiler, REPORT_SCHEMA
-from src.validation.validator import DocumentValidator
+# Heavy modules (Groq SDK, python-docx, PyPDF2) are imported where they are
+# used, so the first render and every widget rerun skip loading them.
+
+
+@st.cache_resource(show_spinner=False)
+def get_code_analyzer():
+    from src.analysis.code_analyzer import CodeAnalyzer
+
+    return CodeAnalyzer()
+
+
+def get_style_analyzer(api_key_val):
+    # One analyzer per session, kept across reruns: its OCR cache and last
+    # parsed DOCX are not thread-safe, so sessions must not share one. The
+    # Groq client underneath is still shared per key (utils.get_client).
+    from src.analysis.style_analyzer import StyleAnalyzer
+
+    cached = st.session_state.get("style_analyzer")
+    if cached is None or cached[0] != api_key_val:
+        cached = (api_key_val, StyleAnalyzer(api_key=api_key_val))
+        st.session_state["style_analyzer"] = cached
+    return cached[1]
+
+
+@st.cache_data(show_spinner=False)
+def extract_sample(file_bytes, file_name, api_key_val):
+    # Keyed by the uploaded bytes: re-clicking Generate with the same sample
+    # skips text extraction and OCR entirely
+    sa = get_style_analyzer(api_key_val)
+    text, sections = sa.extract_all(io.BytesIO(file_bytes), file_name)
+    if text.startswith("Error"):
+        # extract_text reports failures as text; raising keeps them out of the cache
+        raise ValueError(text)
+    return text, sections
+
+
+@st.cache_data(show_spinner=False)
+def extract_sample_metadata(raw_text, api_key_val):
+    from src.ai.report_generator import ReportGenerator
+
+    metadata = ReportGenerator(api_key_val).extract_metadata_from_sample(raw_text)
+    if not metadata:
+        # Raising keeps a failed extraction out of the cache
+        raise ValueError("No metadata extracted from sample")
+    return metadata
 
 
 def run_formatting(text_content, api_key_val, style_name):
     # Keep lightweight formatting for Tabs 1 & 2
     from src.ai.structurer import structure_text
+    from src.file_formatting.formatting import generate_report
 
     if not api_key_val:
         return
@@ -148,7 +188,12 @@ with tab3:
             st.error("👥 Please enter at least one Team Member name.")
         else:
             try:
-                analyzer = CodeAnalyzer()
+                from src.ai.report_generator import ReportGenerator
+                from src.core.compiler import DocumentCompiler
+                from src.validation.validator import DocumentValidator
+                from src.file_formatting.formatting import generate_report
+
+                analyzer = get_code_analyzer()
                 with st.spinner("Analyzing Codebase (In-Memory)..."):
                     summary = analyzer.analyze_zip(proj_zip)
                 
@@ -164,14 +209,16 @@ with tab3:
                 raw_text = ""
                 if sample_rep:
                     with st.spinner("Analyzing Sample Style (plus OCR if needed)..."):
-                        sa = StyleAnalyzer(api_key=api_key)
-                        ext = sample_rep.name.split(".")[-1].lower()
-                        sample_rep.seek(0)
-                        raw_text = sa.extract_text(sample_rep, ext)
+                        sa = get_style_analyzer(api_key)
+                        try:
+                            raw_text, sample_sections = extract_sample(
+                                sample_rep.getvalue(), sample_rep.name, api_key
+                            )
+                        except ValueError as e:
+                            st.warning(f"⚠️ Could not read the sample report, using the standard style. {e}")
                         style_guide = sa.analyze_style(raw_text)
-                        sample_rep.seek(0)
-                        sample_sections = sa.extract_specific_sections(sample_rep, ext)
-                    st.toast("Style & Templates Extracted!", icon="🎨")
+                    if raw_text:
+                        st.toast("Style & Templates Extracted!", icon="🎨")
 
                 test_metrics_text = ""
                 if test_metrics:
@@ -212,7 +259,10 @@ with tab3:
                 sample_metadata = {}
                 if sample_rep and raw_text:
                     with st.spinner("Extracting High-Level Metadata from Sample..."):
-                        sample_metadata = gen.extract_metadata_from_sample(raw_text)
+                        try:
+                            sample_metadata = extract_sample_metadata(raw_text, api_key)
+                        except ValueError:
+                            sample_metadata = {}
 
                 with st.spinner("Deriving project context from codebase..."):
                     context = gen.derive_project_context(summary.to_json())
@@ -227,9 +277,8 @@ with tab3:
                         final_names = str(sample_metadata["team_names"])
 
                 # Determine mode based on line breaks and clean to Title Case
-                name_lines = [
-                    n.strip().title() for n in final_names.split("\n") if n.strip()
-                ]
+                stripped = (n.strip() for n in final_names.split("\n"))
+                name_lines = [n.title() for n in stripped if n]
                 name_count = len(name_lines)
                 pronoun_mode = "singular" if name_count <= 1 else "plural"
 
@@ -0,0 +1,61 @@
+from .base_ant import Ant, AntResult
+from typing import Dict, Any, List
+from src.ai.report_generator import ReportGenerator, is_section_error
+from .content_ant import shared_generator
+from src.blast.cache import content_key, section_cache
+
+
+class BatchContentAnt(Ant):
+    """
+    Ant that generates text content for several sections in one LLM call.
+    Wraps src.ai.report_generator.generate_sections.
+    """
+
+    def execute(self, nodes: List[Any], context: Dict[str, Any]) -> AntResult:
+        try:
+            api_key = context.get("api_key")
+            if not api_key:
+                return AntResult(success=False, error="Missing API Key")
+
+            section_names = [
+                node.text if hasattr(node, "text") else "Unknown Section"
+                for node in nodes
+            ]
+            project_summary = context.get("project_summary", {})
+            user_context = dict(context.get("user_context", {}))
+
+            # Same cache as ContentAnt; only the misses go to the LLM
+            keys = {
+                name: content_key(name, project_summary, user_context)
+                for name in section_names
+            }
+            sections = {}
+            for name, key in keys.items():
+                cached = section_cache.get(key)
+                if cached:
+                    sections[name] = cached
+            missing = [name for name in keys if name not in sections]
+
+            if missing:
+                # Generate; the result maps section name -> text, sections the
+                # model skipped are simply absent. A single miss goes through
+                # generate_section, whose error text is dropped like a skip so
+                # the Architect retries that node instead of caching the error.
+                generator = shared_generator(api_key, ReportGenerator)
+                generated = generator.generate_sections(
+                    section_names=missing,
+                    project_summary=project_summary,
+                    user_context=user_context,
+                )
+                for name, content in generated.items():
+                    if content and not is_section_error(content):
+                        section_cache.set(keys[name], content)
+                        sections[name] = content
+
+            if sections:
+                return AntResult(success=True, data=sections)
+            else:
+                return AntResult(success=False, error="Empty content generated")
+
+        except Exception as e:
+            return AntResult(success=False, error=str(e))
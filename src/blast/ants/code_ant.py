@@ -5,6 +5,9 @@ import os
 # from src.analysis.code_analyzer import CodeAnalyzer
 import importlib
 
+# Resolved on first execute, then reused
+_CodeAnalyzer = None
+
 
 class CodeAnt(Ant):
     """
@@ -14,9 +17,12 @@ class CodeAnt(Ant):
 
     def execute(self, payload: Union[str, Dict], context: Dict[str, Any]) -> AntResult:
         try:
-            # Lazy import
-            analyzer_module = importlib.import_module("src.analysis.code_analyzer")
-            CodeAnalyzer = analyzer_module.CodeAnalyzer
+            # Lazy import, once per process
+            global _CodeAnalyzer
+            if _CodeAnalyzer is None:
+                _CodeAnalyzer = importlib.import_module(
+                    "src.analysis.code_analyzer"
+                ).CodeAnalyzer
 
             # Payload can be directory/zip path
             target_path = payload if isinstance(payload, str) else payload.get("path")
@@ -24,7 +30,7 @@ class CodeAnt(Ant):
             if not target_path or not os.path.exists(target_path):
                 return AntResult(success=False, error=f"Invalid path: {target_path}")
 
-            analyzer = CodeAnalyzer()
+            analyzer = _CodeAnalyzer()
 
             if target_path.endswith(".zip"):
                 summary = analyzer.analyze_zip(target_path)
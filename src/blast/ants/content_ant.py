@@ -1,7 +1,26 @@
 from .base_ant import Ant, AntResult
-from typing import Dict, Any
-import os
-from src.ai.report_generator import ReportGenerator
+from typing import Dict, Any, Tuple
+import threading
+from src.ai.report_generator import ReportGenerator, is_section_error
+from src.blast.cache import content_key, section_cache
+
+# Generators shared by every content Ant. A ReportGenerator loads the section
+# cache file on construction and rewrites it on save, so separate instances
+# re-read it per call and drop each other's entries when running concurrently.
+_generators: Dict[Tuple[Any, str], ReportGenerator] = {}
+_generators_lock = threading.Lock()
+
+
+def shared_generator(api_key: str, generator_cls=None) -> ReportGenerator:
+    """Returns the process-wide generator for ``api_key``."""
+    # Keyed by class too, so each module's (possibly patched) name is honoured
+    generator_cls = generator_cls or ReportGenerator
+    with _generators_lock:
+        generator = _generators.get((generator_cls, api_key))
+        if generator is None:
+            generator = generator_cls(api_key=api_key)
+            _generators[(generator_cls, api_key)] = generator
+        return generator
 
 
 class ContentAnt(Ant):
@@ -12,12 +31,10 @@ class ContentAnt(Ant):
 
     def execute(self, node: Any, context: Dict[str, Any]) -> AntResult:
         try:
-            api_key = os.getenv("GROQ_API_KEY") or context.get("api_key")
+            api_key = context.get("api_key")
             if not api_key:
                 return AntResult(success=False, error="Missing API Key")
 
-            generator = ReportGenerator(api_key=api_key)
-
             # Prepare context for generator
             # The generator expects: section_name, project_summary_dict, user_context
             section_name = node.text if hasattr(node, "text") else "Unknown Section"
@@ -25,11 +42,19 @@ class ContentAnt(Ant):
             # Extract project summary from global context
             project_summary = context.get("project_summary", {})
 
-            # Extract user context
-            user_context = context.get("user_context", {})
+            # Extract user context (a copy: sections are generated concurrently)
+            user_context = dict(context.get("user_context", {}))
+
+            # Identical inputs produce the same section; skip the LLM on re-runs
+            cache_key = content_key(section_name, project_summary, user_context)
+            cached = section_cache.get(cache_key)
+            if cached:
+                return AntResult(success=True, content=cached)
+
             user_context["current_section"] = section_name
 
             # Generate
+            generator = shared_generator(api_key)
             content = generator.generate_section(
                 section_name=section_name,
                 project_summary=project_summary,
@@ -37,6 +62,9 @@ class ContentAnt(Ant):
             )
 
             if content:
+                # generate_section reports failures as text; those aren't cached
+                if not is_section_error(content):
+                    section_cache.set(cache_key, content)
                 return AntResult(success=True, content=content)
             else:
                 return AntResult(success=False, error="Empty content generated")
@@ -4,6 +4,9 @@ from typing import Dict, Any, List
 # from src.file_formatting.formatting import generate_report # Avoid top level import if possible to prevent circular deps
 import importlib
 
+# Resolved on first execute, then reused
+_generate_report = None
+
 
 class FormatAnt(Ant):
     """
@@ -13,11 +16,12 @@ class FormatAnt(Ant):
 
     def execute(self, payload: Dict[str, Any], context: Dict[str, Any]) -> AntResult:
         try:
-            # Lazy import
-            formatting_module = importlib.import_module(
-                "src.file_formatting.formatting"
-            )
-            generate_report = formatting_module.generate_report
+            # Lazy import, once per process
+            global _generate_report
+            if _generate_report is None:
+                _generate_report = importlib.import_module(
+                    "src.file_formatting.formatting"
+                ).generate_report
 
             # Payload should contain structure and output path
             structure = payload.get("structure")
@@ -32,7 +36,7 @@ class FormatAnt(Ant):
             visual_style = payload.get("visual_style", {})
             style_name = payload.get("style_name", "Standard")
 
-            generate_report(
+            _generate_report(
                 structure=structure,
                 output_path=output_path,
                 style_name=style_name,
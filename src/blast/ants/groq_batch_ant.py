@@ -0,0 +1,128 @@
+from .base_ant import Ant, AntResult
+from typing import Dict, Any, List
+import json
+import os
+import time
+from src.ai.report_generator import ReportGenerator, TEMPLATE_SECTIONS
+from src.ai.utils import chat_request_body, get_client
+from src.blast.cache import content_key, section_cache
+from .content_ant import shared_generator
+
+BATCH_COMPLETION_WINDOW = "24h"
+# Seconds between batch status checks
+BATCH_POLL_INTERVAL = float(os.getenv("BLAST_BATCH_POLL_INTERVAL", "60"))
+
+_BATCH_ENDPOINT = "/v1/chat/completions"
+_FINAL_STATES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+class GroqBatchAnt(Ant):
+    """
+    Ant that generates text content for many sections through Groq's Batch API:
+    one JSONL upload processed asynchronously, at half the price of inline calls
+    and outside the per-minute rate limits. Blocks until the batch finishes
+    (up to the 24h completion window), so it is meant for unattended runs.
+    Selected by the Architect when BLAST_BATCH_MODE=groq.
+    """
+
+    def execute(self, nodes: List[Any], context: Dict[str, Any]) -> AntResult:
+        try:
+            api_key = context.get("api_key")
+            if not api_key:
+                return AntResult(success=False, error="Missing API Key")
+
+            generator = shared_generator(api_key, ReportGenerator)
+            project_summary = context.get("project_summary", {})
+            user_context = dict(context.get("user_context", {}))
+
+            # data maps section name -> text, like BatchContentAnt
+            sections = {}
+            requests = {}  # custom_id -> (section name, cache key)
+            lines = []
+            section_names = [
+                node.text if hasattr(node, "text") else "Unknown Section"
+                for node in nodes
+            ]
+            for section_name in dict.fromkeys(section_names):
+                if section_name.lower() in TEMPLATE_SECTIONS:
+                    sections[section_name] = generator.fill_template(
+                        section_name, user_context
+                    )
+                    continue
+
+                key = content_key(section_name, project_summary, user_context)
+                cached = section_cache.get(key)
+                if cached:
+                    sections[section_name] = cached
+                    continue
+
+                custom_id = f"section_{len(requests)}"
+                requests[custom_id] = (section_name, key)
+                prompt = generator.section_prompt(
+                    section_name, project_summary, user_context
+                )
+                lines.append(
+                    json.dumps(
+                        {
+                            "custom_id": custom_id,
+                            "method": "POST",
+                            "url": _BATCH_ENDPOINT,
+                            "body": chat_request_body(prompt),
+                        }
+                    )
+                )
+
+            if lines:
+                # Shared clients leave retries to generate_with_retry; keep the SDK's here
+                client = get_client(api_key).with_options(max_retries=2)
+                outputs = self._run_batch(client, "\n".join(lines))
+                for custom_id, content in outputs.items():
+                    if custom_id in requests and content:
+                        section_name, key = requests[custom_id]
+                        section_cache.set(key, content)
+                        sections[section_name] = content
+
+            if sections:
+                return AntResult(success=True, data=sections)
+            else:
+                return AntResult(success=False, error="Empty content generated")
+
+        except Exception as e:
+            return AntResult(success=False, error=str(e))
+
+    @staticmethod
+    def _run_batch(client, jsonl: str) -> Dict[str, str]:
+        """Uploads the requests, waits for the batch and returns custom_id -> text."""
+        batch_file = client.files.create(
+            file=("blast_sections.jsonl", jsonl.encode("utf-8")), purpose="batch"
+        )
+        batch = client.batches.create(
+            completion_window=BATCH_COMPLETION_WINDOW,
+            endpoint=_BATCH_ENDPOINT,
+            input_file_id=batch_file.id,
+        )
+        print(
+            f"GroqBatchAnt: Submitted batch {batch.id}, "
+            f"polling every {BATCH_POLL_INTERVAL:g}s"
+        )
+
+        while batch.status not in _FINAL_STATES:
+            time.sleep(BATCH_POLL_INTERVAL)
+            batch = client.batches.retrieve(batch.id)
+
+        # An expired batch still returns what it finished
+        if not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+        outputs = {}
+        for line in client.files.content(batch.output_file_id).text().splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            choices = (response.get("body") or {}).get("choices") or []
+            if choices:
+                outputs[record["custom_id"]] = choices[0]["message"]["content"]
+        return outputs
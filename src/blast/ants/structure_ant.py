@@ -1,9 +1,14 @@
 from .base_ant import Ant, AntResult
 from typing import Dict, Any, List
 import json
-import os
+from pathlib import Path
 from src.ai.structurer import structure_text
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class StructureAnt(Ant):
     """
@@ -17,9 +22,13 @@ class StructureAnt(Ant):
             # Let's assume payload is raw text or a dict with text
             raw_text = payload
             if isinstance(payload, dict):
-                raw_text = payload.get("text", "")
+                if payload.get("text_path"):
+                    # Large documents are handed over as a text file
+                    raw_text = Path(payload["text_path"]).read_text(encoding="utf-8")
+                else:
+                    raw_text = payload.get("text", "")
 
-            api_key = os.getenv("GROQ_API_KEY") or context.get("api_key")
+            api_key = context.get("api_key")
             style_name = context.get("style_name", "Standard")
 
             # Call the structurer
@@ -27,7 +36,8 @@ class StructureAnt(Ant):
 
             # Parse the result
             try:
-                structure_data = json.loads(json_str)
+                # orjson.JSONDecodeError subclasses json.JSONDecodeError
+                structure_data = (orjson or json).loads(json_str)
                 return AntResult(success=True, data=structure_data)
             except json.JSONDecodeError:
                 return AntResult(
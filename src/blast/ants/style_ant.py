@@ -1,7 +1,11 @@
 from .base_ant import Ant, AntResult
 from typing import Dict, Any, Union
 import os
-from src.analysis.style_analyzer import StyleAnalyzer, await_module_availability
+from src.analysis.style_analyzer import (
+    StyleAnalyzer,
+    STYLE_EXCERPT_CHARS,
+    await_module_availability,
+)
 
 
 class StyleAnt(Ant):
@@ -20,14 +24,18 @@ class StyleAnt(Ant):
             if not file_path or not os.path.exists(file_path):
                 return AntResult(success=False, error=f"Invalid file path: {file_path}")
 
-            api_key = os.getenv("GROQ_API_KEY") or context.get("api_key")
+            api_key = context.get("api_key")
             analyzer = StyleAnalyzer(api_key=api_key)
 
             # Analyze Visual Style
             visual_style = analyzer.analyze_visual_style(file_path)
 
-            # Analyze Tonal Style (requires extraction first)
-            text_content = analyzer.extract_text(file_path, file_path.split(".")[-1])
+            # Analyze Tonal Style (requires extraction first). The analyzer reuses
+            # the DOCX it just parsed, and only the excerpt analyze_style quotes
+            # is read (no OCR past it for PDFs).
+            text_content = analyzer.extract_text(
+                file_path, file_path.split(".")[-1], max_chars=STYLE_EXCERPT_CHARS
+            )
             style_guide = analyzer.analyze_style(text_content)
 
             result_data = {"visual_style": visual_style, "style_guide": style_guide}
@@ -1,10 +1,40 @@
+import json
+import os
+import random
+import re
 import time
-from typing import Optional, List
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from itertools import count
+from typing import Iterator, Optional, List
 from .blueprint import Blueprint, DocumentNode
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # We will import Ants later to avoid circular imports if any,
 # or we can import them here if they are independent.
 
+# Node types whose results later nodes depend on; never run concurrently
+_SEQUENTIAL_TYPES = frozenset({"structure_analysis", "style_analysis"})
+# Node types ContentAnt writes; these can share one LLM call
+_CONTENT_TYPES = frozenset({"heading", "subheading", "chapter", "section_content"})
+# Outline items from the structure that get content generated
+_GENERATABLE_TYPES = frozenset({"heading", "subheading", "chapter"})
+# Node types that need no Ant and count as done
+_PASSIVE_TYPES = frozenset({"title", "reference", "code", "paragraph"})
+
+# Retry backoff: RETRY_BASE_DELAY doubled per failed attempt plus up to 1s of
+# jitter, capped at RETRY_MAX_DELAY; a wait the server names takes precedence
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+_RETRY_AFTER_RE = re.compile(
+    r"(?:try again in|retry[- ]after:?)\s*(\d+(?:\.\d+)?)\s*s", re.IGNORECASE
+)
+# Ant errors that no retry can fix
+_PERMANENT_ERRORS = ("Missing API Key", "Invalid path", "Invalid file path")
+
 
 class Architect:
     """
@@ -15,6 +45,12 @@ class Architect:
     def __init__(self, blueprint: Blueprint):
         self.blueprint = blueprint
         self.max_retries = 3
+        self.max_workers = 8  # Concurrent content nodes (LLM calls) per pass
+        self.batch_size = 3  # Sections per LLM call; 3 x 350 words fits one completion
+        self._id_seq = count()  # Ids for nodes created by _expand_structure
+        self._ants = None  # node type -> Ant, built on first use (see _select_ant)
+        # "groq": content nodes go through the Groq Batch API (see GroqBatchAnt)
+        self.batch_mode = os.getenv("BLAST_BATCH_MODE", "").lower()
 
     def plan(self):
         """Analyze the blueprint and determine next steps."""
@@ -32,25 +68,69 @@ class Architect:
             if not pending_nodes:
                 break
 
-            for node in pending_nodes:
-                print(f"Architect: Processing node {node.id} ({node.type})")
+            # Analysis nodes set context (style guide) and add new nodes, so they
+            # run first and in order. Content nodes are independent LLM calls and
+            # are network-bound, so they run concurrently.
+            sequential = [n for n in pending_nodes if n.type in _SEQUENTIAL_TYPES]
+            concurrent = [n for n in pending_nodes if n.type not in _SEQUENTIAL_TYPES]
 
-                # Special handling for expansion BEFORE execution? No, execute first.
+            for node in sequential:
+                print(f"Architect: Processing node {node.id} ({node.type})")
                 success = self._process_node_with_retry(node)
+                remote_work = self._record_result(node, success) or remote_work
 
-                if success:
-                    self.blueprint.update_node(node.id, status="completed")
-                    remote_work = True
-
-                    # --- Post-Processing / Expansion ---
-                    if node.type == "structure_analysis" and node.content:
-                        # The content is the JSON structure strings or list dicts
-                        # We need to expand this into new nodes
-                        self._expand_structure(node.content)
+            if concurrent and self.batch_mode == "groq":
+                # All content nodes in one asynchronous batch job
+                content = [n for n in concurrent if n.type in _CONTENT_TYPES]
+                if content:
+                    from .ants.groq_batch_ant import GroqBatchAnt
 
+                    print(
+                        f"Architect: Sending {len(content)} nodes to the Groq Batch API"
+                    )
+                    outcome = self._process_batch(content, GroqBatchAnt())
+                    for node in content:
+                        success = outcome[node.id]
+                        remote_work = self._record_result(node, success) or remote_work
+                    concurrent = [n for n in concurrent if n.type not in _CONTENT_TYPES]
+
+            if concurrent:
+                # Content nodes are grouped so several sections share one request
+                content = [n for n in concurrent if n.type in _CONTENT_TYPES]
+                if self.batch_size > 1 and len(content) > 1:
+                    singles = [n for n in concurrent if n.type not in _CONTENT_TYPES]
+                    batches = [
+                        content[i : i + self.batch_size]
+                        for i in range(0, len(content), self.batch_size)
+                    ]
                 else:
-                    self.blueprint.update_node(node.id, status="failed")
-                    print(f"Architect: Node {node.id} failed after retries.")
+                    singles, batches = concurrent, []
+
+                workers = min(self.max_workers, len(singles) + len(batches))
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = {}
+                    for node in singles:
+                        print(f"Architect: Processing node {node.id} ({node.type})")
+                        futures[pool.submit(self._process_node_with_retry, node)] = [
+                            node
+                        ]
+                    for batch in batches:
+                        print(
+                            "Architect: Processing nodes "
+                            f"{', '.join(n.id for n in batch)} as one batch"
+                        )
+                        futures[pool.submit(self._process_batch, batch)] = batch
+                    for future in as_completed(futures):
+                        outcome = future.result()
+                        for node in futures[future]:
+                            success = (
+                                outcome[node.id]
+                                if isinstance(outcome, dict)
+                                else outcome
+                            )
+                            remote_work = (
+                                self._record_result(node, success) or remote_work
+                            )
 
             if not remote_work:
                 # No work was done in this pass, and pending nodes exist (failed ones?)
@@ -58,15 +138,30 @@ class Architect:
                 break
 
         print("Architect: Execution finished.")
-        self.blueprint.save()
+        self.blueprint.save(force=True)
+
+    def _record_result(self, node: DocumentNode, success: bool) -> bool:
+        """Marks a processed node and expands structure results. Returns success."""
+        if success:
+            self.blueprint.update_node(node.id, status="completed")
+
+            # --- Post-Processing / Expansion ---
+            if node.type == "structure_analysis" and node.content:
+                # The content is the JSON structure strings or list dicts
+                # We need to expand this into new nodes
+                self._expand_structure(node.content)
+
+        else:
+            self.blueprint.update_node(node.id, status="failed")
+            print(f"Architect: Node {node.id} failed after retries.")
+
+        return success
 
     def _expand_structure(self, structure_data):
         """Expands structure JSON into blueprint nodes."""
-        import json
-
         try:
             if isinstance(structure_data, str):
-                data = json.loads(structure_data)
+                data = (orjson or json).loads(structure_data)
             else:
                 data = structure_data
 
@@ -79,13 +174,10 @@ class Architect:
                 # 'heading' -> 'section_content' (to trigger ContentAnt)
                 # 'paragraph' -> 'section_content'
 
-                new_type = item.get("type")
-                if new_type in ["heading", "subheading", "chapter", "paragraph"]:
-                    # For now, let's treat them all as content generation targets
-                    # But 'paragraph' from `structurer` is usually existing text.
-                    # If we are generating a report, we often start with outlines.
-                    # Let's assume the structure returned IS the outline we want to generate content for.
-                    pass
+                # For now, let's treat headings and paragraphs as content generation targets
+                # But 'paragraph' from `structurer` is usually existing text.
+                # If we are generating a report, we often start with outlines.
+                # Let's assume the structure returned IS the outline we want to generate content for.
 
                 # In this specific app flow, 'structurer' analyzes EXISTING text.
                 # If we want to GENERATE a report, we usually start with an outline.
@@ -100,34 +192,42 @@ class Architect:
 
                 node = DocumentNode(
                     type=item.get("type", "unknown"),
-                    text=item.get("text", ""),
-                    id=f"gen_{int(time.time()*1000)}_{item.get('text')[:5]}",
+                    text=item.get("text") or "",
+                    id=f"gen_{next(self._id_seq)}",
                     status=(
                         "pending"
-                        if item.get("type") in ["heading", "subheading", "chapter"]
+                        if item.get("type") in _GENERATABLE_TYPES
                         else "completed"
                     ),  # Only generate content for headings?
                 )
-                self.blueprint.document_structure.append(node)
+                self.blueprint.add_node(node)
 
         except Exception as e:
             print(f"Architect: Expansion failed: {e}")
 
+    @staticmethod
+    def _resolve_deferred(node: DocumentNode):
+        """Waits for payload parts still produced in the background (see Trigger)."""
+        if isinstance(node.text, Future):
+            node.text = node.text.result()
+        for key, value in node.metadata.items():
+            if isinstance(value, Future):
+                node.metadata[key] = value.result()
+
     def _process_node_with_retry(self, node: DocumentNode) -> bool:
         """Execute the appropriate Ant with retry logic."""
         attempt = 0
         while attempt < self.max_retries:
             try:
+                self._resolve_deferred(node)
+
                 # Select Ant based on Node Type
                 ant = self._select_ant(node)
                 if not ant:
                     # Some nodes like 'title' might not need processing content generation
                     # or they are already processed.
-                    if node.type in ["title", "reference", "code"]:
-                        # Passive nodes
-                        return True
-                    if node.type in ["paragraph"]:
-                        # If it's just a paragraph node from structure, maybe we don't need to do anything
+                    # Passive nodes; a paragraph node from structure needs nothing either
+                    if node.type in _PASSIVE_TYPES:
                         return True
 
                     print(f"Architect: No Ant found for node type {node.type}")
@@ -138,8 +238,8 @@ class Architect:
                 # StructureAnt expects text.
                 # StyleAnt expects file path (in text or metadata).
                 payload = node.text
-                if node.type == "style_analysis":
-                    payload = node.metadata  # Pass metadata which has file_path
+                if node.type == "style_analysis" or node.metadata.get("text_path"):
+                    payload = node.metadata  # Has file_path / text_path
 
                 result = ant.execute(payload, self.blueprint.get_context())
 
@@ -166,30 +266,71 @@ class Architect:
                     if result.content:
                         error_msg += f"\n   Raw Content: {result.content[:500]}..."  # Log first 500 chars
                     print(error_msg)
+                    if str(result.error).startswith(_PERMANENT_ERRORS):
+                        return False
                     attempt += 1
-                    time.sleep(1)  # Simple backoff
+                    if attempt < self.max_retries:
+                        time.sleep(self._retry_delay(attempt, result.error))
 
             except Exception as e:
                 print(f"Architect: Critical Error (Attempt {attempt+1}): {e}")
                 attempt += 1
-                time.sleep(1)
+                if attempt < self.max_retries:
+                    time.sleep(self._retry_delay(attempt, str(e)))
 
         return False
 
-    def finalize(self, output_path: str = "blast_output.docx"):
-        """Compiles the blueprint into a final document."""
-        print("Architect: Finalizing document...")
-
-        # 1. Construct structure for FormatAnt
-        structure_for_format = []
+    @staticmethod
+    def _retry_delay(attempt: int, error: Optional[str]) -> float:
+        """Seconds to wait before retry number ``attempt`` (1-based)."""
+        match = _RETRY_AFTER_RE.search(error or "")
+        if match:
+            return min(RETRY_MAX_DELAY, float(match.group(1)))
+        backoff = RETRY_BASE_DELAY * 2 ** (attempt - 1) + random.random()
+        return min(RETRY_MAX_DELAY, backoff)
+
+    def _process_batch(self, nodes: List[DocumentNode], ant=None) -> dict:
+        """
+        Generates content for several nodes with one call of a batch Ant
+        (BatchContentAnt unless given). Nodes the batch could not fill go
+        through _process_node_with_retry. Returns {node id: success}.
+        """
+        if ant is None:
+            from .ants.batch_content_ant import BatchContentAnt
+
+            ant = BatchContentAnt()
+
+        sections = {}
+        try:
+            result = ant.execute(nodes, self.blueprint.get_context())
+            if result.success:
+                sections = result.data
+            else:
+                print(
+                    f"Architect: Batch failed, falling back to single nodes: {result.error}"
+                )
+        except Exception as e:
+            print(f"Architect: Batch failed, falling back to single nodes: {e}")
+
+        outcome = {}
+        for node in nodes:
+            content = sections.get(node.text)
+            if content:
+                self.blueprint.update_node(node.id, content=content)
+                outcome[node.id] = True
+            else:
+                outcome[node.id] = self._process_node_with_retry(node)
+        return outcome
 
+    def _format_items(self) -> Iterator[dict]:
+        """Yields the FormatAnt structure items for the document, in order."""
         # Sort nodes by some order? They are in list order in document_structure
         for node in self.blueprint.document_structure:
-            if node.type in ["style_analysis", "structure_analysis"]:
+            if node.type in _SEQUENTIAL_TYPES:
                 continue
 
             # Add the element itself (e.g. the Heading)
-            structure_for_format.append({"type": node.type, "text": node.text})
+            yield {"type": node.type, "text": node.text}
 
             # If it has generated content, add that as a paragraph following it
             if node.content and isinstance(node.content, str):
@@ -197,9 +338,14 @@ class Architect:
                 # No, AntResult.content is usually the generated text.
                 # Avoid duplicating if content == text (unlikely for Headings)
                 if node.content.strip() != node.text.strip():
-                    structure_for_format.append(
-                        {"type": "paragraph", "text": node.content}
-                    )
+                    yield {"type": "paragraph", "text": node.content}
+
+    def finalize(self, output_path: str = "blast_output.docx"):
+        """Compiles the blueprint into a final document."""
+        print("Architect: Finalizing document...")
+
+        # 1. Construct structure for FormatAnt
+        structure_for_format = list(self._format_items())
 
         # 2. Get Visual Style
         context = self.blueprint.get_context()
@@ -227,15 +373,22 @@ class Architect:
 
     def _select_ant(self, node: DocumentNode):
         """Factory method to get the right Ant."""
+        if self._ants is None:
+            # Building it twice from racing workers is harmless
+            self._ants = self._build_ant_registry()
+        return self._ants.get(node.type)
+
+    @staticmethod
+    def _build_ant_registry() -> dict:
+        """One shared instance per Ant; Ants keep no per-call state."""
         # Lazy import to avoid circular dependency issues during init
         from .ants.content_ant import ContentAnt
         from .ants.structure_ant import StructureAnt
         from .ants.style_ant import StyleAnt
 
-        if node.type == "structure_analysis":
-            return StructureAnt()
-        if node.type == "style_analysis":
-            return StyleAnt()
-        if node.type in ["heading", "subheading", "chapter", "section_content"]:
-            return ContentAnt()
-        return None
+        content_ant = ContentAnt()
+        return {
+            "structure_analysis": StructureAnt(),
+            "style_analysis": StyleAnt(),
+            **{node_type: content_ant for node_type in _CONTENT_TYPES},
+        }
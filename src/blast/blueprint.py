@@ -1,9 +1,38 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import List, Dict, Optional, Any
+import atexit
+import functools
 import json
 import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from pathlib import Path
 from src.analysis.project_summary import ProjectSummary
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# save() writes at most once per this many seconds unless forced
+SAVE_INTERVAL = 2.0
+
+
+def _resolve_deferred(obj):
+    """Serializer fallback: node text may still be a Future (see Trigger)."""
+    if isinstance(obj, Future):
+        return obj.result()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _flush_at_exit(flush: weakref.WeakMethod):
+    """atexit hook: flushes the blueprint if it is still alive."""
+    method = flush()
+    if method is not None:
+        method()
+
 
 @dataclass
 class DocumentNode:
@@ -17,6 +46,11 @@ class DocumentNode:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+# Serialized DocumentNode keys, in field order. A shallow copy, unlike
+# dataclasses.asdict, which deep-copies values (text may be a pending Future).
+_NODE_FIELDS = tuple(f.name for f in fields(DocumentNode))
+
+
 class Blueprint:
     """
     The Blueprint maintains the state of the project and the document.
@@ -25,25 +59,67 @@ class Blueprint:
 
     def __init__(self, project_summary: ProjectSummary):
         self.project_summary = project_summary
-        self.document_structure: List[DocumentNode] = []
-        self.context: Dict[str, Any] = {}
+        # Resolved once here; Ants read it from the context
+        self.context: Dict[str, Any] = {"api_key": os.getenv("GROQ_API_KEY")}
         self.db_path = "project_memory.json"
+        # The Architect updates nodes and context from worker threads
+        self._lock = threading.Lock()
+        self.document_structure: List[DocumentNode] = []
+        # Debounced persistence, see save()
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._last_save = float("-inf")
+        # Weak, so the hook doesn't keep every Blueprint alive until exit;
+        # a partial per instance so close() unregisters only this one
+        self._exit_hook = functools.partial(
+            _flush_at_exit, weakref.WeakMethod(self._flush)
+        )
+        atexit.register(self._exit_hook)
+
+    @property
+    def document_structure(self) -> List[DocumentNode]:
+        return self._structure
+
+    @document_structure.setter
+    def document_structure(self, nodes: List[DocumentNode]):
+        # id -> node, plus the pending ids in document order (dict as ordered set)
+        self._structure = nodes
+        self._by_id: Dict[str, DocumentNode] = {}
+        self._pending: Dict[str, None] = {}
+        self._indexed = 0
+        self._sync_index()
+
+    def _sync_index(self):
+        """Indexes nodes appended to document_structure since the last call."""
+        for node in self._structure[self._indexed :]:
+            self._by_id.setdefault(node.id, node)
+            if node.status == "pending":
+                self._pending[node.id] = None
+        self._indexed = len(self._structure)
+
+    def add_node(self, node: DocumentNode):
+        """Append a node to the document, keeping the id index in sync."""
+        with self._lock:
+            self._structure.append(node)
+            self._sync_index()
 
     def load_structure(self, structure_data: List[Dict]):
         """Load initial structure from list of dicts."""
-        self.document_structure = []
-        for i, item in enumerate(structure_data):
-            node = DocumentNode(
+        self.document_structure = [
+            DocumentNode(
                 type=item.get("type", "unknown"),
                 text=item.get("text", ""),
                 id=f"node_{i}",
                 status="pending",
             )
-            self.document_structure.append(node)
+            for i, item in enumerate(structure_data)
+        ]
 
     def get_pending_nodes(self) -> List[DocumentNode]:
         """Return list of nodes that need processing."""
-        return [n for n in self.document_structure if n.status == "pending"]
+        with self._lock:
+            self._sync_index()
+            return [self._by_id[i] for i in self._pending]
 
     def update_node(
         self,
@@ -53,16 +129,24 @@ class Blueprint:
         metadata: Optional[Dict] = None,
     ):
         """Update a node's state."""
-        for node in self.document_structure:
-            if node.id == node_id:
-                if content is not None:
-                    node.content = content
-                if status is not None:
-                    node.status = status
-                if metadata:
-                    node.metadata.update(metadata)
-                return True
-        return False
+        with self._lock:
+            node = self._by_id.get(node_id)
+            if node is None:
+                self._sync_index()
+                node = self._by_id.get(node_id)
+            if node is None:
+                return False
+            if content is not None:
+                node.content = content
+            if status is not None:
+                node.status = status
+                if status == "pending":
+                    self._pending[node_id] = None
+                else:
+                    self._pending.pop(node_id, None)
+            if metadata:
+                node.metadata.update(metadata)
+            return True
 
     def get_context(self) -> Dict[str, Any]:
         """Return global context."""
@@ -70,30 +154,71 @@ class Blueprint:
 
     def set_context(self, key: str, value: Any):
         """Set a global context value."""
-        self.context[key] = value
+        with self._lock:
+            self.context[key] = value
 
     def to_json(self) -> Dict:
         """Serialize state for persistence."""
         return {
             "project_summary": self.project_summary.to_json(),
             "document_structure": [
-                {
-                    "type": n.type,
-                    "text": n.text,
-                    "content": n.content,
-                    "id": n.id,
-                    "status": n.status,
-                    "metadata": n.metadata,
-                }
+                {name: getattr(n, name) for name in _NODE_FIELDS}
                 for n in self.document_structure
             ],
-            "context": self.context,
+            "context": self._persisted_context(),
         }
 
-    def save(self):
-        """Persist state to disk."""
-        with open(self.db_path, "w") as f:
-            json.dump(self.to_json(), f, indent=2)
+    def _persisted_context(self) -> Dict[str, Any]:
+        # The API key is never written to disk
+        return {k: v for k, v in self.context.items() if k != "api_key"}
+
+    def save(self, force: bool = False):
+        """
+        Persist state to disk. Calls within SAVE_INTERVAL of the previous write
+        only mark the state dirty; it is written by the next save past the
+        interval, a forced save, close(), or at interpreter exit.
+        """
+        with self._save_lock:
+            self._dirty = True
+            if force or time.monotonic() - self._last_save >= SAVE_INTERVAL:
+                self._save_now()
+
+    def close(self):
+        """Writes pending state and drops the atexit hook."""
+        atexit.unregister(self._exit_hook)
+        self._flush()
+
+    def _flush(self):
+        """Writes pending state, if any (registered with atexit)."""
+        with self._save_lock:
+            if self._dirty:
+                try:
+                    self._save_now()
+                except Exception as e:
+                    print(f"Failed to save blueprint: {e}")
+
+    def _save_now(self):
+        if orjson is not None:
+            # Encodes straight to bytes in C; the state embeds the full summary.
+            # orjson serializes the DocumentNode dataclasses itself, so the
+            # per-node dicts to_json builds are skipped.
+            state = {
+                "project_summary": self.project_summary.to_json(),
+                "document_structure": self.document_structure,
+                "context": self._persisted_context(),
+            }
+            Path(self.db_path).write_bytes(
+                orjson.dumps(
+                    state,
+                    default=_resolve_deferred,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                )
+            )
+        else:
+            with open(self.db_path, "w") as f:
+                json.dump(self.to_json(), f, indent=2, default=_resolve_deferred)
+        self._dirty = False
+        self._last_save = time.monotonic()
 
     def load(self):
         """Load state from disk."""
@@ -0,0 +1,94 @@
+"""
+Persistent cache for generated section content.
+Entries are keyed by a hash of everything the prompt is built from and kept in a
+shelve file (with a 7 day TTL) plus a small in-process LRU, so re-running the
+Architect on unchanged input skips the LLM entirely.
+"""
+
+import hashlib
+import json
+import shelve
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+CACHE_PATH = ".blast_cache"  # dbm may add its own suffix (e.g. .db)
+TTL_SECONDS = 7 * 24 * 60 * 60
+MEMORY_ENTRIES = 256
+
+
+def content_key(
+    section_name: str, project_summary: Any, user_context: Dict[str, Any]
+) -> str:
+    """Stable key for one generate_section call."""
+    payload = json.dumps(
+        {"section": section_name, "summary": project_summary, "ctx": user_context},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.blake2b(payload.encode("utf-8")).hexdigest()
+
+
+class ContentCache:
+    """
+    Memory LRU in front of a shelve store. Values are stored as
+    (timestamp, content); anything older than ttl reads as a miss.
+    Thread-safe, since the Architect runs ants concurrently.
+    """
+
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        ttl: float = TTL_SECONDS,
+        max_memory: int = MEMORY_ENTRIES,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_memory = max_memory
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _fresh(self, entry) -> bool:
+        return time.time() - entry[0] <= self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                try:
+                    with shelve.open(self.path, flag="c") as db:
+                        entry = db.get(key)
+                except Exception as e:
+                    print(f"Failed to read content cache: {e}")
+                    return None
+                if entry is None:
+                    return None
+                self._remember(key, entry)
+            else:
+                self._memory.move_to_end(key)
+
+            if not self._fresh(entry):
+                self._memory.pop(key, None)
+                return None
+            return entry[1]
+
+    def set(self, key: str, content: str):
+        entry = (time.time(), content)
+        with self._lock:
+            self._remember(key, entry)
+            try:
+                with shelve.open(self.path, flag="c") as db:
+                    db[key] = entry
+            except Exception as e:
+                print(f"Failed to write content cache: {e}")
+
+    def _remember(self, key: str, entry: tuple):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+
+# Shared by every ContentAnt in the process
+section_cache = ContentCache()
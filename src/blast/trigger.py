@@ -1,6 +1,8 @@
 import argparse
+import hashlib
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Ensure project root is in path
@@ -17,6 +19,28 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _extract_to_sidecar(analyzer, file_path: str) -> str:
+    """
+    Extracts the text of file_path into a file under cache/ and returns its
+    path, so the blueprint (and project_memory.json) never holds the full text.
+    Sidecars from earlier versions of the same file are removed.
+    """
+    source = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    path_digest = hashlib.blake2b(source.encode("utf-8"), digest_size=8).hexdigest()
+    version = f"{stat.st_mtime_ns}:{stat.st_size}"
+    version_digest = hashlib.blake2b(version.encode("utf-8"), digest_size=8).hexdigest()
+    os.makedirs("cache", exist_ok=True)
+    text_path = Path("cache", f"extracted_{path_digest}_{version_digest}.txt")
+
+    text = analyzer.extract_text(file_path, file_path)
+    text_path.write_text(text, encoding="utf-8")
+    for stale in text_path.parent.glob(f"extracted_{path_digest}_*.txt"):
+        if stale != text_path:
+            stale.unlink(missing_ok=True)
+    return str(text_path)
+
+
 class Trigger:
     """
     Entry point for the Blast Framework.
@@ -89,7 +113,7 @@ class Trigger:
                 status="pending",
                 metadata={"file_path": args.file},
             )
-            blueprint.document_structure.append(style_node)
+            blueprint.add_node(style_node)
 
             # 2. Structure Analysis Node
             # We need to extract text first to be efficiently passed?
@@ -98,25 +122,32 @@ class Trigger:
             # So let's extract here.
 
             print("Extracting text for structure analysis...")
-            # Use StyleAnalyzer purely for extraction utility
+            # Use StyleAnalyzer purely for extraction utility. The style pass
+            # doesn't need this text, so extraction runs in the background and
+            # the Architect waits for it when it reaches the structure node.
+            # StyleAnt parses the same PDF meanwhile; style_analyzer serializes
+            # the pdfium calls (_PDFIUM_LOCK), so the two never overlap in it.
             analyzer = StyleAnalyzer()
-            text = analyzer.extract_text(args.file, args.file)
+            pool = ThreadPoolExecutor(max_workers=1)
+            path_future = pool.submit(_extract_to_sidecar, analyzer, args.file)
+            pool.shutdown(wait=False)
 
             structure_node = DocumentNode(
                 type="structure_analysis",
-                text=text,  # Passing raw text as payload
+                text="",
                 id="struct_task_1",
                 status="pending",
+                metadata={"text_path": path_future},  # Raw text payload file
             )
-            blueprint.document_structure.append(structure_node)
-
-            blueprint.save()
+            blueprint.add_node(structure_node)
+            # Not saved here, that would wait for the extraction: "init" saves
+            # below and "run" saves when the Architect finishes
 
         architect = Architect(blueprint)
 
         if args.action == "init":
             print("Project Initialized.")
-            blueprint.save()
+            blueprint.save(force=True)
 
         elif args.action == "run":
             architect.run()
@@ -125,6 +156,8 @@ class Trigger:
         else:
             print(f"Unknown action: {args.action}")
 
+        blueprint.close()
+
 
 if __name__ == "__main__":
     trigger = Trigger()
@@ -1,12 +1,15 @@
+import asyncio
 import json
+from collections import Counter
 import re
 import base64
 import zlib
 import requests
-import time
 import concurrent.futures
-from typing import Dict, Any, List
+from typing import Dict, Any, AsyncIterator, List, Tuple
 from src.ai.report_generator import ReportGenerator
+from src.ai.rate_limiter import RateLimitGovernor
+from src.ai.utils import make_async_client
 
 # Centralized Deterministic Schema — Mirrors the sample report structure exactly
 # Subsections can be strings (simple) or dicts with "title" and "subsubsections" keys
@@ -81,6 +84,88 @@ REPORT_SCHEMA = [
     },
 ]
 
+
+def _flatten_schema(schema: List[Dict]) -> List[Dict]:
+    """
+    The schema as one document-order list of normalized entries
+    (chapter_idx, chapter_title, chapter_sub_titles, sub_title, subsub_title,
+    figure, is_subsub): each subsection followed by its sub-subsections.
+    chapter_sub_titles is one tuple per chapter, shared by its entries.
+    A chapter without subsections gets a single entry with sub_title None.
+    """
+    entries = []
+    for chapter_idx, chapter in enumerate(schema):
+        subsections = chapter.get("subsections") or []
+        sub_titles = tuple(
+            sub["title"] if isinstance(sub, dict) else sub for sub in subsections
+        )
+        if not subsections:
+            entries.append(
+                {
+                    "chapter_idx": chapter_idx,
+                    "chapter_title": chapter["title"],
+                    "chapter_sub_titles": sub_titles,
+                    "sub_title": None,
+                    "subsub_title": None,
+                    "figure": None,
+                    "is_subsub": False,
+                }
+            )
+        for sub in subsections:
+            if not isinstance(sub, dict):
+                sub = {"title": sub}
+            entries.append(
+                {
+                    "chapter_idx": chapter_idx,
+                    "chapter_title": chapter["title"],
+                    "chapter_sub_titles": sub_titles,
+                    "sub_title": sub["title"],
+                    "subsub_title": None,
+                    "figure": sub.get("figure"),
+                    "is_subsub": False,
+                }
+            )
+            for subsub in sub.get("subsubsections", []):
+                if not isinstance(subsub, dict):
+                    subsub = {"title": subsub}
+                entries.append(
+                    {
+                        "chapter_idx": chapter_idx,
+                        "chapter_title": chapter["title"],
+                        "chapter_sub_titles": sub_titles,
+                        "sub_title": sub["title"],
+                        "subsub_title": subsub["title"],
+                        "figure": subsub.get("figure"),
+                        "is_subsub": True,
+                    }
+                )
+    return entries
+
+
+_FLAT_SCHEMA = _flatten_schema(REPORT_SCHEMA)
+
+# Body parsing patterns
+_FIGURE_RE = re.compile(r"\[Figure\s*[\d\.]*[:\-]?\s*(.*?)\]", re.IGNORECASE)
+_EXTRACT_CODE_RE = re.compile(r"\[Extract Code:\s*(.*?)\]", re.IGNORECASE)
+_DEF_NAME_RE = re.compile(r"(?:def|class)\s+([a-zA-Z0-9_]+)")
+# Every function/class/method a snippet defines
+_DEFINED_NAME_RE = re.compile(r"^\s*(?:async\s+)?(?:def|class)\s+(\w+)", re.MULTILINE)
+# AST validation patterns, matched case-insensitively instead of lowercasing every block
+_LEAKED_ERROR_RE = re.compile(r"error code:|rate limit reached|rror generating", re.IGNORECASE)
+_FICTIONAL_RE = re.compile(r"fictional|note: the references|j\. smith|\[1\] a\.", re.IGNORECASE)
+_CAPTION_X_RE = re.compile(r"Figure \d+\.\d+ X:", re.IGNORECASE)
+# One stripped, non-blank line per match (plain-text fallback)
+_TEXT_LINE_RE = re.compile(r"^\s*(\S.*?)\s*$", re.MULTILINE)
+
+# Subsections per bundled request: three 300-350 word bodies stay inside
+# the 2048-token completion cap in src.ai.utils
+CHAPTER_BUNDLE_SIZE = 3
+
+# Upper bound on the LLM calls compile_structure keeps in flight at once;
+# the governor finds the actual level from the API's responses
+COMPILE_CONCURRENCY = 5
+
+
 class DocumentCompiler:
     """
     The Core Orchestrator.
@@ -89,7 +174,9 @@ class DocumentCompiler:
     """
 
     def __init__(self, api_key: str):
-        self.generator = ReportGenerator(api_key=api_key)
+        self.api_key = api_key
+        self.governor = RateLimitGovernor(max_concurrency=COMPILE_CONCURRENCY)
+        self.generator = ReportGenerator(api_key=api_key, governor=self.governor)
 
     def compile_structure(
         self, context: Dict[str, Any], summary: Any, progress_callback=None
@@ -97,22 +184,80 @@ class DocumentCompiler:
         """
         Executes the content generation phase. Returns the pre-validation structure array.
         """
-        full_structure = []
+        return asyncio.run(self._collect_structure(context, summary, progress_callback))
+
+    async def _collect_structure(
+        self, context: Dict[str, Any], summary: Any, progress_callback=None
+    ) -> List[Dict]:
+        return [
+            block
+            async for block in self.astream_structure(context, summary, progress_callback)
+        ]
+
+    async def astream_structure(
+        self, context: Dict[str, Any], summary: Any, progress_callback=None
+    ) -> AsyncIterator[Dict]:
+        """
+        Async generator over the structure compile_structure returns, in
+        document order. Every LLM call starts up front; each block is yielded
+        as soon as it and everything before it are ready, and is checked by the
+        AST integrity guard on the way out (the block counts once the stream
+        ends).
+
+        compile_structure is the only consumer so far: DocumentValidator and
+        the renderer both need the whole document, so app.py and
+        run_prod_test.py still go through the list.
+        """
+        layout, jobs, slot_jobs, expected_figures_count = self._plan(context, summary)
+        client = make_async_client(self.api_key)
+        tasks = self._start_jobs(client, jobs, progress_callback)
+        counts = Counter()
+        try:
+            # _parse_body_blocks de-duplicates code snippets across calls,
+            # so it must see the bodies in sequence
+            for item in layout:
+                if isinstance(item, dict):
+                    blocks = [item]
+                elif isinstance(item, tuple):
+                    bundle = await tasks[slot_jobs[item]]
+                    blocks = self._parse_body_blocks(bundle[item[1]], item[0], context)
+                else:
+                    blocks = [{"type": "paragraph", "text": await tasks[item]}]
+
+                for block in blocks:
+                    self._check_block(block)
+                    counts[block.get("type")] += 1
+                    yield block
+
+            # 7. AST Integrity Guard Check
+            self._check_counts(counts, expected_figures_count)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await client.close()
+
+    def _plan(self, context: Dict[str, Any], summary: Any) -> Tuple[list, list, Dict, int]:
+        """
+        (layout, jobs, slot_jobs, expected figure count) for a report. layout
+        holds finished blocks, job indices for generated paragraphs, or
+        (chapter title, subsection title) slots whose body comes from the
+        bundle job slot_jobs names. jobs are (label, generator method, args).
+        """
+        layout = []
 
         # 1. Title Page
-        full_structure.append(
+        layout.append(
             {"type": "title", "text": str(context.get("title", "Writex")).upper()}
         )
         # 2. Dynamic Title Page
-        team_str = ", ".join(
-            [
-                str(n).strip()
-                for n in (context.get("team_names_raw") or [])
-                if str(n).strip()
-            ]
-        )
-        if not team_str:
-            team_str = "[Author Names]"
+        # Cleaned once for the title page and the acknowledgement signature
+        team_names = [
+            name
+            for name in (str(n).strip() for n in (context.get("team_names_raw") or []) if n)
+            if name
+        ]
+        team_str = ", ".join(team_names) or "[Author Names]"
 
         degree = context.get("degree", "B.Tech Computer Science")
         dept = context.get(
@@ -135,17 +280,17 @@ class DocumentCompiler:
             f"{univ}\n"  # Parent University / Location placeholder
             f"Location, {year}"
         )
-        full_structure.append({"type": "title_page_body", "text": title_page_text})
+        layout.append({"type": "title_page_body", "text": title_page_text})
 
         # 2. Certificate & Acknowledgement
         for section in ["Certificate", "Acknowledgement"]:
-            full_structure.append({"type": "section_header", "text": section.upper()})
+            layout.append({"type": "section_header", "text": section.upper()})
             template_text = self.generator.fill_template(section, context)
-            full_structure.append({"type": "paragraph", "text": template_text})
+            layout.append({"type": "paragraph", "text": template_text})
 
             if section == "Certificate":
                 # Add signature block for Certificate (invokes the layout engine formatter)
-                full_structure.append(
+                layout.append(
                     {
                         "type": "signature_block",
                         "guide": context.get("guide"),
@@ -161,138 +306,74 @@ class DocumentCompiler:
                 )
             elif section == "Acknowledgement":
                 # Add student names signature at bottom
-                raw_list = context.get("team_names_raw") or []
-                clean_list = [
-                    str(name).strip() for name in raw_list if name and str(name).strip()
-                ]
-                if clean_list:
-                    sig_block = "\n\n" + "\n".join(clean_list)
-                    full_structure.append({"type": "paragraph", "text": sig_block})
+                if team_names:
+                    sig_block = "\n\n" + "\n".join(team_names)
+                    layout.append({"type": "paragraph", "text": sig_block})
 
-        # 3. Dynamic Front Matter
-        full_structure.extend(
-            [
-                {"type": "section_header", "text": "Abstract"},
-                {
-                    "type": "paragraph",
-                    "text": self.generator.generate_section(
-                        "Abstract", summary.to_json(), context
-                    ),
-                },
-                # TOC comes first (academic standard), then LOF
-                # No separate section_header needed — the toc/lof handlers create their own headings
-                {"type": "toc", "text": "Contents"},
-                {"type": "lof", "text": "List of Figures"},
-            ]
-        )
+        # LLM-generated text is enumerated first and fetched concurrently
+        jobs = []
+        # Every job reads the same summary; serialize it once
+        summary_json = summary.to_json()
 
-        # 4. Core Chapters
-        def _count_total_steps(schema):
-            total = 0
-            for c in schema:
-                for sub in c.get("subsections", []):
-                    total += 1  # The parent subsection
-                    if isinstance(sub, dict) and "subsubsections" in sub:
-                        total += len(sub.get("subsubsections", []))
-            return total
-
-        total_steps = _count_total_steps(REPORT_SCHEMA)
-        current_step = 0
-        expected_figures_count = 0
+        def _job(label, method, *args):
+            layout.append(len(jobs))
+            jobs.append((label, method, args))
 
-        # Reverted ThreadPoolExecutor due to strict API limits triggering undocumented silent truncations in LLM.
-        # Ensure sequential generation and avoid burst rate limit spikes by adding throttle delays.
-        for chapter_idx, chapter in enumerate(REPORT_SCHEMA):
-            full_structure.append({"type": "chapter", "text": chapter["title"]})
-            
-            if progress_callback:
-                progress_callback(
-                    min(0.10 + (current_step / total_steps) * 0.85, 0.95),
-                    f"Generating {chapter['title']}...",
-                )
+        # Subsection bodies are requested per chapter in bundles; their slots
+        # are (chapter title, subsection title) pairs
+        bodies = {}
 
-            if chapter.get("subsections"):
-                sub_titles = [
-                    sub["title"] if isinstance(sub, dict) else sub
-                    for sub in chapter["subsections"]
-                ]
-                intro_text = self.generator.generate_chapter_intro(
-                    chapter["title"],
-                    sub_titles,
-                    summary.to_json(),
-                    context,
-                )
-                full_structure.append({"type": "paragraph", "text": intro_text})
-                time.sleep(1.0) # Throttle guard to prevent API bursts
+        def _body(chapter_title, prompt_title):
+            layout.append((chapter_title, prompt_title))
+            bodies.setdefault(chapter_title, []).append(prompt_title)
 
-            for sub in chapter.get("subsections", []):
-                sub_title = sub["title"] if isinstance(sub, dict) else sub
-                
-                body_text = self.generator.generate_subsection_body(
-                    chapter["title"],
-                    sub_title,
-                    summary.to_json(),
-                    context,
-                )
-                full_structure.append({"type": "subheading", "text": sub_title})
-                full_structure.extend(
-                    self._parse_body_blocks(body_text, chapter["title"], context)
-                )
-                
-                if isinstance(sub, dict) and "figure" in sub:
-                    expected_figures_count += 1
-                    full_structure.append(
-                        {"type": "figure", "caption": sub["figure"]}
-                    )
-                time.sleep(1.0)
+        # 3. Dynamic Front Matter
+        layout.append({"type": "section_header", "text": "Abstract"})
+        _job("Abstract", "agenerate_section", "Abstract", summary_json, context)
+        # TOC comes first (academic standard), then LOF
+        # No separate section_header needed — the toc/lof handlers create their own headings
+        layout.append({"type": "toc", "text": "Contents"})
+        layout.append({"type": "lof", "text": "List of Figures"})
 
-                current_step += 1
-                if progress_callback:
-                    progress_callback(
-                        min(0.10 + (current_step / total_steps) * 0.85, 0.95),
-                        f"Generating {chapter['title']} > {sub_title}...",
+        # 4. Core Chapters
+        expected_figures_count = 0
+        current_chapter = None
+
+        for entry in _FLAT_SCHEMA:
+            chapter_title = entry["chapter_title"]
+            if entry["chapter_idx"] != current_chapter:
+                current_chapter = entry["chapter_idx"]
+                layout.append({"type": "chapter", "text": chapter_title})
+                sub_titles = entry["chapter_sub_titles"]
+                if sub_titles:
+                    _job(
+                        chapter_title,
+                        "agenerate_chapter_intro",
+                        chapter_title,
+                        sub_titles,
+                        summary_json,
+                        context,
                     )
-                
-                if isinstance(sub, dict) and "subsubsections" in sub:
-                    # Generate sub-subsections
-                    for subsub in sub.get("subsubsections", []):
-                        subsub_title = subsub["title"] if isinstance(subsub, dict) else subsub
-                        subsub_key = f"{sub_title} - {subsub_title}"
-                        body_sub_text = self.generator.generate_subsection_body(
-                            chapter["title"],
-                            subsub_key,
-                            summary.to_json(),
-                            context,
-                        )
-                        full_structure.append(
-                            {"type": "subsubheading", "text": subsub_title}
-                        )
-                        full_structure.extend(
-                            self._parse_body_blocks(
-                                body_sub_text, chapter["title"], context
-                            )
-                        )
-                        
-                        if isinstance(subsub, dict) and "figure" in subsub:
-                            expected_figures_count += 1
-                            full_structure.append(
-                                {"type": "figure", "caption": subsub["figure"]}
-                            )
-                        time.sleep(1.0)
-
-                        current_step += 1
-                        if progress_callback:
-                            progress_callback(
-                                min(0.10 + (current_step / total_steps) * 0.85, 0.95),
-                                f"Generating {chapter['title']} > {sub_title} > {subsub_title}...",
-                            )
-
-
+            if entry["sub_title"] is None:
+                continue  # Chapter without subsections
+
+            sub_title = entry["sub_title"]
+            if entry["is_subsub"]:
+                subsub_title = entry["subsub_title"]
+                layout.append({"type": "subsubheading", "text": subsub_title})
+                _body(chapter_title, f"{sub_title} - {subsub_title}")
+            else:
+                layout.append({"type": "subheading", "text": sub_title})
+                _body(chapter_title, sub_title)
+
+            if entry["figure"]:
+                expected_figures_count += 1
+                layout.append({"type": "figure", "caption": entry["figure"]})
 
         # 6. References (Strictly follows chapters)
-        full_structure.append({"type": "section_header", "text": "REFERENCES"})
+        layout.append({"type": "section_header", "text": "REFERENCES"})
         ref_text = self._generate_factual_doc_references(context, summary)
-        full_structure.append({"type": "paragraph", "text": ref_text})
+        layout.append({"type": "paragraph", "text": ref_text})
 
         # 7. Post-Reference Institutional Sections (per Sample Parity)
         institutions = [
@@ -303,63 +384,86 @@ class DocumentCompiler:
             "Course Outcomes (CO)",
         ]
         for section in institutions:
-            full_structure.append({"type": "institutional_header", "text": section})
-            body_text = self.generator.generate_subsection_body(
-                "Institutional Requirements",
-                section,
-                summary.to_json(),
-                context,
-            )
-            full_structure.extend(
-                self._parse_body_blocks(
-                    body_text, "Institutional Requirements", context
+            layout.append({"type": "institutional_header", "text": section})
+            _body("Institutional Requirements", section)
+
+        slot_jobs = {}
+        for chapter_title, titles in bodies.items():
+            for i in range(0, len(titles), CHAPTER_BUNDLE_SIZE):
+                chunk = titles[i : i + CHAPTER_BUNDLE_SIZE]
+                for title in chunk:
+                    slot_jobs[(chapter_title, title)] = len(jobs)
+                jobs.append(
+                    (
+                        chapter_title,
+                        "agenerate_chapter_bundle",
+                        (chapter_title, chunk, summary_json, context),
+                    )
                 )
-            )
-            time.sleep(1.0) # Throttle guard
 
-            # Minor progress bump
-            if progress_callback:
-                progress_callback(0.97, f"Formatting {section}...")
+        return layout, jobs, slot_jobs, expected_figures_count
+
+    def _start_jobs(self, client, jobs: List[tuple], progress_callback=None) -> List[asyncio.Task]:
+        """
+        Schedules the generator's async method for every job on ``client`` and
+        returns the tasks, in job order. Admission is left to the generator's
+        governor (AIMD on 429s and rate-limit headers) and the shared RPM/TPM
+        limiter in src.ai.utils.
+        """
+        done = 0
 
-        # 7. AST Integrity Guard Check
-        self._validate_AST(full_structure, expected_figures_count)
+        async def _run(label, method, args):
+            nonlocal done
+            result = await getattr(self.generator, method)(client, *args)
+            done += 1
+            if progress_callback:
+                progress_callback(
+                    min(0.10 + (done / len(jobs)) * 0.85, 0.95),
+                    f"Generated {label}...",
+                )
+            return result
 
-        return full_structure
+        return [
+            asyncio.ensure_future(_run(label, method, args)) for label, method, args in jobs
+        ]
 
     def _validate_AST(self, full_structure: List[Dict], expected_figures_count: int):
         """
         Validates the generated AST blocks to prevent silent document corruption before rendering to Word.
         """
-        chapters = 0
-        figures = 0
-        major_sections = 0
-        subsections = 0
-        
         for block in full_structure:
-            text = block.get("text", "")
-            lower_text = text.lower()
-            
-            # Check for API errors or empty failures
-            if "error code:" in lower_text or "rate limit reached" in lower_text or "rror generating" in lower_text:
-                raise RuntimeError(f"InternalGenerationError: Rate limit payload leaked into document body: {text[:100]}")
-            
-            # Basic block counting
-            if block.get("type") == "chapter":
-                chapters += 1
-            if block.get("type") == "section_header":
-                major_sections += 1
-            if block.get("type") in ["subheading", "subsubheading"]:
-                subsections += 1
-            if block.get("type") == "paragraph":
-                # Guard against hallucinated academic citations
-                if "fictional" in lower_text or "note: the references" in lower_text or "j. smith" in lower_text or "[1] a." in lower_text:
-                    raise RuntimeError("InternalGenerationError: Fictional keyword/citation pattern detected in AST.")
-                
-            if block.get("type") == "figure":
-                figures += 1
-                caption = block.get("caption", "")
-                if "X:" in caption or re.search(r"Figure \d+\.\d+ X:", caption, re.IGNORECASE):
-                    raise RuntimeError(f"InternalGenerationError: LOF format corruption 'X:' detected in caption: {caption}")
+            self._check_block(block)
+        self._check_counts(
+            Counter(block.get("type") for block in full_structure), expected_figures_count
+        )
+
+    @staticmethod
+    def _check_block(block: Dict):
+        """Per-block half of _validate_AST: leaked errors, fictional citations, bad captions."""
+        text = block.get("text", "")
+        block_type = block.get("type")
+
+        # Check for API errors or empty failures
+        if _LEAKED_ERROR_RE.search(text):
+            raise RuntimeError(f"InternalGenerationError: Rate limit payload leaked into document body: {text[:100]}")
+
+        if block_type == "paragraph":
+            # Guard against hallucinated academic citations
+            if _FICTIONAL_RE.search(text):
+                raise RuntimeError("InternalGenerationError: Fictional keyword/citation pattern detected in AST.")
+        elif block_type == "figure":
+            caption = block.get("caption", "")
+            if "X:" in caption or _CAPTION_X_RE.search(caption):
+                raise RuntimeError(f"InternalGenerationError: LOF format corruption 'X:' detected in caption: {caption}")
+
+    @staticmethod
+    def _check_counts(counts: Counter, expected_figures_count: int):
+        """Whole-document half of _validate_AST, from block counts by type."""
+        chapters = counts["chapter"]
+        figures = counts["figure"]
+        major_sections = counts["section_header"]
+        subsections = counts["subheading"] + counts["subsubheading"]
+
         if chapters < 5:
             raise RuntimeError(f"InternalGenerationError: Expected >= 5 Chapters, got {chapters}. AST Truncated.")
             
@@ -380,23 +484,24 @@ class DocumentCompiler:
         Parses JSON blocks returned by the LLM and formats them into the AST structure.
         Securely filters hallucinated tags AFTER parsing JSON to prevent JSON corruption.
         """
-        import json
-        import re
-        
         # 1. Securely Parse the JSON (or fallback to plain text if the model completely disobeyed)
         try:
             data = json.loads(body_text)
             blocks = data.get("blocks", [])
             is_json = True
         except (json.JSONDecodeError, TypeError):
-            blocks = []
-            for line in body_text.split("\n"):
-                if line.strip():
-                    blocks.append({"type": "paragraph", "text": line.strip()})
+            blocks = (
+                {"type": "paragraph", "text": m.group(1)}
+                for m in _TEXT_LINE_RE.finditer(body_text)
+            )
             is_json = False
 
         sub_structure = []
-        figure_pattern = re.compile(r"\[Figure\s*[\d\.]*[:\-]?\s*(.*?)\]", re.IGNORECASE)
+        # Looked up once per body rather than per code_extraction block
+        analysis_data = context.get("detailed_analysis")
+        if not hasattr(self, "extracted_code_snippets"):
+            self.extracted_code_snippets = set()
+        seen_snippets = self.extracted_code_snippets
 
         # 2. Safely process each structural block
         for block in blocks:
@@ -411,23 +516,27 @@ class DocumentCompiler:
                     continue
                     
                 # Security: Strip Hallucinated Markdown Headers
-                text = re.sub(r"^#+\s*", "", text).strip()
+                # (a leading "#" run; plain string ops, most paragraphs have none)
+                if text.startswith("#"):
+                    text = text.lstrip("#")
+                text = text.strip()
                 
                 # Check for hallucinated figure tags inside the text block
-                fig_match = figure_pattern.search(text)
+                fig_match = _FIGURE_RE.search(text)
                 if fig_match:
                     # If the entire paragraph is just a hallucinated figure tag, silently drop it.
                     if len(text) < len(fig_match.group(0)) + 15:
                         continue
                     else:
                         # Otherwise, strip just the tag from the text and keep the rest.
-                        text = figure_pattern.sub("", text).strip()
+                        text = _FIGURE_RE.sub("", text).strip()
                         if not text:
                             continue
                 
                 # Regex fallback for legacy strings containing Extract Code tags inside text paragraphs
-                code_match = re.search(r"\[Extract Code:\s*(.*?)\]", text, re.IGNORECASE)
-                if code_match and not is_json:
+                # (JSON bodies request code through code_extraction blocks, so skip the scan)
+                code_match = None if is_json else _EXTRACT_CODE_RE.search(text)
+                if code_match:
                     block_type = "code_extraction"
                     block["target_name"] = code_match.group(1).strip()
                 else:
@@ -439,52 +548,59 @@ class DocumentCompiler:
                 target_name = block.get("target_name")
                 if target_name:
                     extracted = False
-                    analysis_data = context.get("detailed_analysis")
-
-                    if not hasattr(self, "extracted_code_snippets"):
-                        self.extracted_code_snippets = set()
 
                     if analysis_data and hasattr(analysis_data, "code_snippets"):
+                        by_name, ordered = self._snippet_index(analysis_data)
+
                         # Pass 1: Try to find the LLM's highly specific requested target
-                        for file_path, snippets in analysis_data.code_snippets.items():
-                            for snippet_tuple in snippets:
-                                if len(snippet_tuple) == 3:
-                                    code_str = snippet_tuple[2]
-                                    if (
-                                        f"def {target_name}" in code_str
-                                        or f"class {target_name}" in code_str
-                                        or target_name in code_str
-                                    ) and code_str not in self.extracted_code_snippets:
-                                        sub_structure.append({"type": "paragraph", "text": f"The implementation of {target_name} is shown below:"})
-                                        sub_structure.append({"type": "code_block", "text": code_str})
-                                        self.extracted_code_snippets.add(code_str)
-                                        extracted = True
-                                        break
-                            if extracted:
+                        for code_str in by_name.get(target_name, ()):
+                            if code_str not in seen_snippets:
+                                sub_structure.append({"type": "paragraph", "text": f"The implementation of {target_name} is shown below:"})
+                                sub_structure.append({"type": "code_block", "text": code_str})
+                                seen_snippets.add(code_str)
+                                extracted = True
                                 break
 
                         # Pass 2: Fallback to next unseen snippet if model hallucinated the target
                         if not extracted:
-                            for file_path, snippets in analysis_data.code_snippets.items():
-                                for snippet_tuple in snippets:
-                                    if len(snippet_tuple) == 3:
-                                        fallback_str = snippet_tuple[2]
-                                        if fallback_str not in self.extracted_code_snippets:
-                                            auto_name = target_name
-                                            match = re.search(r'(?:def|class)\s+([a-zA-Z0-9_]+)', fallback_str)
-                                            if match:
-                                                auto_name = match.group(1)
-                                                
-                                            sub_structure.append({"type": "paragraph", "text": f"The implementation of {auto_name} is shown below:"})
-                                            sub_structure.append({"type": "code_block", "text": fallback_str})
-                                            self.extracted_code_snippets.add(fallback_str)
-                                            extracted = True
-                                            break
-                                if extracted:
+                            for fallback_str in ordered:
+                                if fallback_str not in seen_snippets:
+                                    auto_name = target_name
+                                    match = _DEF_NAME_RE.search(fallback_str)
+                                    if match:
+                                        auto_name = match.group(1)
+
+                                    sub_structure.append({"type": "paragraph", "text": f"The implementation of {auto_name} is shown below:"})
+                                    sub_structure.append({"type": "code_block", "text": fallback_str})
+                                    seen_snippets.add(fallback_str)
+                                    extracted = True
                                     break
 
         return sub_structure
 
+    def _snippet_index(self, analysis_data) -> Tuple[Dict[str, List[str]], List[str]]:
+        """
+        (name -> snippets defining it, all snippets in order) for an analysis
+        result. Built once per analysis object and reused across subsections.
+        """
+        cached = getattr(self, "_code_index", None)
+        if cached is not None and cached[0] is analysis_data:
+            return cached[1]
+
+        by_name: Dict[str, List[str]] = {}
+        ordered = []
+        for snippets in analysis_data.code_snippets.values():
+            for snippet_tuple in snippets:
+                if len(snippet_tuple) != 3:
+                    continue
+                code_str = snippet_tuple[2]
+                ordered.append(code_str)
+                for name in dict.fromkeys(_DEFINED_NAME_RE.findall(code_str)):
+                    by_name.setdefault(name, []).append(code_str)
+
+        self._code_index = (analysis_data, (by_name, ordered))
+        return by_name, ordered
+
     def _generate_factual_doc_references(self, context: Dict, summary: Any) -> str:
         """Deterministically generates references from the analyzed tech stack to avoid LLM hallucinations."""
         import datetime
@@ -1,3 +1,8 @@
+import io
+import os
+import stat
+import tempfile
+
 from docx import Document
 from docx.shared import Pt, Inches, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_BREAK
@@ -710,11 +715,47 @@ def generate_report(
     page_map = _postbuild_estimate_pages(doc)
     _patch_toc_lof_pages(doc, page_map)
 
-    # Single-pass save — no temp files, no external patchers
+    # Single-pass save — no external patchers
     if hasattr(output_path, "write"):
         doc.save(output_path)
     else:
-        doc.save(output_path)
+        save_docx_atomically(doc, output_path)
+
+
+def _plain_save_mode(path) -> int:
+    """The mode a plain open(path, "wb") would leave path with."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def save_docx_atomically(doc, output_path):
+    """
+    Serializes the document into memory, then writes it to disk in one go.
+    python-docx emits each zip part with many small writes; buffering turns that
+    into a single write + fsync, and os.replace means readers never see a
+    half-written .docx.
+    """
+    buf = io.BytesIO()
+    doc.save(buf)
+
+    target_dir = os.path.dirname(os.path.abspath(output_path))
+    fd, tmp_path = tempfile.mkstemp(suffix=".docx", dir=target_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(buf.getbuffer())
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file 0600; os.replace would keep that
+        os.chmod(tmp_path, _plain_save_mode(output_path))
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
 
 def _validate_document_structure(doc):
@@ -47,7 +47,7 @@ print("--- 1. Testing Extraction (StyleAnalyzer) ---")
 # We need to mock file_obj behavior for extract_text or just bypass it
 # Let's subclass to override extract_text for testing
 class MockStyleAnalyzer(StyleAnalyzer):
-    def extract_text(self, file_obj, file_path):
+    def extract_text(self, file_obj, file_path, max_chars=None):
         return sample_text
 
 analyzer = MockStyleAnalyzer()
@@ -1,6 +1,8 @@
 import unittest
 from unittest.mock import MagicMock, patch
 import sys
+import os
+import tempfile
 from pathlib import Path
 
 # Add project root to path
@@ -9,11 +11,24 @@ if str(root_path) not in sys.path:
     sys.path.append(str(root_path))
 
 from src.blast.ants.content_ant import ContentAnt
+from src.blast.ants.batch_content_ant import BatchContentAnt
 from src.blast.ants.structure_ant import StructureAnt
 from src.blast.blueprint import DocumentNode
+from src.blast.cache import ContentCache, content_key
 
 class TestAnts(unittest.TestCase):
 
+    def setUp(self):
+        # Fresh section cache per test so earlier runs can't serve the content
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cache = self.cache = ContentCache(path=os.path.join(tmp.name, "cache"))
+        for target in ('src.blast.ants.content_ant.section_cache',
+                       'src.blast.ants.batch_content_ant.section_cache'):
+            patcher = patch(target, cache)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     @patch('src.blast.ants.content_ant.ReportGenerator')
     def test_content_ant_success(self, MockGenerator):
         # Setup
@@ -36,6 +51,23 @@ class TestAnts(unittest.TestCase):
         self.assertEqual(result.content, "Generated Content")
         mock_gen_instance.generate_section.assert_called_once()
 
+    @patch('src.blast.ants.content_ant.ReportGenerator')
+    def test_content_ant_cache_hit(self, MockGenerator):
+        mock_gen_instance = MockGenerator.return_value
+        mock_gen_instance.generate_section.return_value = "Generated Content"
+
+        ant = ContentAnt()
+        node = DocumentNode(type="paragraph", text="Introduction")
+        context = {"api_key": "mock_key", "project_summary": {}, "user_context": {}}
+
+        ant.execute(node, context)
+        result = ant.execute(node, context)
+
+        # Second run is served from the cache
+        self.assertTrue(result.success)
+        self.assertEqual(result.content, "Generated Content")
+        mock_gen_instance.generate_section.assert_called_once()
+
     @patch('src.blast.ants.content_ant.ReportGenerator')
     def test_content_ant_failure_no_key(self, MockGenerator):
         ant = ContentAnt()
@@ -47,6 +79,53 @@ class TestAnts(unittest.TestCase):
         self.assertFalse(result.success)
         self.assertIn("Missing API Key", result.error)
 
+    @patch('src.blast.ants.batch_content_ant.ReportGenerator')
+    def test_batch_content_ant_success(self, MockGenerator):
+        # Setup
+        mock_gen_instance = MockGenerator.return_value
+        mock_gen_instance.generate_sections.return_value = {
+            "Introduction": "Intro Content",
+            "Methodology": "Method Content"
+        }
+
+        ant = BatchContentAnt()
+        nodes = [
+            DocumentNode(type="heading", text="Introduction"),
+            DocumentNode(type="heading", text="Methodology")
+        ]
+        context = {"api_key": "mock_key", "project_summary": {}, "user_context": {}}
+
+        # Execute
+        result = ant.execute(nodes, context)
+
+        # Verify: one generator call covers both sections
+        self.assertTrue(result.success)
+        self.assertEqual(result.data["Methodology"], "Method Content")
+        mock_gen_instance.generate_sections.assert_called_once()
+
+    @patch('src.blast.ants.batch_content_ant.ReportGenerator')
+    def test_batch_content_ant_skips_error_text(self, MockGenerator):
+        mock_gen_instance = MockGenerator.return_value
+        mock_gen_instance.generate_sections.return_value = {
+            "Introduction": "Error generating section Introduction: 429 rate limit",
+            "Methodology": "Method Content"
+        }
+
+        ant = BatchContentAnt()
+        nodes = [
+            DocumentNode(type="heading", text="Introduction"),
+            DocumentNode(type="heading", text="Methodology")
+        ]
+        context = {"api_key": "mock_key", "project_summary": {}, "user_context": {}}
+
+        result = ant.execute(nodes, context)
+
+        # The failed section is left for the Architect to retry, and never cached
+        self.assertTrue(result.success)
+        self.assertNotIn("Introduction", result.data)
+        self.assertIsNone(self.cache.get(content_key("Introduction", {}, {})))
+        self.assertEqual(self.cache.get(content_key("Methodology", {}, {})), "Method Content")
+
     @patch('src.blast.ants.structure_ant.structure_text')
     def test_structure_ant_success(self, mock_structure):
         # Setup
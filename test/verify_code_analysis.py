@@ -50,7 +50,8 @@ with open("verify_output.txt", "w", encoding="utf-8") as f:
     f.write("\n--- Analyzer Output ---\n")
     summary = ProjectSummary()
     analyzer = CodeAnalyzer()
-    analyzer._analyze_python_ast(code, "processor.py", summary)
+    result, facts = analyzer.code_parser.parse_source("processor.py", code)
+    analyzer._analyze_python_ast(result, facts, "processor.py", summary)
 
     for mod in summary.modules:
         f.write(f"MODULE ENRTY:\n{mod}\n")
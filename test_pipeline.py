@@ -24,13 +24,21 @@ context = {
 
 summary = MockSummary()
 
-# Instead of letting it hit the API, mock the entire `generate_subsection_body`
+# Instead of letting it hit the API, mock the async generators compile_structure awaits
 compiler = DocumentCompiler(api_key="mock")
 
-def mock_gen_body(chapter, sub, sum_str, ctx):
+async def mock_gen_body(client, chapter, sub, sum_str, ctx):
     return f"This is {chapter} - {sub}. [Figure 1.1: Test Architecture]"
-compiler.generator.generate_subsection_body = mock_gen_body
-compiler.generator.generate_section = lambda sec, sum_str, ctx: f"Fake abstract."
+async def mock_gen_section(client, sec, sum_str, ctx):
+    return f"Fake abstract."
+async def mock_gen_intro(client, chapter, subs, sum_str, ctx):
+    return f"Intro to {chapter}."
+async def mock_gen_bundle(client, chapter, subs, sum_str, ctx):
+    return {sub: await mock_gen_body(client, chapter, sub, sum_str, ctx) for sub in subs}
+compiler.generator.agenerate_subsection_body = mock_gen_body
+compiler.generator.agenerate_chapter_bundle = mock_gen_bundle
+compiler.generator.agenerate_section = mock_gen_section
+compiler.generator.agenerate_chapter_intro = mock_gen_intro
 
 full_structure = compiler.compile_structure(context, summary)
 
@@ -0,0 +1,48 @@
+import atexit
+import gc
+import json
+import weakref
+from types import SimpleNamespace
+
+import pytest
+
+from src.blast import blueprint as blueprint_module
+from src.blast.blueprint import Blueprint
+
+
+def _blueprint():
+    return Blueprint(SimpleNamespace(to_json=lambda: {"title": "Project"}))
+
+
+@pytest.fixture
+def blueprint(tmp_path, monkeypatch):
+    # Blueprint persists to ./project_memory.json
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(blueprint_module, "orjson", None)
+    return _blueprint()
+
+
+def test_exit_hook_does_not_keep_the_blueprint_alive():
+    blueprint = _blueprint()
+    hook = blueprint._exit_hook
+    ref = weakref.ref(blueprint)
+    del blueprint
+    gc.collect()
+
+    assert ref() is None
+    hook()  # A hook outliving its blueprint does nothing
+    atexit.unregister(hook)
+
+
+def test_close_writes_pending_state_and_unregisters(blueprint, monkeypatch):
+    unregistered = []
+    monkeypatch.setattr(blueprint_module.atexit, "unregister", unregistered.append)
+    blueprint.save(force=True)
+    blueprint.set_context("title", "Changed")
+    blueprint.save()  # Within SAVE_INTERVAL: only marked dirty
+
+    blueprint.close()
+
+    assert unregistered == [blueprint._exit_hook]
+    with open("project_memory.json") as f:
+        assert json.load(f)["context"]["title"] == "Changed"
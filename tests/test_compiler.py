@@ -0,0 +1,151 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.core import compiler as compiler_module
+from src.core.compiler import DocumentCompiler, _flatten_schema
+
+SCHEMA = [
+    {
+        "title": "Introduction",
+        "subsections": [
+            "Background",
+            {
+                "title": "Design",
+                "figure": "Architecture",
+                "subsubsections": ["Data", {"title": "Model", "figure": "Network"}],
+            },
+        ],
+    },
+    {"title": "Summary"},
+]
+
+CONTEXT = {"title": "Project", "team_names_raw": ["A. Student"]}
+
+
+@pytest.fixture
+def compiler(tmp_path, monkeypatch):
+    # ReportGenerator keeps its cache file under ./cache
+    monkeypatch.chdir(tmp_path)
+    return DocumentCompiler(api_key="test-key")
+
+
+@pytest.fixture
+def summary():
+    return SimpleNamespace(to_json=lambda: {"title": "Project"}, tech_stack=["Python"])
+
+
+def _chapter_layout(layout, jobs):
+    """The planned chapters, from the first chapter up to REFERENCES, as tuples."""
+    start = next(
+        i
+        for i, item in enumerate(layout)
+        if isinstance(item, dict) and item["type"] == "chapter"
+    )
+    end = layout.index({"type": "section_header", "text": "REFERENCES"})
+    described = []
+    for item in layout[start:end]:
+        if isinstance(item, int):
+            described.append(("job", jobs[item][1]))
+        elif isinstance(item, tuple):
+            described.append(("slot",) + item)
+        else:
+            described.append((item["type"], item.get("text", item.get("caption"))))
+    return described
+
+
+def test_plan_layout_order(compiler, summary, monkeypatch):
+    monkeypatch.setattr(compiler_module, "_FLAT_SCHEMA", _flatten_schema(SCHEMA))
+
+    layout, jobs, _, expected_figures = compiler._plan(CONTEXT, summary)
+
+    assert _chapter_layout(layout, jobs) == [
+        ("chapter", "Introduction"),
+        ("job", "agenerate_chapter_intro"),
+        ("subheading", "Background"),
+        ("slot", "Introduction", "Background"),
+        ("subheading", "Design"),
+        ("slot", "Introduction", "Design"),
+        # A subsection's figure follows its body, before its sub-subsections
+        ("figure", "Architecture"),
+        ("subsubheading", "Data"),
+        ("slot", "Introduction", "Design - Data"),
+        ("subsubheading", "Model"),
+        ("slot", "Introduction", "Design - Model"),
+        ("figure", "Network"),
+        # No subsections: no intro job and no bodies
+        ("chapter", "Summary"),
+    ]
+    assert expected_figures == 2
+
+    # Front matter is finished blocks; the Abstract is the first job
+    assert layout[0] == {"type": "title", "text": "PROJECT"}
+    assert jobs[0][1] == "agenerate_section"
+    assert layout[layout.index({"type": "section_header", "text": "Abstract"}) + 1] == 0
+
+
+def test_plan_slot_jobs_bundle_each_chapter(compiler, summary, monkeypatch):
+    monkeypatch.setattr(compiler_module, "_FLAT_SCHEMA", _flatten_schema(SCHEMA))
+    monkeypatch.setattr(compiler_module, "CHAPTER_BUNDLE_SIZE", 3)
+
+    layout, jobs, slot_jobs, _ = compiler._plan(CONTEXT, summary)
+
+    slots = [item for item in layout if isinstance(item, tuple)]
+    assert set(slot_jobs) == set(slots)
+
+    bundles = {}
+    for (chapter, title), job in slot_jobs.items():
+        label, method, args = jobs[job]
+        assert method == "agenerate_chapter_bundle"
+        assert label == args[0] == chapter
+        assert title in args[1]
+        bundles.setdefault(job, []).append(title)
+
+    # Bundles never mix chapters, keep document order and hold at most 3 bodies
+    assert sorted(len(titles) for titles in bundles.values()) == [1, 2, 3, 3]
+    for job, titles in bundles.items():
+        assert list(jobs[job][2][1]) == titles
+    assert jobs[slot_jobs[("Introduction", "Design - Model")]][2][1] == [
+        "Design - Model"
+    ]
+
+
+def test_failed_job_cancels_the_others(compiler, summary, monkeypatch):
+    closed = []
+
+    class FakeClient:
+        async def close(self):
+            closed.append(True)
+
+    monkeypatch.setattr(
+        compiler_module, "make_async_client", lambda api_key: FakeClient()
+    )
+
+    started = []
+    cancelled = []
+
+    async def hang(client, *args):
+        started.append(args)
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(args)
+            raise
+
+    async def fail(client, *args):
+        await asyncio.sleep(0)
+        raise RuntimeError("API Error: boom")
+
+    generator = compiler.generator
+    monkeypatch.setattr(generator, "agenerate_section", fail)
+    monkeypatch.setattr(generator, "agenerate_chapter_intro", hang)
+    monkeypatch.setattr(generator, "agenerate_chapter_bundle", hang)
+
+    # compile_structure without its asyncio.run, so a hang fails instead
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(asyncio.wait_for(compiler._collect_structure(CONTEXT, summary), 5))
+
+    assert started
+    assert len(cancelled) == len(started)
+    assert closed == [True]
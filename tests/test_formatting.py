@@ -0,0 +1,37 @@
+import os
+import stat
+
+import pytest
+
+from src.file_formatting.formatting import save_docx_atomically
+
+
+class _FakeDocument:
+    def save(self, stream):
+        stream.write(b"PK fake docx")
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.fixture
+def umask():
+    previous = os.umask(0o022)
+    yield 0o022
+    os.umask(previous)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX permission bits")
+def test_atomic_save_keeps_plain_save_permissions(tmp_path, umask):
+    target = tmp_path / "report.docx"
+
+    save_docx_atomically(_FakeDocument(), str(target))
+    assert _mode(target) == 0o666 & ~umask
+    assert target.read_bytes() == b"PK fake docx"
+
+    # Overwriting keeps the existing file's mode
+    os.chmod(target, 0o640)
+    save_docx_atomically(_FakeDocument(), str(target))
+    assert _mode(target) == 0o640
+    assert [p.name for p in tmp_path.iterdir()] == ["report.docx"]
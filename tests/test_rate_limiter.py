@@ -0,0 +1,292 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.ai import rate_limiter, utils
+from src.ai.rate_limiter import RateLimitGovernor, TokenBucket, parse_duration
+
+
+class _Clock:
+    """Stands in for rate_limiter.time: sleeps advance a fake monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+def test_bucket_allows_one_minute_burst_then_paces(clock):
+    bucket = TokenBucket(rpm=6)
+    for _ in range(6):
+        bucket.acquire()
+    assert clock.slept == []
+
+    # Past the burst, requests are spaced by 60 / rpm seconds
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.slept == [pytest.approx(10.0), pytest.approx(10.0)]
+
+
+def test_bucket_paces_on_tokens(clock):
+    bucket = TokenBucket(rpm=0, tpm=6000)
+    bucket.acquire(4000)
+    bucket.acquire(2000)
+    assert clock.slept == []
+
+    bucket.acquire(3000)
+    assert clock.slept == [pytest.approx(30.0)]
+
+
+def test_bucket_refills_while_idle(clock):
+    bucket = TokenBucket(rpm=6)
+    for _ in range(6):
+        bucket.acquire()
+    clock.now += 60.0
+    for _ in range(6):
+        bucket.acquire()
+    assert clock.slept == []
+
+
+def test_zero_limit_disables_that_quota(clock):
+    bucket = TokenBucket(rpm=0, tpm=0)
+    for _ in range(100):
+        bucket.acquire(100_000)
+    assert clock.slept == []
+
+    # rpm still applies with tpm disabled
+    bucket = TokenBucket(rpm=1, tpm=0)
+    bucket.acquire(100_000)
+    bucket.acquire(100_000)
+    assert clock.slept == [pytest.approx(60.0)]
+
+
+def test_penalize_holds_back_every_caller(clock):
+    bucket = TokenBucket(rpm=0, tpm=0)
+    bucket.penalize(7.5)
+    bucket.acquire()
+    assert clock.slept == [pytest.approx(7.5)]
+
+    # A shorter penalty never cuts an existing hold short
+    bucket.penalize(10.0)
+    bucket.penalize(1.0)
+    bucket.acquire()
+    assert clock.slept[-1] == pytest.approx(10.0)
+
+
+def test_acquire_async_waits_without_blocking(clock, monkeypatch):
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    bucket = TokenBucket(rpm=1)
+    asyncio.run(bucket.acquire_async())
+    asyncio.run(bucket.acquire_async())
+    assert clock.slept == []
+    assert slept == [pytest.approx(60.0)]
+
+
+def test_refund_returns_unused_tokens(clock):
+    bucket = TokenBucket(rpm=0, tpm=6000)
+    bucket.acquire(6000)
+    bucket.refund(4000)
+    bucket.acquire(4000)
+    assert clock.slept == []
+
+    bucket.acquire(1000)
+    assert clock.slept == [pytest.approx(10.0)]
+
+
+def test_requests_reserve_the_cap_and_refund_unused_tokens(monkeypatch):
+    reserved, refunded = [], []
+    monkeypatch.setattr(utils._limiter, "acquire", reserved.append)
+    monkeypatch.setattr(utils._limiter, "refund", refunded.append)
+    message = SimpleNamespace(content="ok")
+    completion = SimpleNamespace(
+        choices=[SimpleNamespace(message=message)],
+        usage=SimpleNamespace(completion_tokens=48),
+    )
+    model = SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(create=lambda **kw: completion)
+        )
+    )
+
+    prompt = "x" * 400  # ~100 prompt tokens
+    utils.generate_with_retry(model, prompt)
+    utils.generate_with_retry(model, prompt + "y", max_tokens=256)
+    assert reserved == [100 + 2048, 100 + 256]
+    # Only the tokens the completion used stay charged
+    assert refunded == [2048 - 48, 256 - 48]
+
+
+def test_aimd_increase_is_additive_and_capped():
+    governor = RateLimitGovernor(max_concurrency=4, initial=2)
+
+    governor.observe(latency=1.0, status=200)
+    assert governor.current_concurrency == 3.0
+    governor.observe(latency=1.0, status=200)
+    governor.observe(latency=1.0, status=200)
+    assert governor.current_concurrency == 4.0
+
+
+def test_aimd_decrease_once_per_latency_window():
+    governor = RateLimitGovernor(max_concurrency=8, initial=8)
+    governor.observe(latency=30.0, status=200)
+
+    # A burst of 429s from requests that were in flight together counts once
+    governor.observe(status=429)
+    governor.observe(status=429)
+    assert governor.current_concurrency == 4.0
+
+    governor._last_decrease -= 31.0
+    governor.observe(status=429)
+    assert governor.current_concurrency == 2.0
+
+
+def test_decrease_never_goes_below_one():
+    governor = RateLimitGovernor(max_concurrency=8, initial=1)
+    governor.observe(status=429)
+    assert governor.current_concurrency == 1.0
+
+
+def test_slow_success_does_not_shrink_the_window():
+    governor = RateLimitGovernor(max_concurrency=8, initial=4)
+    governor.observe(latency=0.5, status=200)
+    # e.g. a bundle at the max_tokens cap after a short chapter intro
+    governor.observe(latency=20.0, status=200)
+    assert governor.current_concurrency == 6.0
+
+
+def test_waiters_are_admitted_in_arrival_order():
+    governor = RateLimitGovernor(max_concurrency=1, initial=1)
+    order = []
+
+    async def request(name):
+        await governor.wait()
+        order.append(name)
+        await asyncio.sleep(0)
+        governor.release()
+
+    async def main():
+        await governor.wait()  # Holds the only slot
+        tasks = [asyncio.create_task(request(n)) for n in "abc"]
+        await asyncio.sleep(0)
+        assert len(governor._waiters) == 3
+        governor.release()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert order == ["a", "b", "c"]
+    assert governor._in_flight == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    governor = RateLimitGovernor(max_concurrency=1, initial=1)
+
+    async def main():
+        await governor.wait()
+        waiter = asyncio.create_task(governor.wait())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert not governor._waiters
+        governor.release()
+
+    asyncio.run(main())
+    assert governor._in_flight == 0
+
+
+def test_cancelled_waiter_returns_a_handed_over_slot():
+    governor = RateLimitGovernor(max_concurrency=1, initial=1)
+
+    async def main():
+        await governor.wait()
+        waiter = asyncio.create_task(governor.wait())
+        await asyncio.sleep(0)
+        # Slot handed over, then cancelled before the waiter runs
+        governor.release()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        # The slot must be free for the next caller
+        await asyncio.wait_for(governor.wait(), timeout=1)
+        governor.release()
+
+    asyncio.run(main())
+    assert governor._in_flight == 0
+
+
+def test_observe_returns_hold_from_exhausted_quota_headers():
+    governor = RateLimitGovernor(max_hold=60.0)
+    headers = {
+        "x-ratelimit-remaining-requests": "12",
+        "x-ratelimit-reset-requests": "2m59.56s",
+        "x-ratelimit-remaining-tokens": "0",
+        "x-ratelimit-reset-tokens": "7.66s",
+    }
+    assert governor.observe(headers, 1.0, 200) == pytest.approx(7.66)
+
+    # Only exhausted quotas count, and the hold is capped at max_hold
+    headers["x-ratelimit-remaining-tokens"] = "5"
+    assert governor.observe(headers, 1.0, 200) == 0.0
+    headers["x-ratelimit-remaining-requests"] = "0"
+    assert governor.observe(headers, 1.0, 200) == 60.0
+
+
+@pytest.mark.parametrize(
+    "value, seconds",
+    [("30", 30.0), ("7.66s", 7.66), ("2m59.56s", 179.56), ("120ms", 0.12), (None, 0.0)],
+)
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == pytest.approx(seconds)
+
+
+class _RateLimited(Exception):
+    status_code = 429
+    response = SimpleNamespace(
+        headers={
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "2s",
+        }
+    )
+
+
+def test_governed_create_feeds_errors_back_and_releases(monkeypatch):
+    governor = RateLimitGovernor(max_concurrency=4, initial=4)
+    penalties = []
+    monkeypatch.setattr(utils._limiter, "penalize", penalties.append)
+
+    async def create(**body):
+        raise _RateLimited("429 Too Many Requests")
+
+    client = SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(
+                with_raw_response=SimpleNamespace(create=create)
+            )
+        )
+    )
+
+    with pytest.raises(_RateLimited):
+        asyncio.run(utils._governed_create(client, governor, {}))
+
+    assert governor._in_flight == 0
+    assert governor.current_concurrency == 2.0
+    assert penalties == [2.0]
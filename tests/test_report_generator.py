@@ -0,0 +1,182 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.ai import code_analysis_formatter, report_generator
+from src.ai.report_generator import ReportGenerator
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    # The generator keeps its cache file under ./cache
+    monkeypatch.chdir(tmp_path)
+    return ReportGenerator(api_key="test-key")
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    def fake_generate(model, prompt, **kwargs):
+        calls.append(prompt)
+        return json.dumps({"problem_statement": "P", "objectives": "O", "title": "T"})
+
+    monkeypatch.setattr(report_generator, "generate_with_retry", fake_generate)
+    return calls
+
+
+def test_document_calls_are_not_cached_by_default(generator, llm_calls, monkeypatch):
+    monkeypatch.setattr(report_generator, "LLM_CACHE", False)
+
+    generator.derive_project_context({"title": "X"})
+    generator.derive_project_context({"title": "X"})
+    generator.extract_metadata_from_sample("Sample front matter")
+    generator.extract_metadata_from_sample("Sample front matter")
+
+    assert len(llm_calls) == 4
+    assert generator.cache == {}
+
+
+def test_opt_in_cache_is_keyed_by_prompt(generator, llm_calls, monkeypatch):
+    monkeypatch.setattr(report_generator, "LLM_CACHE", True)
+
+    first = generator.derive_project_context({"title": "X"})
+    assert generator.derive_project_context({"title": "X"}) == first
+    generator.extract_metadata_from_sample("Sample front matter")
+    generator.extract_metadata_from_sample("Sample front matter")
+    assert len(llm_calls) == 2
+
+    # Keyed on the exact prompt sent (and the model), so editing the prompt
+    # can't serve a stale answer
+    key = ReportGenerator._hash_key(
+        "context", [report_generator.TARGET_MODEL_VERSION, llm_calls[0]]
+    )
+    assert key in generator.cache
+
+
+def test_clear_cache_resets_the_analysis_prompt_memo(generator, monkeypatch):
+    formatted = []
+    monkeypatch.setattr(
+        code_analysis_formatter,
+        "_format_detailed_analysis",
+        lambda analysis: formatted.append(analysis) or "prompt",
+    )
+    analysis = object()
+    code_analysis_formatter.format_detailed_analysis_for_prompt(analysis)
+    code_analysis_formatter.format_detailed_analysis_for_prompt(analysis)
+    assert len(formatted) == 1
+
+    generator.clear_cache()
+    code_analysis_formatter.format_detailed_analysis_for_prompt(analysis)
+    assert len(formatted) == 2
+
+
+SINGLE_BODY = json.dumps({"blocks": [{"type": "paragraph", "text": "single"}]})
+
+
+@pytest.fixture
+def bundle_llm(monkeypatch):
+    """Answers bundled prompts with ``bundle_llm.reply`` and single ones with SINGLE_BODY."""
+    calls = SimpleNamespace(bundles=[], singles=[], reply="{}")
+
+    def fake_generate(model, prompt, **kwargs):
+        if 'single root key "subsections"' in prompt:
+            calls.bundles.append(prompt)
+            return calls.reply
+        calls.singles.append(prompt)
+        return SINGLE_BODY
+
+    monkeypatch.setattr(report_generator, "generate_with_retry", fake_generate)
+    return calls
+
+
+def _bundle(generator, titles):
+    return generator.generate_chapter_bundle("Introduction", titles, {}, {})
+
+
+def _blocks(text):
+    return json.loads(text)["blocks"]
+
+
+def test_partial_bundle_falls_back_per_missing_subsection(generator, bundle_llm):
+    bundle_llm.reply = json.dumps(
+        {
+            "subsections": {
+                "Background": {"blocks": [{"type": "paragraph", "text": "B"}]},
+                # A bare block list is accepted too
+                "Motivation": [{"type": "paragraph", "text": "M"}],
+            }
+        }
+    )
+
+    results = _bundle(generator, ["Background", "Motivation", "Scope"])
+
+    assert list(results) == ["Background", "Motivation", "Scope"]
+    assert _blocks(results["Background"])[0]["text"] == "B"
+    assert _blocks(results["Motivation"])[0]["text"] == "M"
+    assert results["Scope"] == SINGLE_BODY
+    assert len(bundle_llm.bundles) == 1
+    assert len(bundle_llm.singles) == 1
+
+    # Every body was cached under its single-subsection key
+    _bundle(generator, ["Background", "Motivation", "Scope"])
+    assert len(bundle_llm.bundles) == 1
+    assert len(bundle_llm.singles) == 1
+
+
+def test_bundle_without_subsections_root(generator, bundle_llm):
+    bundle_llm.reply = json.dumps(
+        {
+            "Background": {"blocks": [{"type": "paragraph", "text": "B"}]},
+            "Scope": {"blocks": []},  # Empty bodies are not accepted
+        }
+    )
+
+    results = _bundle(generator, ["Background", "Scope"])
+
+    assert _blocks(results["Background"])[0]["text"] == "B"
+    assert results["Scope"] == SINGLE_BODY
+
+
+@pytest.mark.parametrize(
+    "reply",
+    [
+        '{"subsections": {"Background": {"blocks": [{"type": "para',  # Cut off at max_tokens
+        "Sorry, I cannot help with that.",
+        json.dumps(["not", "an", "object"]),
+        json.dumps({"subsections": "nothing"}),
+    ],
+)
+def test_unusable_bundle_falls_back_for_every_subsection(generator, bundle_llm, reply):
+    bundle_llm.reply = reply
+
+    results = _bundle(generator, ["Background", "Motivation", "Scope"])
+
+    assert results == dict.fromkeys(["Background", "Motivation", "Scope"], SINGLE_BODY)
+    assert len(bundle_llm.singles) == 3
+    # Only the fallback bodies were cached, nothing from the failed reply
+    assert set(generator.cache.values()) == {SINGLE_BODY}
+
+
+def test_duplicate_titles_are_requested_once(generator, bundle_llm):
+    bundle_llm.reply = json.dumps(
+        {
+            "subsections": {
+                "Background": {"blocks": [{"type": "paragraph", "text": "B"}]},
+                "Scope": {"blocks": [{"type": "paragraph", "text": "S"}]},
+            }
+        }
+    )
+
+    results = _bundle(generator, ["Background", "Scope", "Background"])
+
+    assert list(results) == ["Background", "Scope"]
+    assert bundle_llm.bundles[0].count('- "Background"') == 1
+    assert not bundle_llm.singles
+
+    # Only one distinct title left: no bundle, the single path instead
+    results = _bundle(generator, ["Overview", "Overview"])
+    assert list(results) == ["Overview"]
+    assert len(bundle_llm.bundles) == 1
+    assert len(bundle_llm.singles) == 1
@@ -0,0 +1,164 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("tree_sitter_languages")
+
+from src.analysis.code_parser import CodeParser
+from src.analysis.ts_code_parser import TREE_SITTER_AVAILABLE, TSCodeParser
+
+pytestmark = pytest.mark.skipif(
+    not TREE_SITTER_AVAILABLE, reason="tree_sitter_languages can't load its grammar"
+)
+
+FIXTURES = {
+    "elif_chain": '''
+def classify(n):
+    """Bucket a number."""
+    if n < 0:
+        return "negative"
+    elif n == 0:
+        return "zero"
+    elif n < 10:
+        for i in range(n):
+            print(i)
+        return "small"
+    else:
+        return classify(n // 10)
+
+
+def pick(kind):
+    # ast nests each elif in the previous If, so later branches sort deeper
+    if kind == "a":
+        import a_mod
+    elif kind == "b":
+        import b_mod
+    elif kind == "c":
+        import c_mod
+    else:
+        import d_mod
+    import e_mod
+''',
+    "try_except": """
+import json
+
+
+def load(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError) as exc:
+        import logging
+
+        logging.warning(exc)
+        raise RuntimeError(path) from exc
+    finally:
+        # ast puts handler bodies a level deeper, so this sorts first
+        import atexit
+
+        print("done")
+""",
+    "decorators": '''
+import functools
+from dataclasses import dataclass
+
+
+def traced(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+@dataclass
+class Point:
+    """A 2D point."""
+
+    x: int = 0
+
+    @property
+    def norm(self):
+        return abs(self.x)
+
+    @staticmethod
+    @traced
+    async def fetch(url, *, timeout=5):
+        return url
+
+    @classmethod
+    def origin(cls, x, /, y=0, *rest, **extra):
+        return cls(sorted([x, y])[0])
+''',
+    "nested_defs": """
+def outer(items):
+    def inner(x):
+        def deepest():
+            return inner(x - 1)
+
+        return deepest
+
+    class Local:
+        def method(self):
+            return outer([])
+
+    while items:
+        items.pop()
+    return [inner(i) for i in items]
+
+
+async def agen():
+    return await agen()
+""",
+    "relative_imports": """
+from __future__ import annotations
+
+import os.path as osp, sys
+from . import sibling
+from .. import parent as p
+from .pkg.mod import (
+    a,
+    b as c,
+)
+from ..models import *
+
+
+def run():
+    return osp.join(sys.prefix, sibling.NAME, p.x, a(), c())
+""",
+}
+
+RESULT_FIELDS = [
+    "files_analyzed",
+    "functions",
+    "classes",
+    "imports",
+    "detected_patterns",
+    "algorithm_keywords",
+    "code_snippets",
+]
+
+
+@pytest.mark.parametrize("name", sorted(FIXTURES))
+def test_tree_sitter_matches_ast_parser(name):
+    path = Path(f"{name}.py")
+    source = FIXTURES[name].lstrip()
+
+    expected, expected_facts = CodeParser().parse_source(path, source)
+    result, facts = TSCodeParser().parse_source(path, source)
+
+    for field in RESULT_FIELDS:
+        assert getattr(result, field) == getattr(expected, field), field
+    assert facts.classes == expected_facts.classes
+    assert facts.functions == expected_facts.functions
+    # Only membership feeds the summary; call order is approximate
+    assert set(facts.call_names) == set(expected_facts.call_names)
+
+
+def test_syntax_errors_fall_back_to_ast_parser():
+    path = Path("broken.py")
+    source = "def broken(:\n    pass\n"
+
+    assert TSCodeParser().parse_source(path, source) == CodeParser().parse_source(
+        path, source
+    )
@@ -31,7 +31,8 @@ def main():
     try:
         analyzer = CodeAnalyzer()
         summary = ProjectSummary()
-        analyzer._analyze_python_ast(dummy_code, "temp_dummy.py", summary)
+        result, facts = analyzer.code_parser.parse_source("temp_dummy.py", dummy_code)
+        analyzer._analyze_python_ast(result, facts, "temp_dummy.py", summary)
         
         print("Modules Extracted:", summary.modules)
         